@@ -0,0 +1 @@
+# This file makes the backend directory a Python package
@@ -0,0 +1,362 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Response cache for the Weather Prediction application's read endpoints.
+
+    The raw data and prediction endpoints rebuild the same large JSON on
+    every page load although the data only changes when a loader runs. This
+    module caches their responses:
+    - Cache keys include the data version counters bumped by the loaders, so
+      a load invalidates every cached response built from the old data
+    - Bodies are stored gzip (and brotli, when installed) compressed and sent
+      compressed to clients that accept it
+    - Responses carry an ETag; a matching If-None-Match gets a 304 without
+      touching the cache storage
+    - Storage is either an in-process LRU or a directory of files, both
+      evicting least recently used entries to stay under a byte limit
+
+    Configured with the RESPONSE_CACHE setting:
+        BACKEND: "memory" (default) or "file"
+        LOCATION: directory for the file backend
+        MAX_BYTES: compressed bytes kept before evicting
+"""
+
+import os
+import gzip
+import pickle
+import hashlib
+import tempfile
+import threading
+from functools import wraps
+from collections import OrderedDict
+from django.conf import settings
+from django.db import DatabaseError
+from django.http import HttpResponse, HttpResponseNotModified
+from .models import DataVersion
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class CachedResponse:
+    """
+    A compressed response body and the headers needed to replay it.
+
+    Attributes:
+        etag (str): Entity tag sent with the response
+        status (int): HTTP status code
+        headers (dict): Content-Type and, for downloads, Content-Disposition
+        gzip (bytes): gzip compressed body
+        br (bytes): brotli compressed body, or None without brotli
+    """
+
+    def __init__(self, etag, status, headers, gzip_body, br_body=None):
+        self.etag = etag
+        self.status = status
+        self.headers = headers
+        self.gzip = gzip_body
+        self.br = br_body
+
+    @property
+    def size(self):
+        """Bytes of compressed body held by the entry."""
+        return len(self.gzip) + len(self.br or b"")
+
+class MemoryBackend:
+    """
+    In-process LRU store bounded by the total size of the stored bodies.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous.size
+            self._entries[key] = entry
+            self.size += entry.size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+class FileBackend:
+    """
+    Directory of pickled entries shared by every process on the host.
+
+    File modification times track recency; the oldest files are removed
+    when the directory grows past the byte limit.
+    """
+
+    def __init__(self, location, max_bytes=DEFAULT_MAX_BYTES):
+        self.location = str(location)
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.location, f"{key}.pickle")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                entry = pickle.load(file)
+            os.utime(path)
+            return entry
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def set(self, key, entry):
+        if entry.size > self.max_bytes:
+            return
+        os.makedirs(self.location, exist_ok=True)
+        descriptor, staging = tempfile.mkstemp(dir=self.location, suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as file:
+            pickle.dump(entry, file)
+        os.replace(staging, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        files = []
+        for name in os.listdir(self.location):
+            if not name.endswith(".pickle"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.location, name))
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.location, name))
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        if os.path.isdir(self.location):
+            for name in os.listdir(self.location):
+                if name.endswith(".pickle"):
+                    os.remove(os.path.join(self.location, name))
+
+_backend = None
+
+def get_backend():
+    """
+    Returns the process-wide cache backend, creating it on first use.
+
+    Returns:
+        MemoryBackend or FileBackend: As configured by RESPONSE_CACHE
+    """
+    global _backend
+    if _backend is None:
+        options = getattr(settings, "RESPONSE_CACHE", {})
+        max_bytes = options.get("MAX_BYTES", DEFAULT_MAX_BYTES)
+        if options.get("BACKEND", "memory") == "file":
+            _backend = FileBackend(options["LOCATION"], max_bytes)
+        else:
+            _backend = MemoryBackend(max_bytes)
+    return _backend
+
+def data_versions(datasets):
+    """
+    Reads the current version counter of each dataset.
+
+    Args:
+        datasets (tuple): Dataset names from data/data_version.py
+
+    Returns:
+        dict: Dataset name to version (0 if never bumped)
+    """
+    versions = dict(DataVersion.objects.filter(name__in=datasets).values_list('name', 'version'))
+    return {name: versions.get(name, 0) for name in datasets}
+
+def cache_key(request, versions):
+    """
+    Builds the cache key for a request at the given data versions.
+
+    Args:
+        request (HttpRequest): The incoming request
+        versions (dict): Output of data_versions
+
+    Returns:
+        str: Hex digest of the path, sorted query parameters and versions
+    """
+    query = sorted((key, value) for key in request.GET for value in request.GET.getlist(key))
+    payload = repr((request.path, query, sorted(versions.items())))
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+def etag_matches(request, etag):
+    """Whether the request's If-None-Match header lists the ETag."""
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+def accepted_encodings(header):
+    """
+    Parses an Accept-Encoding header.
+
+    Args:
+        header (str): Header value, such as "gzip;q=0.5, br, *;q=0"
+
+    Returns:
+        dict: Lowercase content coding (or "*") to its quality value; codings
+            with an unparsable q-value are left out
+    """
+    qualities = {}
+    for item in header.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = None
+        if quality is not None:
+            qualities[coding.lower()] = quality
+    return qualities
+
+def choose_encoding(header, available):
+    """
+    Picks the content coding to send for an Accept-Encoding header.
+
+    Args:
+        header (str): Accept-Encoding header value
+        available (tuple): Codings the response can be sent in, most preferred first
+
+    Returns:
+        str: The accepted coding with the highest q-value, ties going to the
+            earlier one in available, or None to send the body uncompressed
+    """
+    qualities = accepted_encodings(header)
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+def compress(response, etag):
+    """
+    Builds a cache entry from a rendered response.
+
+    Args:
+        response (HttpResponse): A successful, non-streaming response
+        etag (str): Entity tag for the entry
+
+    Returns:
+        CachedResponse: The compressed entry
+    """
+    headers = {"Content-Type": response["Content-Type"]}
+    if response.has_header("Content-Disposition"):
+        headers["Content-Disposition"] = response["Content-Disposition"]
+    body = response.content
+    return CachedResponse(
+        etag, response.status_code, headers,
+        gzip.compress(body, compresslevel=6, mtime=0),
+        brotli.compress(body, quality=5) if brotli is not None else None
+    )
+
+def replay(request, entry):
+    """
+    Builds a response from a cache entry in the best accepted encoding.
+
+    Args:
+        request (HttpRequest): The incoming request
+        entry (CachedResponse): The cached response
+
+    Returns:
+        HttpResponse: The cached response
+    """
+    available = ("br", "gzip") if entry.br is not None else ("gzip",)
+    encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), available)
+    if encoding == "br":
+        body = entry.br
+    elif encoding == "gzip":
+        body = entry.gzip
+    else:
+        body = gzip.decompress(entry.gzip)
+
+    response = HttpResponse(body, status=entry.status)
+    for header, value in entry.headers.items():
+        response[header] = value
+    if encoding:
+        response["Content-Encoding"] = encoding
+    return response
+
+def cached_response(*datasets):
+    """
+    Caches a GET view's successful responses until the datasets change.
+
+    Streaming and unsuccessful responses are passed through uncached.
+
+    Args:
+        *datasets (str): Dataset names the view reads from
+
+    Returns:
+        function: The view decorator
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != "GET":
+                return view(request, *args, **kwargs)
+            try:
+                versions = data_versions(datasets)
+            except DatabaseError:
+                # Counters are unavailable (e.g. migrations not run yet)
+                return view(request, *args, **kwargs)
+
+            key = cache_key(request, versions)
+            etag = f'W/"{key}"'
+            if etag_matches(request, etag):
+                response = HttpResponseNotModified()
+                response["ETag"] = etag
+                return response
+
+            backend = get_backend()
+            entry = backend.get(key)
+            if entry is not None:
+                response = replay(request, entry)
+                response["X-Cache"] = "HIT"
+            else:
+                response = view(request, *args, **kwargs)
+                if response.streaming or response.status_code != 200:
+                    return response
+                entry = compress(response, etag)
+                backend.set(key, entry)
+                response = replay(request, entry)
+                response["X-Cache"] = "MISS"
+
+            response["ETag"] = etag
+            response["Vary"] = "Accept-Encoding"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,183 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Time series downsampling for the Weather Prediction application.
+
+    Plots only need a bounded number of points per series regardless of how
+    long the requested range is. This module reduces a series to at most a
+    target number of points, with every bucket handled by the same array
+    operations, so no Python loop runs per point or per bucket:
+    - lttb: Largest-Triangle-Three-Buckets, which keeps the point of each
+      bucket that forms the largest triangle with its neighbouring buckets
+      and so preserves the visual shape of the series
+    - minmax: keeps the lowest and highest point of each bucket, so peaks
+      and troughs are never dropped
+"""
+
+import numpy as np
+from data.features import to_datetime64
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+# Bounds of the number of points per series a client can ask for
+MIN_POINTS = 3
+MAX_POINTS = 5000
+
+def bucket_starts(size, buckets, offset=0):
+    """
+    Splits size points into buckets of (almost) equal length.
+
+    Args:
+        size (int): Number of points to split
+        buckets (int): Number of buckets, at most size
+        offset (int): Index of the first point
+
+    Returns:
+        numpy array: Index of the first point of every bucket
+    """
+    return offset + (np.arange(buckets) * size) // buckets
+
+def bucket_argmax(values, starts, bucket):
+    """
+    Finds the position of the largest value in every bucket.
+
+    Args:
+        values (numpy array): Values of consecutive buckets
+        starts (numpy array): Position of the first value of every bucket
+        bucket (numpy array): Bucket number of every value
+
+    Returns:
+        numpy array: Position of the (first) largest value of every bucket
+    """
+    largest = np.maximum.reduceat(values, starts)
+    candidates = np.flatnonzero(values == largest[bucket])
+    _, first = np.unique(bucket[candidates], return_index=True)
+    return candidates[first]
+
+def lttb(x, y, points):
+    """
+    Selects points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept and the points between them
+    are split into points - 2 buckets. As in the original algorithm the
+    right corner of each triangle is the average of the next bucket; the
+    left corner is the average of the previous bucket rather than the point
+    selected from it, which makes every bucket independent of the others so
+    all of them are computed at once.
+
+    Args:
+        x (numpy array): Increasing x values (e.g. days)
+        y (numpy array): Values, without NaNs
+        points (int): Number of points to keep, at least 3
+
+    Returns:
+        numpy array: Sorted indices of the selected points
+    """
+    if points < 3:
+        raise ValueError("lttb keeps at least 3 points")
+    size = len(x)
+    if points >= size:
+        return np.arange(size)
+
+    inner = points - 2
+    starts = bucket_starts(size - 2, inner, offset=1)
+    ends = np.append(starts[1:], size - 1)
+    counts = ends - starts
+    x_mean = np.add.reduceat(x[1:-1], starts - 1) / counts
+    y_mean = np.add.reduceat(y[1:-1], starts - 1) / counts
+
+    # Triangle corners: previous and next bucket averages, with the fixed
+    # first and last points at the edges
+    left_x = np.concatenate(([x[0]], x_mean[:-1]))
+    left_y = np.concatenate(([y[0]], y_mean[:-1]))
+    right_x = np.append(x_mean[1:], x[-1])
+    right_y = np.append(y_mean[1:], y[-1])
+
+    bucket = np.repeat(np.arange(inner), counts)
+    middle_x, middle_y = x[1:-1], y[1:-1]
+    area = np.abs(
+        (left_x[bucket] - right_x[bucket]) * (middle_y - left_y[bucket])
+        - (left_x[bucket] - middle_x) * (right_y[bucket] - left_y[bucket])
+    )
+
+    selected = bucket_argmax(area, starts - 1, bucket) + 1
+    return np.concatenate(([0], selected, [size - 1]))
+
+def minmax(x, y, points):
+    """
+    Selects the lowest and highest point of each bucket.
+
+    Args:
+        x (numpy array): Increasing x values (e.g. days)
+        y (numpy array): Values, without NaNs
+        points (int): Number of points to keep, at least 2
+
+    Returns:
+        numpy array: Sorted indices of the selected points
+    """
+    if points < 2:
+        raise ValueError("minmax keeps at least 2 points")
+    size = len(x)
+    if points >= size:
+        return np.arange(size)
+
+    buckets = points // 2
+    starts = bucket_starts(size, buckets)
+    bucket = np.repeat(np.arange(buckets), np.diff(np.append(starts, size)))
+    lowest = bucket_argmax(-y, starts, bucket)
+    highest = bucket_argmax(y, starts, bucket)
+    return np.unique(np.concatenate((lowest, highest)))
+
+def downsample(x, y, points, method="lttb"):
+    """
+    Reduces a series to at most the given number of points.
+
+    NaN values are dropped first, since they cannot be plotted.
+
+    Args:
+        x (numpy array): Increasing x values (e.g. days)
+        y (numpy array): Values of the series
+        points (int): Largest number of points to return
+        method (str): One of DOWNSAMPLE_METHODS
+
+    Returns:
+        numpy array: Sorted indices of the kept points in x and y
+    """
+    keep = np.flatnonzero(~np.isnan(y))
+    select = lttb if method == "lttb" else minmax
+    return keep[select(x[keep], y[keep], points)]
+
+def station_series(rows, fields, points, method="lttb"):
+    """
+    Downsamples every field of every station.
+
+    Args:
+        rows (list): (name, date, *values) tuples ordered by name and date
+        fields (tuple): Names of the values in each row
+        points (int): Largest number of points per series
+        method (str): One of DOWNSAMPLE_METHODS
+
+    Returns:
+        dict: {station name: {field: {"date": [YYYY-MM-DD, ...], "value": [...]}}}
+    """
+    if not rows:
+        return {}
+    columns = list(zip(*rows))
+    names = np.array(columns[0], dtype=object)
+    dates = to_datetime64(columns[1])
+    days = dates.astype(np.int64).astype(np.float64)
+    labels = np.datetime_as_string(dates)
+    values = np.array(columns[2:], dtype=np.float64)
+
+    starts = np.flatnonzero(np.append(True, names[1:] != names[:-1]))
+    ends = np.append(starts[1:], len(rows))
+    stations = {}
+    for start, end in zip(starts, ends):
+        series = {}
+        for column, field in enumerate(fields):
+            y = values[column, start:end]
+            kept = downsample(days[start:end], y, points, method)
+            series[field] = {"date": labels[start:end][kept].tolist(), "value": y[kept].tolist()}
+        stations[names[start]] = series
+    return stations
@@ -0,0 +1,194 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Columnar binary export for the Weather Prediction application.
+
+    This module converts QuerySets into typed numpy column buffers and writes
+    them as Apache Arrow IPC streams or Parquet files. Dates keep their date
+    type, numeric columns are stored once per column instead of once per row,
+    and station names are dictionary encoded so each distinct name is written
+    a single time.
+
+    pyarrow is an optional dependency. It is only imported when a binary
+    format is requested, and ExportError is raised if it is not installed.
+"""
+
+import io
+from itertools import islice
+import numpy as np
+from django.http import HttpResponse
+
+# Supported export formats mapped to (content type, file extension)
+EXPORT_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Number of rows read from the database cursor per round-trip
+EXPORT_CHUNK_SIZE = 5000
+
+# numpy dtypes used for each Django field type
+FIELD_DTYPES = {
+    "DateField": "datetime64[D]",
+    "FloatField": np.float64,
+    "IntegerField": np.int32,
+    "AutoField": np.int64,
+    "BigAutoField": np.int64,
+}
+
+# Integer fields that allow NULL are read as float64, NULL becoming NaN
+NULLABLE_INTEGER_DTYPE = np.float64
+
+def field_dtype(field):
+    """
+    Returns the numpy dtype a model field is read into.
+
+    Args:
+        field (Field): Django model field
+
+    Returns:
+        The dtype from FIELD_DTYPES, NULLABLE_INTEGER_DTYPE for integer
+            fields allowing NULL, or object for any other field
+    """
+    dtype = FIELD_DTYPES.get(field.get_internal_type(), object)
+    if field.null and np.dtype(dtype).kind == "i":
+        return NULLABLE_INTEGER_DTYPE
+    return dtype
+
+class ExportError(Exception):
+    """
+    Raised when a binary export cannot be produced.
+
+    The message is safe to return to the client.
+    """
+
+def queryset_to_columns(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Reads a QuerySet into one typed numpy array per field.
+
+    The arrays are allocated once for the row count and filled a chunk at a
+    time, so no per-value Python lists are built. Rows added between the
+    count and the read grow the arrays; rows removed are trimmed off.
+
+    Args:
+        queryset (QuerySet): Rows to export
+        fields (tuple): Field names to read, in output order
+        chunk_size (int): Rows fetched per database round-trip
+
+    Returns:
+        dict: Field name to numpy array. Date fields are datetime64[D]
+            (missing dates become NaT), numeric fields are float64/int32/int64,
+            integer fields allowing NULL are float64, missing numbers become
+            NaN, and text fields are object arrays of str
+    """
+    capacity = queryset.count()
+    columns = {
+        field: np.empty(capacity, dtype=field_dtype(queryset.model._meta.get_field(field)))
+        for field in fields
+    }
+
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    filled = 0
+    while chunk := list(islice(rows, chunk_size)):
+        end = filled + len(chunk)
+        if end > capacity:
+            capacity = max(end, 2 * capacity)
+            for field in fields:
+                grown = np.empty(capacity, dtype=columns[field].dtype)
+                grown[:filled] = columns[field][:filled]
+                columns[field] = grown
+        for field, values in zip(fields, zip(*chunk)):
+            columns[field][filled:end] = values
+        filled = end
+
+    return {field: values[:filled] for field, values in columns.items()}
+
+def columns_to_table(columns):
+    """
+    Builds a pyarrow Table from numpy column buffers.
+
+    Object (string) columns are dictionary encoded, and NaN floats and NaT
+    dates become nulls. Other columns are handed to Arrow without copying where possible.
+
+    Args:
+        columns (dict): Field name to numpy array
+
+    Returns:
+        pyarrow.Table: The columns as an Arrow table
+
+    Raises:
+        ExportError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ExportError("Binary export requires the pyarrow package")
+
+    arrays = []
+    for values in columns.values():
+        if values.dtype == object:
+            dictionary, indices = np.unique(values.astype(str), return_inverse=True)
+            arrays.append(pa.DictionaryArray.from_arrays(
+                indices.astype(np.int32), pa.array(dictionary)
+            ))
+        elif values.dtype.kind == "f":
+            arrays.append(pa.array(values, mask=np.isnan(values)))
+        elif values.dtype.kind == "M":
+            arrays.append(pa.array(values, mask=np.isnat(values)))
+        else:
+            arrays.append(pa.array(values))
+    return pa.Table.from_arrays(arrays, names=list(columns))
+
+def columns_to_bytes(columns, fmt):
+    """
+    Serializes numpy column buffers in a binary format.
+
+    Args:
+        columns (dict): Field name to numpy array
+        fmt (str): One of EXPORT_FORMATS
+
+    Returns:
+        bytes: The encoded Arrow IPC stream or Parquet file
+
+    Raises:
+        ExportError: If the format is unknown or pyarrow is not installed
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown format '{fmt}'; expected one of {', '.join(EXPORT_FORMATS)}")
+
+    table = columns_to_table(columns)
+    sink = io.BytesIO()
+    if fmt == "arrow":
+        import pyarrow as pa
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+        pq.write_table(table, sink)
+    return sink.getvalue()
+
+def export_response(queryset, fields, fmt, filename):
+    """
+    Builds an HTTP response holding a QuerySet in a binary columnar format.
+
+    Args:
+        queryset (QuerySet): Rows to export
+        fields (tuple): Field names to export, in output order
+        fmt (str): One of EXPORT_FORMATS
+        filename (str): Download name without extension
+
+    Returns:
+        HttpResponse: The encoded data with a matching content type
+
+    Raises:
+        ExportError: If the format is unknown or pyarrow is not installed
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown format '{fmt}'; expected one of {', '.join(EXPORT_FORMATS)}")
+    content_type, extension = EXPORT_FORMATS[fmt]
+
+    body = columns_to_bytes(queryset_to_columns(queryset, fields), fmt)
+    response = HttpResponse(body, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{extension}"'
+    return response
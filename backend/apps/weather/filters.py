@@ -0,0 +1,241 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Query parameter filtering for the Weather Prediction application.
+
+    This module turns request query parameters into QuerySet filters so that
+    clients can ask the database for only the rows they need instead of
+    downloading whole tables and filtering them in the browser. It includes
+    helpers for:
+    - Station, date range and bounding box filters
+    - Numeric parameters such as coordinates
+    - Selecting a subset of output fields
+    - Keyset (cursor) pagination on (date, id)
+"""
+
+from datetime import date
+from django.db.models import Q
+
+# Largest page a client may request in one call
+MAX_PAGE_SIZE = 10000
+
+class FilterError(ValueError):
+    """
+    Raised when a query parameter cannot be parsed.
+
+    The message is safe to return to the client.
+    """
+
+def parse_date(value, param):
+    """
+    Parses an ISO formatted date query parameter.
+
+    Args:
+        value (str): Raw parameter value (YYYY-MM-DD)
+        param (str): Parameter name, used in the error message
+
+    Returns:
+        date: The parsed date
+
+    Raises:
+        FilterError: If the value is not a valid ISO date
+    """
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise FilterError(f"'{param}' must be a date in YYYY-MM-DD format")
+
+def parse_bbox(value):
+    """
+    Parses a bounding box query parameter.
+
+    Args:
+        value (str): "min_lon,min_lat,max_lon,max_lat"
+
+    Returns:
+        tuple: (min_lon, min_lat, max_lon, max_lat) as floats
+
+    Raises:
+        FilterError: If the value does not hold four numbers in that order
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(","))
+    except ValueError:
+        raise FilterError("'bbox' must be min_lon,min_lat,max_lon,max_lat")
+    if min_lon > max_lon or min_lat > max_lat:
+        raise FilterError("'bbox' minimums must not exceed maximums")
+    return min_lon, min_lat, max_lon, max_lat
+
+def parse_number(value, param, low, high, kind=float):
+    """
+    Parses a required numeric query parameter within bounds.
+
+    Args:
+        value (str): Raw parameter value
+        param (str): Parameter name, used in the error message
+        low, high: Smallest and largest accepted values
+        kind (type): float or int
+
+    Returns:
+        The parsed number
+
+    Raises:
+        FilterError: If the value is missing, not a number or out of bounds
+    """
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise FilterError(f"'{param}' must be {'an integer' if kind is int else 'a number'}")
+    if not low <= number <= high:
+        raise FilterError(f"'{param}' must be between {low} and {high}")
+    return number
+
+def parse_fields(value, allowed):
+    """
+    Parses a comma separated list of output fields.
+
+    Args:
+        value (str): Requested fields, or None/empty for all fields
+        allowed (tuple): Fields the endpoint can return, in output order
+
+    Returns:
+        tuple: The requested fields, or all allowed fields if none were given
+
+    Raises:
+        FilterError: If a requested field is not allowed
+    """
+    if not value:
+        return allowed
+    fields = tuple(field.strip() for field in value.split(",") if field.strip())
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise FilterError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def parse_limit(value):
+    """
+    Parses the page size query parameter.
+
+    Args:
+        value (str): Requested number of rows, or None for no pagination
+
+    Returns:
+        int: The page size, or None if pagination was not requested
+
+    Raises:
+        FilterError: If the value is not a positive integer up to MAX_PAGE_SIZE
+    """
+    if value is None:
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise FilterError("'limit' must be an integer")
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise FilterError(f"'limit' must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+def encode_cursor(row_date, row_id):
+    """
+    Builds the cursor that points just past a row.
+
+    Args:
+        row_date (date): Date of the last row on the page
+        row_id (int): Primary key of the last row on the page
+
+    Returns:
+        str: Cursor in the form "YYYY-MM-DD,id"
+    """
+    return f"{row_date.isoformat()},{row_id}"
+
+def parse_cursor(value):
+    """
+    Parses a cursor returned by a previous page.
+
+    Args:
+        value (str): Cursor in the form "YYYY-MM-DD,id"
+
+    Returns:
+        tuple: (date, id) of the last row already returned
+
+    Raises:
+        FilterError: If the cursor is malformed
+    """
+    try:
+        row_date, row_id = value.split(",")
+        return date.fromisoformat(row_date), int(row_id)
+    except ValueError:
+        raise FilterError("'cursor' is invalid")
+
+def filter_weather_data(queryset, params):
+    """
+    Applies the station, date range and bounding box filters to a QuerySet.
+
+    Args:
+        queryset (QuerySet): WeatherData or ML_Predictions rows to filter
+        params (QueryDict): Request query parameters
+
+    Query Parameters:
+        station (str): Station name; repeat the parameter for several stations
+        stations (str): Comma separated substrings of station names, matched
+            case-insensitively; every station whose name contains any of them
+            is kept, so "CHARLOTTE" keeps all the Charlotte stations. Use
+            repeated station= parameters to select exact names
+        start (str): First date to include (YYYY-MM-DD)
+        end (str): Last date to include (YYYY-MM-DD)
+        bbox (str): "min_lon,min_lat,max_lon,max_lat"
+
+    Returns:
+        QuerySet: The filtered rows
+
+    Raises:
+        FilterError: If a parameter cannot be parsed
+    """
+    # Station names contain commas ("ASHEVILLE AIRPORT, NC US"), so several
+    # stations are requested by repeating the parameter
+    stations = [name.strip() for name in params.getlist("station") if name.strip()]
+    if stations:
+        queryset = queryset.filter(name__in=stations)
+
+    # Substrings of names, such as the city names the Visuals page selects;
+    # this is a substring match, not an exact one
+    parts = [part.strip() for part in params.get("stations", "").split(",") if part.strip()]
+    if parts:
+        matches = Q()
+        for part in parts:
+            matches |= Q(name__icontains=part)
+        queryset = queryset.filter(matches)
+
+    if params.get("start"):
+        queryset = queryset.filter(date__gte=parse_date(params["start"], "start"))
+    if params.get("end"):
+        queryset = queryset.filter(date__lte=parse_date(params["end"], "end"))
+
+    if params.get("bbox"):
+        min_lon, min_lat, max_lon, max_lat = parse_bbox(params["bbox"])
+        queryset = queryset.filter(
+            latitude__range=(min_lat, max_lat),
+            longitude__range=(min_lon, max_lon)
+        )
+
+    return queryset
+
+def after_cursor(queryset, cursor):
+    """
+    Restricts a QuerySet ordered by (date, id) to rows after a cursor.
+
+    Args:
+        queryset (QuerySet): Rows ordered by date then id
+        cursor (str): Cursor returned by the previous page, or None
+
+    Returns:
+        QuerySet: Rows strictly after the cursor position
+
+    Raises:
+        FilterError: If the cursor is malformed
+    """
+    if not cursor:
+        return queryset
+    row_date, row_id = parse_cursor(cursor)
+    return queryset.filter(Q(date__gt=row_date) | Q(date=row_date, id__gt=row_id))
@@ -0,0 +1,163 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Inference for the Weather Prediction application.
+
+    This module answers (station, date) prediction requests with the warm
+    model from the registry. It includes functions for:
+    - Parsing single points from query parameters and batches from JSON
+    - Fetching the observations the lag and window features depend on in
+      one query per request
+    - Building feature rows with the same code used in training and running
+      them through the fitted preprocessor and the model in one call
+"""
+
+import json
+from datetime import timedelta
+import numpy as np
+from .training import complete_observations
+from data.features import columns_from_rows, complete_inputs, inference_features, lookup_stations
+
+# Largest number of points accepted in one batch request
+MAX_BATCH_SIZE = 50000
+
+class PredictionError(ValueError):
+    """
+    Raised when a prediction request cannot be parsed.
+
+    The message is safe to return to the client.
+    """
+
+def parse_points(request):
+    """
+    Reads the (station, date) points to predict from a request.
+
+    GET requests name a single point with the station and date query
+    parameters. POST requests send a JSON body of the form
+    {"points": [{"station": "...", "date": "YYYY-MM-DD"}, ...]}.
+
+    Args:
+        request (HttpRequest): The incoming request
+
+    Returns:
+        tuple: (list of station names, datetime64[D] array of dates)
+
+    Raises:
+        PredictionError: If the points are missing or malformed
+    """
+    if request.method == "GET":
+        points = [{"station": request.GET.get("station"), "date": request.GET.get("date")}]
+    else:
+        try:
+            points = json.loads(request.body)["points"]
+        except (ValueError, KeyError, TypeError):
+            raise PredictionError('Body must be JSON of the form {"points": [{"station": ..., "date": ...}]}')
+        if not isinstance(points, list) or not points:
+            raise PredictionError("'points' must be a non-empty list")
+        if len(points) > MAX_BATCH_SIZE:
+            raise PredictionError(f"At most {MAX_BATCH_SIZE} points may be requested at once")
+
+    try:
+        names = [str(point["station"]) for point in points if point["station"]]
+        dates = np.array([point["date"] for point in points], dtype="datetime64[D]")
+    except (KeyError, TypeError, ValueError):
+        raise PredictionError("Every point needs a station and a date in YYYY-MM-DD format")
+    if len(names) != len(points) or np.isnat(dates).any():
+        raise PredictionError("Every point needs a station and a date in YYYY-MM-DD format")
+    return names, dates
+
+def history_days(entry):
+    """
+    Number of days before a predicted day that its features depend on.
+
+    Args:
+        entry (ModelEntry): The model making the predictions
+
+    Returns:
+        int: The longest lag or rolling window the model was trained with
+    """
+    settings = entry.metadata.get("features", {})
+    spans = list(settings.get("lags") or [1])
+    for windows in (settings.get("rolling") or {}).values():
+        spans += [window for window, _ in windows]
+    return max(spans)
+
+def fetch_history(entry, names, dates):
+    """
+    Fetches the observations the requested points depend on.
+
+    Args:
+        entry (ModelEntry): The model making the predictions
+        names (list): Station name of every point
+        dates (numpy array): datetime64[D] date of every point
+
+    Returns:
+        dict: Typed observation columns encoded with the model's station codes
+    """
+    first = dates.min().astype(object) - timedelta(days=history_days(entry))
+    last = dates.max().astype(object)
+    rows = list(complete_observations().filter(
+        name__in=set(names), date__gte=first, date__lt=last
+    ).values_list('name', 'date', 'latitude', 'longitude', 'prcp', 'tmax', 'tmin'))
+    _, history = columns_from_rows(rows, entry.station_names)
+    return history
+
+def predict_points(entry, names, dates, history):
+    """
+    Predicts precipitation and temperatures for many (station, date) points.
+
+    Args:
+        entry (ModelEntry): The model making the predictions
+        names (list): Station name of every point
+        dates (numpy array): datetime64[D] date of every point
+        history (dict): Observation columns from fetch_history
+
+    Returns:
+        list: One dict per point with name, date, latitude, longitude, year,
+            month, day, precipitation, temp_max and temp_min, or name, date
+            and error when the point cannot be predicted
+    """
+    from data.linear_regression import predict_batch
+
+    settings = entry.metadata.get("features", {})
+    station = lookup_stations(entry.station_names, names)
+    features = inference_features(
+        station, dates, history, lags=tuple(settings.get("lags") or [1]), rolling=settings.get("rolling")
+    )
+
+    complete = complete_inputs(features)
+    predicted = np.full((len(names), 3), np.nan)
+    if complete.any():
+        predicted[complete] = predict_batch(
+            entry.model, entry.preprocessor, entry.output_scaler, features[complete]
+        )
+    # Per-station models leave stations they have no model for as NaN
+    modelled = ~np.isnan(predicted).any(axis=1)
+
+    date_strings = dates.astype(str).tolist()
+    results = []
+    for i, name in enumerate(names):
+        if not complete[i] or not modelled[i]:
+            if station[i] < 0:
+                error = "Unknown station"
+            elif not complete[i]:
+                error = "No observations for the days before this date"
+            else:
+                error = "No model was trained for this station"
+            results.append({"name": name, "date": date_strings[i], "error": error})
+            continue
+        row = features[i]
+        results.append({
+            "name": name,
+            "date": date_strings[i],
+            "latitude": float(row[1]),
+            "longitude": float(row[2]),
+            "year": int(row[3]),
+            "month": int(row[4]),
+            "day": int(row[5]),
+            "precipitation": float(predicted[i, 0]),
+            "temp_max": float(predicted[i, 1]),
+            "temp_min": float(predicted[i, 2])
+        })
+    return results
@@ -0,0 +1,189 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Background training jobs for the Weather Prediction application.
+
+    Training takes minutes, far longer than a web request should block a
+    worker. The training endpoint therefore only queues a TrainingJob row;
+    the run_training_worker management command claims queued jobs one at a
+    time, trains (or reuses) the model, records per-epoch progress on the
+    job and writes the resulting predictions straight to ml_predictions.
+
+    While a job runs, its worker updates the job's heartbeat every
+    HEARTBEAT_INTERVAL seconds. A worker that dies (killed, out of memory,
+    machine lost) stops the heartbeat, and the next worker to poll the queue
+    marks its job failed once the heartbeat is STALE_AFTER seconds old, so
+    no job stays running forever.
+"""
+
+import threading
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import TrainingJob
+from .training import get_or_train_model
+
+# Seconds between heartbeats of a running job
+HEARTBEAT_INTERVAL = 30
+
+# Seconds without a heartbeat after which a running job is considered dead
+STALE_AFTER = 300
+
+def enqueue_training(hyperparameters=None, retrain=False):
+    """
+    Queues a training run.
+
+    Args:
+        hyperparameters (dict): Overrides for the training hyperparameters
+        retrain (bool): Train even if a saved model matches the data
+
+    Returns:
+        TrainingJob: The queued job
+    """
+    return TrainingJob.objects.create(hyperparameters=hyperparameters or {}, retrain=retrain)
+
+def reclaim_stale_jobs(stale_after=STALE_AFTER):
+    """
+    Marks running jobs whose worker stopped sending heartbeats as failed.
+
+    Jobs that never sent a heartbeat are judged by when they were started.
+
+    Args:
+        stale_after (float): Seconds without a heartbeat before a job is
+            considered dead
+
+    Returns:
+        int: Number of jobs marked failed
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=stale_after)
+    stale = TrainingJob.objects.filter(status=TrainingJob.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    return stale.update(
+        status=TrainingJob.FAILED,
+        message=f"The worker running this job stopped responding (no heartbeat for {stale_after:g} seconds)",
+        finished_at=now,
+    )
+
+def claim_next_job():
+    """
+    Marks the oldest queued job as running and returns it.
+
+    Rows locked by another worker are skipped, so several workers can poll
+    the same queue without running a job twice.
+
+    Returns:
+        TrainingJob: The claimed job, or None if the queue is empty
+    """
+    with transaction.atomic():
+        job = (
+            TrainingJob.objects.select_for_update(skip_locked=True)
+            .filter(status=TrainingJob.QUEUED)
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = TrainingJob.RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+    return job
+
+class Heartbeat:
+    """
+    Updates a running job's heartbeat from a background thread.
+
+    Used as a context manager around the work of a job, so the heartbeat
+    continues through phases that report no progress, such as building
+    features or writing predictions.
+    """
+
+    def __init__(self, job, interval=HEARTBEAT_INTERVAL):
+        self.job = job
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"heartbeat-{job.pk}", daemon=True)
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                TrainingJob.objects.filter(pk=self.job.pk, status=TrainingJob.RUNNING).update(
+                    heartbeat_at=timezone.now()
+                )
+        finally:
+            # The thread has its own database connection
+            connection.close()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+def run_job(job):
+    """
+    Runs a claimed training job to completion.
+
+    Progress is written to the job row after every epoch and a Heartbeat
+    keeps the job's heartbeat fresh throughout. On success the test set
+    predictions are upserted into ml_predictions; on failure the error is
+    recorded on the job instead of being raised.
+
+    Args:
+        job (TrainingJob): A job returned by claim_next_job
+
+    Returns:
+        TrainingJob: The finished job
+    """
+    from .load_db import insert_ml_predictions
+
+    def progress(epoch, total_epochs, loss):
+        TrainingJob.objects.filter(pk=job.pk).update(epoch=epoch, total_epochs=total_epochs, loss=loss)
+
+    try:
+        with Heartbeat(job):
+            entry, metrics = get_or_train_model(job.hyperparameters, retrain=job.retrain, progress=progress)
+            written = insert_ml_predictions(metrics)["written"]
+        job.refresh_from_db(fields=['epoch', 'total_epochs', 'loss'])
+        job.status = TrainingJob.SUCCEEDED
+        job.model_key = entry.key
+        job.predictions_written = written
+        if job.loss is None:
+            job.loss = metrics["training_loss"]
+    except Exception as e:
+        job.refresh_from_db(fields=['epoch', 'total_epochs', 'loss'])
+        job.status = TrainingJob.FAILED
+        job.message = str(e)
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+def job_status(job):
+    """
+    Describes a job for the status endpoint.
+
+    Args:
+        job (TrainingJob): The job to describe
+
+    Returns:
+        dict: JSON serializable job state and progress
+    """
+    return {
+        "job_id": job.pk,
+        "status": job.status,
+        "epoch": job.epoch,
+        "total_epochs": job.total_epochs,
+        "loss": job.loss,
+        "model_key": job.model_key or None,
+        "predictions_written": job.predictions_written,
+        "message": job.message or None,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "heartbeat_at": job.heartbeat_at,
+        "finished_at": job.finished_at,
+    }
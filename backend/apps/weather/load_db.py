@@ -1,181 +1,362 @@
-"""
-@athors: Cade Browning, Luke Howell
-@date: May 2025
-@description:
-    Database loader for ML predictions in the Weather Prediction application.
-
-    This module handles the process of fetching ML prediction data from the API
-    and storing it in a PostgreSQL database. It includes functions for:
-    - Fetching data from the ML training API endpoint
-    - Creating the ML predictions table if it doesn't exist
-    - Inserting or updating ML prediction records in the database
-
-    The module uses environment variables for database configuration and includes
-    error handling for database operations and data processing.
-
-    Environment Variables Required:
-        DB_NAME: Name of the PostgreSQL database
-        DB_USER: Database user name
-        DB_PASSWORD: Database user password
-        DB_HOST: Database host address
-        DB_PORT: Database port number
-"""
-
-import requests
-import psycopg2
-from psycopg2 import sql
-import os
-import dotenv
-
-dotenv.load_dotenv()
-
-API_URL = "http://localhost:8000/api/ml_data/train/"
-
-# Database connection parameters
-DB_NAME = os.getenv("DB_NAME")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")  
-DB_PORT = os.getenv("DB_PORT")       
-
-def fetch_data(api_url):
-    """
-    Fetches JSON data from the specified API URL and returns it.
-    
-    Args:
-        api_url (str): The URL of the API endpoint to fetch data from.
-        
-    Returns:
-        dict: JSON response from the API containing ML prediction data.
-        
-    Raises:
-        requests.exceptions.RequestException: If the API request fails.
-    """
-    response = requests.get(api_url)
-    response.raise_for_status()  # Raise an exception for non-2xx status codes
-    return response.json()
-
-def create_table(cursor):
-    """
-    Creates the ml_predictions table if it doesn't exist.
-    
-    Args:
-        cursor: PostgreSQL database cursor object.
-    """
-    create_table_query = """
-        CREATE TABLE IF NOT EXISTS ml_predictions (
-            name VARCHAR(255),
-            latitude FLOAT,
-            longitude FLOAT,
-            year INTEGER,
-            month INTEGER,
-            day INTEGER,
-            date DATE,
-            predicted_precip FLOAT,
-            predicted_temp_max FLOAT,
-            predicted_temp_min FLOAT,
-            actual_precip FLOAT,
-            actual_temp_max FLOAT,
-            actual_temp_min FLOAT,
-            PRIMARY KEY (name, date)
-        )
-    """
-    cursor.execute(create_table_query)
-
-def insert_ml_predictions(data):
-    """
-    Inserts or updates ML prediction records in the database.
-    
-    Args:
-        data (dict): Dictionary containing ML prediction data
-            
-    The function:
-        Establishes a database connection
-        Creates the table if it doesn't exist
-        Inserts or updates records for each station
-        Handles errors for individual records without failing the entire operation
-        Commits successful transactions and rolls back on errors
-    """
-    conn = psycopg2.connect(
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        host=DB_HOST,
-        port=DB_PORT
-    )
-    cursor = conn.cursor()
-
-    try:
-        # Create table if it doesn't exist
-        create_table(cursor)
-        
-        # Prepare the insert query
-        insert_query = """
-            INSERT INTO ml_predictions (
-                name, latitude, longitude, year, month, day, date,
-                predicted_precip, predicted_temp_max, predicted_temp_min,
-                actual_precip, actual_temp_max, actual_temp_min
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (name, date) DO UPDATE SET
-                predicted_precip = EXCLUDED.predicted_precip,
-                predicted_temp_max = EXCLUDED.predicted_temp_max,
-                predicted_temp_min = EXCLUDED.predicted_temp_min,
-                actual_precip = EXCLUDED.actual_precip,
-                actual_temp_max = EXCLUDED.actual_temp_max,
-                actual_temp_min = EXCLUDED.actual_temp_min
-        """
-
-        stations = data.get("stations", {})
-        for station_name, records in stations.items():
-            for record in records:
-                try:
-                    cursor.execute(
-                        insert_query, (
-                            record["name"],
-                            record["latitude"],
-                            record["longitude"],
-                            record["year"],
-                            record["month"],
-                            record["day"],
-                            record["date"],
-                            record["predicted_precip"],
-                            record["predicted_temp_max"],
-                            record["predicted_temp_min"],
-                            record["actual_precip"],
-                            record["actual_temp_max"],
-                            record["actual_temp_min"]
-                        )
-                    )
-                except Exception as e:
-                    print(f"Error inserting record for {record['name']} on {record['date']}: {e}")
-                    continue
-
-        conn.commit()
-        print("Data inserted/updated successfully into ml_predictions!")
-    
-    except Exception as e:
-        conn.rollback()
-        print(f"Error in database operation: {e}")
-    finally:
-        cursor.close()
-        conn.close()
-
-def main():
-    """
-    Main function that orchestrates the data loading process.
-    
-    The function:
-        Fetches ML prediction data from the API
-        Inserts/updates the data in the database
-        Handles any errors that occur during the process
-    """
-    try:
-        # Fetch data
-        json_data = fetch_data(API_URL)
-        # Insert data
-        insert_ml_predictions(json_data)
-    except Exception as e:
-        print(f"Error in main process: {e}")
-
-if __name__ == "__main__":
+"""
+@athors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Database loader for ML predictions in the Weather Prediction application.
+
+    This module handles the process of fetching ML prediction data from the API
+    and storing it in a PostgreSQL database. It includes functions for:
+    - Fetching data from the ML training API endpoint
+    - Creating the ML predictions table if it doesn't exist
+    - Bulk inserting or updating ML prediction records: rows are validated,
+      streamed into a temporary table with COPY a batch at a time and merged
+      with a single INSERT ... SELECT ... ON CONFLICT; rows that fail
+      validation are skipped and reported in aggregate
+
+    The module uses environment variables for database configuration and includes
+    error handling for database operations and data processing.
+
+    main() loads predictions through the running web server's training API.
+    The run_pipeline management command does the same work in process,
+    without a web server or a JSON round-trip.
+
+    Environment Variables Required:
+        DB_NAME: Name of the PostgreSQL database
+        DB_USER: Database user name
+        DB_PASSWORD: Database user password
+        DB_HOST: Database host address
+        DB_PORT: Database port number
+"""
+
+import requests
+import psycopg2
+from psycopg2 import sql
+from collections import Counter
+from itertools import islice
+import csv
+import datetime
+import io
+import math
+import os
+import dotenv
+from data.data_version import CREATE_TABLE_SQL, ML_PREDICTIONS, bump_sql
+from data.stations import PREDICTIONS, link_sql
+
+dotenv.load_dotenv()
+
+API_URL = "http://localhost:8000/api/ml_data/train/"
+
+# Database connection parameters
+DB_NAME = os.getenv("DB_NAME")
+DB_USER = os.getenv("DB_USER")
+DB_PASSWORD = os.getenv("DB_PASSWORD")
+DB_HOST = os.getenv("DB_HOST")  
+DB_PORT = os.getenv("DB_PORT")       
+
+def fetch_data(api_url):
+    """
+    Fetches JSON data from the specified API URL and returns it.
+    
+    Args:
+        api_url (str): The URL of the API endpoint to fetch data from.
+        
+    Returns:
+        dict: JSON response from the API containing ML prediction data.
+        
+    Raises:
+        requests.exceptions.RequestException: If the API request fails.
+    """
+    response = requests.get(api_url)
+    response.raise_for_status()  # Raise an exception for non-2xx status codes
+    return response.json()
+
+# Columns of the ml_predictions table, in COPY order
+PREDICTION_COLUMNS = (
+    "name", "latitude", "longitude", "year", "month", "day", "date",
+    "predicted_precip", "predicted_temp_max", "predicted_temp_min",
+    "actual_precip", "actual_temp_max", "actual_temp_min"
+)
+
+# Columns updated when a (name, date) prediction already exists
+UPDATED_COLUMNS = (
+    "predicted_precip", "predicted_temp_max", "predicted_temp_min",
+    "actual_precip", "actual_temp_max", "actual_temp_min"
+)
+
+# Longest station name the name column holds
+MAX_NAME_LENGTH = 255
+
+# Rows encoded to CSV per batch while COPY reads the stream
+COPY_BATCH_ROWS = 1000
+
+# Characters COPY asks for per read of the stream
+COPY_READ_SIZE = 64 * 1024
+
+def create_table(cursor, table="ml_predictions"):
+    """
+    Creates the ml_predictions table if it doesn't exist.
+    
+    Args:
+        cursor: PostgreSQL database cursor object.
+        table (str): Name of the table to create.
+    """
+    create_table_query = sql.SQL("""
+        CREATE TABLE IF NOT EXISTS {} (
+            name VARCHAR(255),
+            latitude FLOAT,
+            longitude FLOAT,
+            year INTEGER,
+            month INTEGER,
+            day INTEGER,
+            date DATE,
+            predicted_precip FLOAT,
+            predicted_temp_max FLOAT,
+            predicted_temp_min FLOAT,
+            actual_precip FLOAT,
+            actual_temp_max FLOAT,
+            actual_temp_min FLOAT,
+            PRIMARY KEY (name, date)
+        )
+    """).format(sql.Identifier(table))
+    cursor.execute(create_table_query)
+
+def iter_records(data):
+    """
+    Yields prediction records from either accepted input shape.
+    
+    Args:
+        data (dict): Either the training API response, with records grouped
+            under "stations", or the metrics returned by train(), with a flat
+            "predictions" list
+        
+    Yields:
+        dict: One prediction record at a time
+    """
+    if "predictions" in data:
+        yield from data["predictions"]
+    else:
+        for records in data.get("stations", {}).values():
+            yield from records
+
+def parse_prediction_date(value):
+    """
+    Parses a prediction date.
+    
+    Args:
+        value: A date or an ISO formatted (YYYY-MM-DD) string
+        
+    Returns:
+        date: The parsed date
+        
+    Raises:
+        ValueError: If the value is not a valid date
+    """
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
+
+def prediction_rows(data, rejected):
+    """
+    Validates prediction records and yields them as COPY rows.
+    
+    Every value is checked before it is written, so a single bad record is
+    counted and skipped instead of failing the whole COPY.
+    
+    Args:
+        data (dict): ML prediction data, as accepted by iter_records
+        rejected (Counter): Incremented by reason for every record skipped
+        
+    Yields:
+        tuple: Values in PREDICTION_COLUMNS order
+    """
+    for record in iter_records(data):
+        try:
+            name, date = record["name"], record["date"]
+            if not name or not date:
+                rejected["missing name or date"] += 1
+                continue
+            if len(name) > MAX_NAME_LENGTH:
+                rejected["name too long"] += 1
+                continue
+            try:
+                date = parse_prediction_date(date)
+            except (TypeError, ValueError):
+                rejected["invalid date"] += 1
+                continue
+            measures = [float(record[column]) for column in ("latitude", "longitude", *UPDATED_COLUMNS)]
+            if not all(math.isfinite(value) for value in measures):
+                rejected["NaN or infinite value"] += 1
+                continue
+            latitude, longitude, *values = measures
+            yield (
+                name,
+                latitude,
+                longitude,
+                int(record["year"]),
+                int(record["month"]),
+                int(record["day"]),
+                date.isoformat(),
+                *values
+            )
+        except KeyError as e:
+            rejected[f"missing field {e.args[0]}"] += 1
+        except (TypeError, ValueError):
+            rejected["non-numeric value"] += 1
+
+class CopyStream:
+    """
+    A read-only file of CSV rows for COPY FROM STDIN.
+
+    Rows are pulled from the iterator and encoded a batch at a time as COPY
+    reads, so only about one batch is held in memory however many rows
+    there are.
+
+    Attributes:
+        count (int): Number of rows encoded so far
+    """
+
+    def __init__(self, rows, batch_rows=COPY_BATCH_ROWS):
+        self.rows = iter(rows)
+        self.batch_rows = batch_rows
+        self.pending = ""
+        self.count = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self.pending) < size:
+            batch = list(islice(self.rows, self.batch_rows))
+            if not batch:
+                break
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(batch)
+            self.pending += buffer.getvalue()
+            self.count += len(batch)
+        if size < 0:
+            data, self.pending = self.pending, ""
+        else:
+            data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+def insert_ml_predictions(data, conn=None, table="ml_predictions"):
+    """
+    Inserts or updates ML prediction records in the database in bulk.
+    
+    Args:
+        data (dict): ML prediction data, grouped by station as returned by
+            the training API or as the flat "predictions" list from train()
+        conn: Open psycopg2 connection to use; a new one is opened (and
+            closed) from the environment variables when omitted
+        table (str): Name of the predictions table
+            
+    The function:
+        Establishes a database connection
+        Creates the table if it doesn't exist
+        Streams all valid records into a temporary table with COPY
+        Merges them with one INSERT ... SELECT ... ON CONFLICT; when a
+        (name, date) appears more than once the last record wins
+        Links new rows to their stations and bumps the ml_predictions data
+        version so cached responses expire
+        Commits on success and rolls back and re-raises on errors
+
+    Returns:
+        dict: Counts of records written, of repeated (name, date) records
+            merged and of records rejected, and the rejection reasons
+    """
+    owns_connection = conn is None
+    if owns_connection:
+        conn = psycopg2.connect(
+            dbname=DB_NAME,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            host=DB_HOST,
+            port=DB_PORT
+        )
+    cursor = conn.cursor()
+    rejected = Counter()
+    columns = sql.SQL(", ").join(map(sql.Identifier, PREDICTION_COLUMNS))
+
+    try:
+        # Create table if it doesn't exist
+        create_table(cursor, table)
+
+        # Stream the records into a temporary staging table
+        cursor.execute(sql.SQL(
+            "CREATE TEMP TABLE ml_predictions_staging "
+            "(LIKE {} INCLUDING DEFAULTS, seq BIGSERIAL) ON COMMIT DROP"
+        ).format(sql.Identifier(table)))
+        stream = CopyStream(prediction_rows(data, rejected))
+        cursor.copy_expert(
+            sql.SQL("COPY ml_predictions_staging ({}) FROM STDIN WITH (FORMAT csv)").format(columns),
+            stream, size=COPY_READ_SIZE
+        )
+        cursor.execute(
+            "SELECT COUNT(*) - COUNT(DISTINCT (name, date)) FROM ml_predictions_staging"
+        )
+        duplicates = cursor.fetchone()[0]
+
+        # Merge everything in one set-based statement
+        cursor.execute(sql.SQL("""
+            INSERT INTO {table} ({columns})
+            SELECT DISTINCT ON (name, date) {columns}
+            FROM ml_predictions_staging
+            ORDER BY name, date, seq DESC
+            ON CONFLICT (name, date) DO UPDATE SET {updates}
+        """).format(
+            table=sql.Identifier(table),
+            columns=columns,
+            updates=sql.SQL(", ").join(
+                sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column))
+                for column in UPDATED_COLUMNS
+            )
+        ))
+        written = cursor.rowcount
+
+        # Link new rows to their stations and invalidate cached prediction responses
+        if table == PREDICTIONS:
+            for statement in link_sql(PREDICTIONS):
+                cursor.execute(statement)
+            cursor.execute(CREATE_TABLE_SQL)
+            cursor.execute(bump_sql(ML_PREDICTIONS))
+
+        conn.commit()
+        print(
+            f"Inserted/updated {written} records in {table} from {stream.count} valid records "
+            f"({duplicates} repeated (name, date) records merged)"
+        )
+        if rejected:
+            reasons = ", ".join(f"{reason}: {count}" for reason, count in rejected.most_common())
+            print(f"Rejected {sum(rejected.values())} records ({reasons})")
+        return {
+            "written": written,
+            "duplicates": duplicates,
+            "rejected": sum(rejected.values()),
+            "reasons": dict(rejected),
+        }
+    
+    except Exception as e:
+        conn.rollback()
+        print(f"Error in database operation: {e}")
+        raise
+    finally:
+        cursor.close()
+        if owns_connection:
+            conn.close()
+
+def main():
+    """
+    Main function that orchestrates the data loading process.
+    
+    The function:
+        Fetches ML prediction data from the API
+        Inserts/updates the data in the database
+        Handles any errors that occur during the process
+    """
+    try:
+        # Fetch data
+        json_data = fetch_data(API_URL)
+        # Insert data
+        insert_ml_predictions(json_data)
+    except Exception as e:
+        print(f"Error in main process: {e}")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from backend.apps.weather.training import load_observation_columns
+from data.evaluation import evaluate
+import json
+import os
+
+class Command(BaseCommand):
+    help = (
+        'Cross-validate model settings on rolling-origin folds of the observations '
+        'and report per-fold timings and errors'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grid', default='{}',
+            help='JSON object of parameter name to a list of values, e.g. '
+                 '\'{"estimator": ["lstsq", "ridge"], "alpha": [0.1, 10], "lags": [[1], [1, 2, 7]]}\''
+        )
+        parser.add_argument('--folds', type=int, default=5, help='Number of folds')
+        parser.add_argument('--horizon', type=int, default=90, help='Days in each test window')
+        parser.add_argument(
+            '--gap', type=int, default=0,
+            help='Days left out between each training window and its test window'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.TRAINING_WORKERS,
+            help='Worker processes fitting folds (default: every CPU core)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write every result, including the per-station errors, to this JSON file'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            grid = json.loads(options['grid'])
+            if not isinstance(grid, dict) or not all(isinstance(values, list) for values in grid.values()):
+                raise ValueError
+        except ValueError:
+            raise CommandError('--grid must be a JSON object of parameter name to a list of values')
+        if options['folds'] < 1 or options['horizon'] < 1 or options['gap'] < 0:
+            raise CommandError('--folds and --horizon must be positive and --gap not negative')
+
+        station_names, columns, raw_count = load_observation_columns()
+        if not raw_count:
+            raise CommandError('There are no complete observations to evaluate on')
+        self.stdout.write(f'Evaluating on {raw_count} observations from {len(station_names)} stations')
+
+        try:
+            report = evaluate(
+                columns, station_names, grid,
+                folds=options['folds'], horizon=options['horizon'], gap=options['gap'],
+                workers=options['workers'],
+                cache_root=os.path.join(settings.FEATURE_STORE_DIR, 'folds'),
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for setting, seconds in report['prepare_seconds'].items():
+            self.stdout.write(f'Prepared folds for {setting} in {seconds:.2f}s')
+        for fold, (train_end, test_start, test_end) in enumerate(report['folds']):
+            self.stdout.write(f'Fold {fold}: train before {train_end}, test {test_start} to {test_end} (exclusive)')
+
+        self.stdout.write('')
+        for result in report['results']:
+            self.stdout.write(
+                f'{self.describe(result["params"], grid)} fold {result["fold"]}: '
+                f'{result["training_samples"]} train / {result["test_samples"]} test rows, '
+                f'fit {result["fit_seconds"] * 1000:.1f} ms, test MSE {result["test_mse"]:.5f}'
+            )
+
+        self.stdout.write('')
+        for rank, entry in enumerate(report['summary'], start=1):
+            self.stdout.write(
+                f'{rank}. {self.describe(entry["params"], grid)}: '
+                f'test MSE {entry["mean_test_mse"]:.5f} +/- {entry["std_test_mse"]:.5f}, '
+                f'mean fit {entry["mean_fit_seconds"] * 1000:.1f} ms'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2, default=str)
+            self.stdout.write(f'Wrote results to {options["output"]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Evaluated {len(report["summary"])} parameter sets on {len(report["folds"])} folds'
+        ))
+
+    def describe(self, params, grid):
+        """Shows only the parameters the grid varies."""
+        varied = {name: params[name] for name in sorted(grid)}
+        return json.dumps(varied) if varied else 'defaults'
@@ -1,38 +1,84 @@
-from django.core.management.base import BaseCommand
-from django.db import connection
-from backend.apps.weather.models import Location
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from backend.apps.weather.models import Station
+from data.data_version import CREATE_TABLE_SQL, WEATHER_DATA, bump_sql
+from data.stations import OBSERVATIONS, STATION_TABLES, link_sql
+from data.summaries import refresh_sql
 import pandas as pd
 import os
 
 class Command(BaseCommand):
-    help = 'Import weather station locations from the CSV file'
+    help = 'Import weather stations in bulk and link observations and predictions to them'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv_path', nargs='?',
+            help='NOAA CSV to take station coordinates from; without it stations are '
+                 'taken from the observation and prediction tables'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Stations written per INSERT statement'
+        )
+
+    def handle(self, *args, **options):
         try:
-            # Get the path to the CSV file
-            script_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))))
-            csv_path = os.path.join(script_dir, 'data', 'climate_data2020_2024.csv')
-            
-            # Read the CSV file
-            df = pd.read_csv(csv_path)
-            
-            # Get unique locations
-            locations = df[['NAME', 'LATITUDE', 'LONGITUDE']].drop_duplicates()
-            
-            # Create or update locations
-            for _, row in locations.iterrows():
-                if pd.notna(row['NAME']) and pd.notna(row['LATITUDE']) and pd.notna(row['LONGITUDE']):
-                    Location.objects.update_or_create(
-                        name=row['NAME'],
-                        defaults={
-                            'latitude': float(row['LATITUDE']),
-                            'longitude': float(row['LONGITUDE'])
-                        }
+            with transaction.atomic():
+                if options['csv_path']:
+                    stations = self.read_stations(options['csv_path'])
+                    Station.objects.bulk_create(
+                        [
+                            Station(name=name, latitude=latitude, longitude=longitude)
+                            for name, latitude, longitude in stations.itertuples(index=False)
+                        ],
+                        batch_size=options['batch_size'],
+                        update_conflicts=True,
+                        unique_fields=['name'],
+                        update_fields=['latitude', 'longitude'],
                     )
-            
-            self.stdout.write(self.style.SUCCESS(f'Successfully imported {len(locations)} locations'))
-            
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error importing locations: {str(e)}'))
-            self.stdout.write(self.style.ERROR(f'Error details: {str(e.__class__.__name__)}'))
-            self.stdout.write(self.style.ERROR(f'Attempted path: {csv_path}')) 
\ No newline at end of file
+                    self.stdout.write(f'Imported {len(stations)} stations from {options["csv_path"]}')
+
+                existing = connection.introspection.table_names()
+                with connection.cursor() as cursor:
+                    for table in STATION_TABLES:
+                        if table not in existing:
+                            continue
+                        for statement in link_sql(table):
+                            cursor.execute(statement)
+                        linked = cursor.rowcount
+                        self.stdout.write(f'Linked {linked} rows of {table} to their stations')
+                        # Newly linked observations belong in the monthly summaries
+                        if table == OBSERVATIONS and linked:
+                            for statement in refresh_sql():
+                                cursor.execute(statement)
+                    # Station responses and the in-memory spatial index are
+                    # rebuilt when the observations version changes
+                    cursor.execute(CREATE_TABLE_SQL)
+                    cursor.execute(bump_sql(WEATHER_DATA))
+        except (DatabaseError, ValueError) as e:
+            raise CommandError(f'Error importing stations: {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully imported {Station.objects.count()} stations'))
+
+    def read_stations(self, csv_path):
+        """
+        Reads one row per station from the CSV, at the coordinates of its last row.
+
+        Only the three station columns are read, in chunks, and each chunk is
+        reduced to its distinct stations before the next one is read.
+
+        Returns:
+            DataFrame: name, latitude and longitude columns
+        """
+        if not os.path.exists(csv_path):
+            raise CommandError(f'Could not find CSV file at {csv_path}')
+        columns = ['NAME', 'LATITUDE', 'LONGITUDE']
+        chunks = [
+            chunk.dropna().drop_duplicates('NAME', keep='last')
+            for chunk in pd.read_csv(
+                csv_path, usecols=columns, chunksize=100000,
+                dtype={'NAME': 'string', 'LATITUDE': 'float64', 'LONGITUDE': 'float64'}
+            )
+        ]
+        stations = pd.concat(chunks).drop_duplicates('NAME', keep='last')
+        return stations[columns]
@@ -1,63 +1,133 @@
-from django.core.management.base import BaseCommand
-from django.db import connection
-from django.utils import timezone
-from backend.apps.weather.models import WeatherData, Location
-from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from backend.apps.weather.models import WeatherData
+from data.clean_data import COLUMNS, read_chunks
+from data.data_version import CREATE_TABLE_SQL, WEATHER_DATA, bump_sql
+from data.stations import OBSERVATIONS, link_sql
+from data.summaries import refresh_sql
+import io
+import os
+
+TABLE = WeatherData._meta.db_table
+STAGING_TABLE = 'weather_import'
+FIELDS = ', '.join(COLUMNS.values())
+MEASURES = ('latitude', 'longitude', 'tmax', 'tmin', 'prcp')
+
+CREATE_STAGING_SQL = f"""
+    CREATE TEMP TABLE {STAGING_TABLE} (
+        seq BIGSERIAL,
+        name VARCHAR(255),
+        date DATE,
+        latitude DOUBLE PRECISION,
+        longitude DOUBLE PRECISION,
+        tmax DOUBLE PRECISION,
+        tmin DOUBLE PRECISION,
+        prcp DOUBLE PRECISION
+    ) ON COMMIT DROP
+"""
+
+# The last row of a batch wins when a (name, date) pair repeats
+LATEST_STAGED = f"""
+    SELECT DISTINCT ON (name, date) {FIELDS}
+    FROM {STAGING_TABLE}
+    ORDER BY name, date, seq DESC
+"""
+
+# Update observations whose values changed, in one statement; reports how
+# many rows changed and their date range
+UPDATE_SQL = f"""
+    WITH changed AS (
+    UPDATE {TABLE} AS t
+    SET {', '.join(f'{column} = s.{column}' for column in MEASURES)}
+    FROM ({LATEST_STAGED}) AS s
+    WHERE t.name = s.name AND t.date = s.date
+      AND ({', '.join(f't.{column}' for column in MEASURES)})
+          IS DISTINCT FROM ({', '.join(f's.{column}' for column in MEASURES)})
+    RETURNING t.date
+    )
+    SELECT COUNT(*), MIN(date), MAX(date) FROM changed
+"""
+
+# Insert observations not stored yet, numbering them after the highest id;
+# reports how many rows were added and their date range
+INSERT_SQL = f"""
+    WITH added AS (
+    INSERT INTO {TABLE} (id, {FIELDS})
+    SELECT (SELECT COALESCE(MAX(id), -1) FROM {TABLE}) + row_number() OVER (ORDER BY s.date, s.name),
+           {', '.join(f's.{column}' for column in COLUMNS.values())}
+    FROM ({LATEST_STAGED}) AS s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM {TABLE} AS t WHERE t.name = s.name AND t.date = s.date
+    )
+    RETURNING date
+    )
+    SELECT COUNT(*), MIN(date), MAX(date) FROM added
+"""
 
 class Command(BaseCommand):
-    help = 'Import weather data from PostgreSQL database'
+    help = 'Import weather observations from the NOAA CSV, inserting new rows and updating changed ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv_path', nargs='?',
+            default=os.path.join('data', 'climate_data2020_2024.csv'),
+            help='CSV file to import (defaults to data/climate_data2020_2024.csv)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100000,
+            help='Rows read, copied and merged at a time'
+        )
 
     def handle(self, *args, **options):
-        # Get data from the climate_data2020_2024 table
-        with connection.cursor() as cursor:
-            # First, get unique locations
-            cursor.execute("""
-                SELECT DISTINCT "LATITUDE", "LONGITUDE"
-                FROM climate_data2020_2024
-            """)
-            locations = cursor.fetchall()
-            
-            # Create or get locations
-            location_map = {}
-            for lat, lon in locations:
-                location, created = Location.objects.get_or_create(
-                    latitude=lat,
-                    longitude=lon,
-                    defaults={'name': f'Weather Station ({lat}, {lon})'}
-                )
-                if created:
-                    self.stdout.write(self.style.SUCCESS(f'Created location: {location.name}'))
-                location_map[(lat, lon)] = location
-
-            # Get weather data
-            cursor.execute("""
-                SELECT "DATE", "TMAX", "TMIN", "PRCP", "LATITUDE", "LONGITUDE"
-                FROM climate_data2020_2024
-                ORDER BY "DATE"
-            """)
-            
-            rows = cursor.fetchall()
-            for row in rows:
-                date_str, tmax, tmin, prcp, lat, lon = row
-                try:
-                    # Convert date string to datetime
-                    date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                    
-                    # Get the location for this data point
-                    location = location_map[(lat, lon)]
-                    
-                    # Create or update WeatherData entry
-                    WeatherData.objects.update_or_create(
-                        date=date,
-                        location=location,
-                        defaults={
-                            'tmax': tmax,
-                            'tmin': tmin,
-                            'prcp': prcp,
-                            'conditions': 'Unknown'  # We don't have conditions in the source data
-                        }
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        if not os.path.exists(options['csv_path']):
+            raise CommandError(f'Could not find CSV file at {options["csv_path"]}')
+
+        read = inserted = updated = 0
+        touched = []
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                # Ids are assigned from MAX(id), so keep other writers out until commit
+                cursor.execute(f'LOCK TABLE {TABLE} IN SHARE ROW EXCLUSIVE MODE')
+                cursor.execute(CREATE_STAGING_SQL)
+
+                for chunk in read_chunks(options['csv_path'], options['batch_size']):
+                    cursor.execute(f'TRUNCATE {STAGING_TABLE}')
+                    buffer = io.StringIO()
+                    chunk.to_csv(buffer, header=False, index=False, date_format='%Y-%m-%d')
+                    buffer.seek(0)
+                    cursor.copy_expert(
+                        f'COPY {STAGING_TABLE} ({FIELDS}) FROM STDIN WITH (FORMAT csv)', buffer
                     )
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f'Error processing row {row}: {str(e)}'))
+                    # Temporary tables are never auto-analyzed; the merge plans need row counts
+                    cursor.execute(f'ANALYZE {STAGING_TABLE}')
+
+                    cursor.execute(UPDATE_SQL)
+                    count, first, last = cursor.fetchone()
+                    updated += count
+                    touched += [first, last] if count else []
+                    cursor.execute(INSERT_SQL)
+                    count, first, last = cursor.fetchone()
+                    inserted += count
+                    touched += [first, last] if count else []
+                    read += len(chunk)
+                    self.stdout.write(f'Read {read} rows: {inserted} inserted, {updated} updated')
+
+                # Link new rows to their stations, recompute the monthly
+                # summaries of the changed dates and invalidate cached
+                # responses built from the old data
+                if inserted or updated:
+                    for statement in link_sql(OBSERVATIONS):
+                        cursor.execute(statement)
+                    for statement in refresh_sql(min(touched), max(touched)):
+                        cursor.execute(statement)
+                    cursor.execute(CREATE_TABLE_SQL)
+                    cursor.execute(bump_sql(WEATHER_DATA))
+        except (DatabaseError, ValueError) as e:
+            raise CommandError(f'Importing weather data failed: {e}')
 
-        self.stdout.write(self.style.SUCCESS('Successfully imported weather data')) 
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully imported weather data: {inserted} inserted, {updated} updated, '
+            f'{read - inserted - updated} unchanged'
+        ))
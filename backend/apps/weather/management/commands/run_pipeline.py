@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from backend.apps.weather.training import get_or_train_model
+from backend.apps.weather.load_db import insert_ml_predictions
+
+class Command(BaseCommand):
+    help = 'Train (or load) the model and write its predictions to ml_predictions in process'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retrain', action='store_true',
+            help='Train a new model even if a saved model matches the current data'
+        )
+        parser.add_argument(
+            '--estimator', choices=('lstsq', 'ridge', 'keras'),
+            help='Estimator backend to train (defaults to the training hyperparameters)'
+        )
+        parser.add_argument(
+            '--epochs', type=int,
+            help='Number of training epochs (defaults to the training hyperparameters)'
+        )
+
+    def handle(self, *args, **options):
+        hyperparameters = {}
+        if options['estimator'] is not None:
+            hyperparameters['estimator'] = options['estimator']
+        if options['epochs'] is not None:
+            hyperparameters['epochs'] = options['epochs']
+
+        self.stdout.write('Loading observations and building features...')
+        try:
+            entry, metrics = get_or_train_model(hyperparameters, retrain=options['retrain'])
+        except Exception as e:
+            raise CommandError(f'Training failed: {e}')
+        self.stdout.write(
+            f'Model {entry.key}: {metrics["total_samples"]} samples from '
+            f'{metrics["raw_data_count"]} observations, test loss {metrics["test_loss"]:.4f}'
+        )
+
+        self.stdout.write('Writing predictions...')
+        try:
+            result = insert_ml_predictions(metrics)
+        except Exception as e:
+            raise CommandError(f'Writing predictions failed: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully wrote {result["written"]} predictions '
+            f'({result["rejected"]} rejected)'
+        ))
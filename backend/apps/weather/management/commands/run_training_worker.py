@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from backend.apps.weather.jobs import STALE_AFTER, claim_next_job, reclaim_stale_jobs, run_job
+from backend.apps.weather.models import TrainingJob
+import time
+
+class Command(BaseCommand):
+    help = 'Run queued model training jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval', type=float, default=5.0,
+            help='Seconds to wait between checks of an empty queue'
+        )
+        parser.add_argument(
+            '--stale-after', type=float, default=STALE_AFTER,
+            help='Seconds without a heartbeat after which a running job is marked failed'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Run the jobs already queued and exit instead of waiting for more'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Waiting for training jobs...')
+        while True:
+            reclaimed = reclaim_stale_jobs(options['stale_after'])
+            if reclaimed:
+                self.stdout.write(self.style.WARNING(
+                    f'Marked {reclaimed} running job(s) failed after their worker stopped responding'
+                ))
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(f'Running training job {job.pk}')
+            job = run_job(job)
+            if job.status == TrainingJob.SUCCEEDED:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Job {job.pk} finished: model {job.model_key}, '
+                    f'{job.predictions_written} predictions written'
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f'Job {job.pk} failed: {job.message}'))
@@ -0,0 +1,40 @@
+# Indexes backing the filter and keyset pagination parameters of get_raw_data.
+# climate_data2020_2024 is unmanaged, so the indexes are created with raw SQL.
+# On a fresh database the table does not exist until the data is loaded, so
+# the indexes are skipped here; optimize_weather_table creates them later.
+
+from django.db import migrations
+
+# The observations table; a literal so the migration does not depend on the data package
+OBSERVATIONS = 'climate_data2020_2024'
+
+INDEXES = (
+    ('climate_data_date_id_idx', '(date, id)'),
+    ('climate_data_name_date_id_idx', '(name, date, id)'),
+    ('climate_data_lat_lon_idx', '(latitude, longitude)'),
+)
+
+
+def create_indexes(apps, schema_editor):
+    if OBSERVATIONS not in schema_editor.connection.introspection.table_names():
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for name, columns in INDEXES:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {OBSERVATIONS} {columns}")
+
+
+def drop_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for name, _ in INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0002_weather_data_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ML_Predictions',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('day', models.IntegerField()),
+                ('date', models.DateField()),
+                ('predicted_precip', models.FloatField()),
+                ('predicted_temp_max', models.FloatField()),
+                ('predicted_temp_min', models.FloatField()),
+                ('actual_precip', models.FloatField()),
+                ('actual_temp_max', models.FloatField()),
+                ('actual_temp_min', models.FloatField()),
+            ],
+            options={
+                'db_table': 'ml_predictions',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TrainingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], db_index=True, default='queued', max_length=16)),
+                ('hyperparameters', models.JSONField(blank=True, default=dict)),
+                ('retrain', models.BooleanField(default=False)),
+                ('epoch', models.IntegerField(default=0)),
+                ('total_epochs', models.IntegerField(null=True)),
+                ('loss', models.FloatField(null=True)),
+                ('model_key', models.CharField(blank=True, max_length=64)),
+                ('predictions_written', models.IntegerField(default=0)),
+                ('message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(null=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'training_jobs',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
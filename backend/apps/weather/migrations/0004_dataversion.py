@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:11
+#
+# The loaders create data_versions themselves if they run before this
+# migration, so the table is created with IF NOT EXISTS.
+
+from django.db import migrations, models
+
+from data.data_version import CREATE_TABLE_SQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0003_trainingjob'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='DataVersion',
+                    fields=[
+                        ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                        ('version', models.BigIntegerField()),
+                        ('updated_at', models.DateTimeField()),
+                    ],
+                    options={
+                        'db_table': 'data_versions',
+                    },
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql=CREATE_TABLE_SQL,
+                    reverse_sql="DROP TABLE IF EXISTS data_versions",
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:19
+#
+# The loaders create stations themselves if they run before this migration,
+# so the table is created with IF NOT EXISTS. The observation and prediction
+# tables are unmanaged, so their station_id columns are added and filled with
+# the same SQL the loaders use.
+
+from django.db import migrations, models
+
+from data.stations import CREATE_TABLE_SQL, STATION_TABLES, link_sql
+
+
+def link_stations(apps, schema_editor):
+    existing = schema_editor.connection.introspection.table_names()
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        for table in STATION_TABLES:
+            if table in existing:
+                for statement in link_sql(table):
+                    cursor.execute(statement)
+
+
+def unlink_stations(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table in STATION_TABLES:
+            cursor.execute(f"ALTER TABLE IF EXISTS {table} DROP COLUMN IF EXISTS station_id")
+        cursor.execute("DROP TABLE IF EXISTS stations")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0004_dataversion'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Station',
+                    fields=[
+                        ('id', models.AutoField(primary_key=True, serialize=False)),
+                        ('name', models.CharField(max_length=255, unique=True)),
+                        ('latitude', models.FloatField()),
+                        ('longitude', models.FloatField()),
+                    ],
+                    options={
+                        'db_table': 'stations',
+                    },
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(link_stations, unlink_stations),
+            ],
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:21
+#
+# The loaders create and refresh station_monthly_summary themselves if they
+# run before this migration, so the table is created with IF NOT EXISTS and
+# filled with the same SQL the loaders use.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from data.stations import OBSERVATIONS
+from data.summaries import CREATE_TABLE_SQL, SUMMARY_TABLE, refresh_sql
+
+
+def build_summaries(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        if OBSERVATIONS not in schema_editor.connection.introspection.table_names():
+            cursor.execute(CREATE_TABLE_SQL)
+            return
+        for statement in refresh_sql():
+            cursor.execute(statement)
+
+
+def drop_summaries(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {SUMMARY_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0005_station'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='StationMonthlySummary',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('month', models.DateField()),
+                        ('observations', models.IntegerField()),
+                        ('tmax_sum', models.FloatField(null=True)),
+                        ('tmax_count', models.IntegerField()),
+                        ('tmin_sum', models.FloatField(null=True)),
+                        ('tmin_count', models.IntegerField()),
+                        ('prcp_sum', models.FloatField(null=True)),
+                        ('prcp_count', models.IntegerField()),
+                        ('station', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='monthly_summaries', to='weather.station')),
+                    ],
+                    options={
+                        'db_table': 'station_monthly_summary',
+                        'constraints': [models.UniqueConstraint(fields=('station', 'month'), name='station_monthly_summary_station_id_month_key')],
+                    },
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(build_summaries, drop_summaries),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0006_stationmonthlysummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainingjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -9,12 +9,43 @@
     database tables and are set to be unmanaged by Django.
 
     Models:
+        Station: Weather stations, keyed by an integer id
         WeatherData: Stores historical weather data from climate stations
         ML_Predictions: Stores machine learning predictions and actual weather data
+        StationMonthlySummary: Per-station monthly rollups of the observations
+        TrainingJob: Queued and completed background model training runs
+        DataVersion: Change counters bumped by the data loaders
 """
 
 from django.db import models
 
+class Station(models.Model):
+    """
+    Model representing a weather station.
+
+    Observations and predictions reference their station by this model's
+    integer id. The loaders add new stations and link new rows to them
+    (see data/stations.py), and the import_locations management command
+    refreshes station coordinates in bulk.
+
+    Fields:
+        id (AutoField): Primary key, automatically generated
+        name (CharField): Unique name of the station
+        latitude (FloatField): Station's latitude coordinate
+        longitude (FloatField): Station's longitude coordinate
+    """
+
+    id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=255, unique=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    class Meta:
+        db_table = 'stations'
+
+    def __str__(self):
+        return self.name
+
 class WeatherData(models.Model):
     """
     Model representing historical weather data from climate stations.
@@ -27,6 +58,7 @@ class WeatherData(models.Model):
         id (AutoField): Primary key, automatically generated
         date (DateField): Date of the weather measurement
         name (CharField): Name of the weather station
+        station (ForeignKey): The weather station (nullable until linked)
         latitude (FloatField): Station's latitude coordinate
         longitude (FloatField): Station's longitude coordinate
         tmax (FloatField): Maximum temperature for the day (nullable)
@@ -37,6 +69,9 @@ class WeatherData(models.Model):
     id = models.AutoField(primary_key=True)
     date = models.DateField()
     name = models.CharField(max_length=255)
+    station = models.ForeignKey(
+        Station, null=True, on_delete=models.DO_NOTHING, related_name='observations'
+    )
     latitude = models.FloatField()
     longitude = models.FloatField()
     tmax = models.FloatField(null=True)
@@ -59,6 +94,7 @@ class ML_Predictions(models.Model):
 
     Fields:
         name (CharField): Name of the weather station
+        station (ForeignKey): The weather station (nullable until linked)
         latitude (FloatField): Station's latitude coordinate
         longitude (FloatField): Station's longitude coordinate
         year (IntegerField): Year component of the date
@@ -74,6 +110,9 @@ class ML_Predictions(models.Model):
     """
 
     name = models.CharField(max_length=255)
+    station = models.ForeignKey(
+        Station, null=True, on_delete=models.DO_NOTHING, related_name='predictions'
+    )
     latitude = models.FloatField()
     longitude = models.FloatField()
     year = models.IntegerField()
@@ -92,5 +131,123 @@ class ML_Predictions(models.Model):
         managed = False
     
     def __str__(self):
-        return f"{self.name} - {self.date}" 
+        return f"{self.name} - {self.date}"
+
+class TrainingJob(models.Model):
+    """
+    Model representing a background model training run.
+
+    Jobs are created by the training endpoint and picked up by the
+    run_training_worker management command, which records progress on the
+    row as training proceeds. Unlike the tables above, this table is
+    managed by Django.
+
+    Fields:
+        status (CharField): queued, running, succeeded or failed
+        hyperparameters (JSONField): Overrides for the training hyperparameters
+        retrain (BooleanField): Train even if a saved model matches the data
+        epoch (IntegerField): Last completed epoch
+        total_epochs (IntegerField): Number of epochs the run will train for
+        loss (FloatField): Training loss after the last completed epoch
+        model_key (CharField): Registry key of the resulting model
+        predictions_written (IntegerField): Rows written to ml_predictions
+        message (TextField): Error description for failed jobs
+        created_at (DateTimeField): When the job was queued
+        started_at (DateTimeField): When a worker picked the job up
+        heartbeat_at (DateTimeField): Last time the worker running the job
+            reported that it is alive
+        finished_at (DateTimeField): When the job succeeded or failed
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED, db_index=True)
+    hyperparameters = models.JSONField(default=dict, blank=True)
+    retrain = models.BooleanField(default=False)
+    epoch = models.IntegerField(default=0)
+    total_epochs = models.IntegerField(null=True)
+    loss = models.FloatField(null=True)
+    model_key = models.CharField(max_length=64, blank=True)
+    predictions_written = models.IntegerField(default=0)
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    heartbeat_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
 
+    class Meta:
+        db_table = 'training_jobs'
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"Training job {self.pk} ({self.status})"
+
+class DataVersion(models.Model):
+    """
+    Model representing the change counter of a dataset.
+
+    The loaders increment a dataset's counter whenever they write to its
+    table (see data/data_version.py); the response cache includes the
+    counters in its keys so cached responses expire when the data changes.
+
+    Fields:
+        name (CharField): Dataset name, e.g. weather_data or ml_predictions
+        version (BigIntegerField): Number of loads since the counter was created
+        updated_at (DateTimeField): When the counter was last incremented
+    """
+
+    name = models.CharField(max_length=64, primary_key=True)
+    version = models.BigIntegerField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'data_versions'
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+class StationMonthlySummary(models.Model):
+    """
+    Model representing one station's observations rolled up over a month.
+
+    The rows are maintained in SQL by the loaders, which recompute the
+    months their new rows fall in (see data/summaries.py). Sums and counts
+    are stored instead of means so any set of months combines exactly.
+
+    Fields:
+        station (ForeignKey): The weather station
+        month (DateField): First day of the month
+        observations (IntegerField): Number of observations in the month
+        tmax_sum, tmin_sum, prcp_sum (FloatField): Sums of the non-null values
+        tmax_count, tmin_count, prcp_count (IntegerField): Number of non-null values
+    """
+
+    station = models.ForeignKey(Station, on_delete=models.DO_NOTHING, related_name='monthly_summaries')
+    month = models.DateField()
+    observations = models.IntegerField()
+    tmax_sum = models.FloatField(null=True)
+    tmax_count = models.IntegerField()
+    tmin_sum = models.FloatField(null=True)
+    tmin_count = models.IntegerField()
+    prcp_sum = models.FloatField(null=True)
+    prcp_count = models.IntegerField()
+
+    class Meta:
+        db_table = 'station_monthly_summary'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['station', 'month'], name='station_monthly_summary_station_id_month_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.station_id} - {self.month:%Y-%m}"
@@ -0,0 +1,140 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Fast JSON serialization for the Weather Prediction application.
+
+    JsonResponse encodes with the standard library and DjangoJSONEncoder,
+    which spends most of the time of the large data endpoints in Python
+    calls per value. This module encodes with orjson when it is installed,
+    which handles dates, numpy arrays and numpy scalars natively, and falls
+    back to the standard library otherwise. Both backends write compact
+    JSON with ISO dates, so clients see the same document either way.
+
+    It also builds the "columns" response shape, where a block of rows is
+    sent as one array per field instead of a list of objects repeating
+    every field name.
+
+    Configured with the JSON_SERIALIZER setting: "orjson" (default) or
+    "json". orjson is an optional dependency; when it is not installed the
+    standard library is used whatever the setting says.
+"""
+
+import json
+import numpy as np
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from .filters import FilterError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Response shapes accepted by the ?shape= query parameter
+RESPONSE_SHAPES = ("records", "columns")
+
+class NumpyJSONEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder that also encodes numpy arrays and scalars."""
+
+    def default(self, o):
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        if isinstance(o, np.generic):
+            return o.item()
+        return super().default(o)
+
+def dumps_json(data):
+    """Encodes data with the standard library."""
+    return json.dumps(data, cls=NumpyJSONEncoder, separators=(",", ":")).encode()
+
+def dumps_orjson(data):
+    """Encodes data with orjson."""
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+# Serializer backends by setting name
+SERIALIZERS = {
+    "json": dumps_json,
+    "orjson": dumps_orjson,
+}
+
+def dumps(data):
+    """
+    Encodes data as JSON with the configured serializer.
+
+    Args:
+        data: Dicts, lists, strings, numbers, dates and numpy arrays
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    name = getattr(settings, "JSON_SERIALIZER", "orjson")
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown JSON_SERIALIZER {name!r}, expected one of {', '.join(SERIALIZERS)}")
+    if orjson is None:
+        name = "json"
+    return SERIALIZERS[name](data)
+
+class FastJsonResponse(HttpResponse):
+    """
+    An HttpResponse holding data encoded by dumps().
+
+    Used in place of JsonResponse by the endpoints returning large bodies.
+    """
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data), **kwargs)
+
+def parse_shape(value):
+    """
+    Validates the ?shape= query parameter.
+
+    Args:
+        value (str): Parameter value, or None for the default
+
+    Returns:
+        str: "records" or "columns"
+
+    Raises:
+        FilterError: If the shape is not supported
+    """
+    shape = value or "records"
+    if shape not in RESPONSE_SHAPES:
+        raise FilterError(f"shape must be one of: {', '.join(RESPONSE_SHAPES)}")
+    return shape
+
+def to_columns(rows, fields):
+    """
+    Transposes rows into one list per field.
+
+    Args:
+        rows (list): Tuples of values in the same order as fields
+        fields (tuple): Names of the values in each row
+
+    Returns:
+        dict: Field name to the list of its values, empty lists without rows
+    """
+    if not rows:
+        return {field: [] for field in fields}
+    return dict(zip(fields, map(list, zip(*rows))))
+
+def to_records(rows, fields):
+    """
+    Turns rows into one dict per row.
+
+    Args:
+        rows (list): Tuples of values in the same order as fields
+        fields (tuple): Names of the values in each row
+
+    Returns:
+        list: Dicts of field name to value
+    """
+    return [dict(zip(fields, row)) for row in rows]
+
+# Row builders for each response shape
+SHAPES = {
+    "records": to_records,
+    "columns": to_columns,
+}
@@ -0,0 +1,219 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Spatial index over the weather stations for the Weather Prediction application.
+
+    Stations are bucketed into a regular latitude/longitude grid held in
+    memory, built once per process from the stations table and rebuilt only
+    when new observations (and so possibly new stations) are loaded. Lookups
+    never touch the observation rows:
+    - nearest: the k stations closest to a point by great-circle distance,
+      searching rings of grid cells outward until no unsearched cell can
+      hold a closer station
+    - within: the stations inside a bounding box, reading only the cells
+      the box overlaps
+"""
+
+import math
+import time
+import numpy as np
+from .cache import data_versions
+from .models import Station
+from data.data_version import WEATHER_DATA
+
+EARTH_RADIUS_KM = 6371.0
+
+# Size of a grid cell in degrees; about 55 km of latitude
+CELL_DEGREES = 0.5
+
+# Largest number of neighbours a client may request
+MAX_NEIGHBORS = 100
+
+# Seconds between checks of the weather_data version for newly loaded stations
+REFRESH_INTERVAL = 30.0
+
+def haversine_km(lat, lon, latitudes, longitudes):
+    """
+    Great-circle distances from one point to many.
+
+    Args:
+        lat, lon (float): The point, in degrees
+        latitudes, longitudes (numpy array): The other points, in degrees
+
+    Returns:
+        numpy array: Distances in kilometres
+    """
+    lat, lon = math.radians(lat), math.radians(lon)
+    latitudes, longitudes = np.radians(latitudes), np.radians(longitudes)
+    a = (
+        np.sin((latitudes - lat) / 2) ** 2
+        + math.cos(lat) * np.cos(latitudes) * np.sin((longitudes - lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+class StationIndex:
+    """
+    Grid index over station coordinates.
+
+    Stations are sorted by grid cell, so the stations of a run of cells in
+    one grid row are a contiguous slice found with a binary search.
+    """
+
+    def __init__(self, names, latitudes, longitudes, cell_degrees=CELL_DEGREES):
+        """
+        Args:
+            names (list): Station names
+            latitudes, longitudes (list): Station coordinates in degrees
+            cell_degrees (float): Size of a grid cell in degrees
+        """
+        self.cell_degrees = cell_degrees
+        self.columns = int(math.ceil(360 / cell_degrees)) + 1
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        rows, cols = self.cell(latitudes, longitudes)
+        keys = rows * self.columns + cols
+        order = np.argsort(keys, kind="stable")
+
+        self.names = np.asarray(names, dtype=object)[order]
+        self.latitudes = latitudes[order]
+        self.longitudes = longitudes[order]
+        self.keys = keys[order]
+        # Alphabetical rank of every station, to sort results by name
+        self.name_rank = np.argsort(np.argsort(self.names.astype(str), kind="stable"))
+        self.row_bounds = (int(rows.min()), int(rows.max())) if len(rows) else (0, -1)
+        self.col_bounds = (int(cols.min()), int(cols.max())) if len(cols) else (0, -1)
+
+    @classmethod
+    def from_stations(cls):
+        """Builds the index from the stations table."""
+        stations = list(Station.objects.values_list('name', 'latitude', 'longitude'))
+        return cls(
+            [name for name, _, _ in stations],
+            [lat for _, lat, _ in stations],
+            [lon for _, _, lon in stations],
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def cell(self, latitudes, longitudes):
+        """Grid row and column of coordinates in degrees."""
+        rows = np.floor((np.asarray(latitudes) + 90) / self.cell_degrees).astype(np.int64)
+        cols = np.floor((np.asarray(longitudes) + 180) / self.cell_degrees).astype(np.int64)
+        return rows, cols
+
+    def in_cells(self, row_low, row_high, col_low, col_high):
+        """
+        Finds the stations in a rectangle of grid cells.
+
+        Returns:
+            numpy array: Positions of the stations in the index
+        """
+        rows = np.arange(max(row_low, self.row_bounds[0]), min(row_high, self.row_bounds[1]) + 1)
+        if not len(rows):
+            return np.empty(0, dtype=np.int64)
+        starts = np.searchsorted(self.keys, rows * self.columns + col_low, side="left")
+        ends = np.searchsorted(self.keys, rows * self.columns + col_high, side="right")
+        # Expand the per-row [start, end) slices into one array of positions
+        counts = ends - starts
+        return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+    def unsearched_distance_km(self, lat, lon, row_low, row_high, col_low, col_high):
+        """
+        Lower bound of the distance from a point to any cell outside a rectangle.
+
+        Returns:
+            float: Kilometres, or infinity if the rectangle covers every station
+        """
+        if (row_low <= self.row_bounds[0] and row_high >= self.row_bounds[1]
+                and col_low <= self.col_bounds[0] and col_high >= self.col_bounds[1]):
+            return math.inf
+        south = lat - (row_low * self.cell_degrees - 90)
+        north = ((row_high + 1) * self.cell_degrees - 90) - lat
+        west = lon - (col_low * self.cell_degrees - 180)
+        east = ((col_high + 1) * self.cell_degrees - 180) - lon
+        # Along a meridian the distance is the latitude difference; to a
+        # meridian it is the distance to that great circle
+        bounds = [math.radians(min(south, north))]
+        for degrees in (west, east):
+            bounds.append(math.asin(math.cos(math.radians(lat)) * math.sin(math.radians(min(degrees, 90)))))
+        return EARTH_RADIUS_KM * min(bounds)
+
+    def nearest(self, lat, lon, k):
+        """
+        Finds the k stations closest to a point.
+
+        Args:
+            lat, lon (float): The point, in degrees
+            k (int): Number of stations to return
+
+        Returns:
+            list: (position in the index, distance in km) pairs, closest first
+        """
+        k = min(k, len(self))
+        if k == 0:
+            return []
+        (row,), (col,) = self.cell([lat], [lon])
+        ring = 0
+        while True:
+            bounds = (row - ring, row + ring, col - ring, col + ring)
+            candidates = self.in_cells(*bounds)
+            if len(candidates) >= k:
+                distances = haversine_km(lat, lon, self.latitudes[candidates], self.longitudes[candidates])
+                closest = np.argpartition(distances, k - 1)[:k]
+                closest = closest[np.argsort(distances[closest], kind="stable")]
+                if distances[closest[-1]] <= self.unsearched_distance_km(lat, lon, *bounds):
+                    return list(zip(candidates[closest].tolist(), distances[closest].tolist()))
+            ring += 1
+
+    def within(self, min_lon, min_lat, max_lon, max_lat):
+        """
+        Finds the stations inside a bounding box.
+
+        Returns:
+            numpy array: Positions of the stations in the index, sorted by name
+        """
+        (row_low, row_high), (col_low, col_high) = self.cell([min_lat, max_lat], [min_lon, max_lon])
+        candidates = self.in_cells(row_low, row_high, col_low, col_high)
+        latitudes, longitudes = self.latitudes[candidates], self.longitudes[candidates]
+        inside = candidates[
+            (latitudes >= min_lat) & (latitudes <= max_lat)
+            & (longitudes >= min_lon) & (longitudes <= max_lon)
+        ]
+        return inside[np.argsort(self.name_rank[inside])]
+
+    def describe(self, position, distance=None):
+        """Station fields returned to clients."""
+        station = {
+            "name": self.names[position],
+            "latitude": float(self.latitudes[position]),
+            "longitude": float(self.longitudes[position]),
+        }
+        if distance is not None:
+            station["distance_km"] = round(distance, 3)
+        return station
+
+_index = None
+_index_version = None
+_checked_at = -math.inf
+
+def get_station_index():
+    """
+    Returns the process-wide station index, rebuilding it after new loads.
+
+    The weather_data version is checked at most every REFRESH_INTERVAL
+    seconds, so most lookups run without a database query.
+
+    Returns:
+        StationIndex: Index over every station in the stations table
+    """
+    global _index, _index_version, _checked_at
+    now = time.monotonic()
+    if _index is None or now - _checked_at >= REFRESH_INTERVAL:
+        version = data_versions((WEATHER_DATA,))[WEATHER_DATA]
+        _checked_at = now
+        if _index is None or version != _index_version:
+            _index = StationIndex.from_stations()
+            _index_version = version
+    return _index
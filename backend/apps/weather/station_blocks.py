@@ -0,0 +1,109 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Per-station JSON blocks built by PostgreSQL.
+
+    The prediction endpoint returns rows grouped by station. Instead of
+    loading every row into Python, building a dict per row and grouping them
+    in a loop, the filtered QuerySet is wrapped in a GROUP BY name query that
+    has PostgreSQL aggregate each station's rows, ordered by date, into a
+    single JSON text (json_agg). Python only splices these blocks into the
+    response document, so its cost grows with the number of stations rather
+    than the number of rows, and the blocks can be streamed to the client
+    one station at a time.
+
+    Both response shapes are supported:
+        records: [{"name": ..., "date": ..., ...}, ...]
+        columns: {"date": [...], "predicted_temp_max": [...], ...}
+"""
+
+from django.db import connection
+from .serialization import dumps
+
+# Stations fetched per round-trip when streaming
+STREAM_STATIONS = 4
+
+def station_blocks_sql(queryset, fields, shape):
+    """
+    Builds the query aggregating a QuerySet's rows into one JSON block per station.
+
+    Args:
+        queryset (QuerySet): Filtered rows with name and date columns
+        fields (tuple): Fields included in each block, in output order
+        shape (str): "records" for a list of objects, or "columns" for one
+            array per field ("name" is left out, as it is the block's key)
+
+    Returns:
+        tuple: (sql, params) selecting (name, row count, JSON text) ordered by name
+    """
+    quote = connection.ops.quote_name
+    model = queryset.model
+    columns = {field: model._meta.get_field(field).column for field in dict.fromkeys((*fields, "name", "date"))}
+    inner_sql, params = queryset.values_list(*columns).order_by().query.sql_with_params()
+
+    name = f"rows.{quote(columns['name'])}"
+    order = f"ORDER BY rows.{quote(columns['date'])}"
+    # Blocks are concatenated from compact pieces: json_build_object and
+    # json_agg put spaces between keys, values and elements
+    if shape == "columns":
+        block = "'{' || " + " || ',' || ".join(
+            f"'\"{field}\":' || to_json(array_agg(rows.{quote(columns[field])} {order}))::text"
+            for field in fields if field != "name"
+        ) + " || '}'"
+        record = ""
+    else:
+        block = f"'[' || string_agg(row_to_json(record)::text, ',' {order}) || ']'"
+        record = " CROSS JOIN LATERAL (SELECT {}) AS record".format(
+            ", ".join(f"rows.{quote(columns[field])} AS {quote(field)}" for field in fields)
+        )
+    sql = (
+        f"SELECT {name}, count(*), {block} "
+        f"FROM ({inner_sql}) AS rows{record} GROUP BY {name} ORDER BY {name}"
+    )
+    return sql, params
+
+def fetch_station_blocks(queryset, fields, shape, stream=False):
+    """
+    Runs the station block query.
+
+    Args:
+        queryset (QuerySet): Filtered rows with name and date columns
+        fields (tuple): Fields included in each block, in output order
+        shape (str): "records" or "columns"
+        stream (bool): Read the blocks through a server-side cursor,
+            STREAM_STATIONS at a time, instead of all at once
+
+    Yields:
+        tuple: (station name, row count, JSON text) ordered by station name
+    """
+    sql, params = station_blocks_sql(queryset, fields, shape)
+    with (connection.chunked_cursor() if stream else connection.cursor()) as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(STREAM_STATIONS) if stream else cursor.fetchall()
+            if not rows:
+                break
+            yield from rows
+            if not stream:
+                break
+
+def station_blocks_json(blocks):
+    """
+    Writes station blocks as the prediction endpoint's JSON document.
+
+    Args:
+        blocks (iterable): (station name, row count, JSON text) tuples
+
+    Yields:
+        bytes: Consecutive pieces of the document, one per station, ending
+            with total_samples and raw_data_count
+    """
+    yield b'{"stations":{'
+    total = 0
+    separator = b''
+    for name, count, block in blocks:
+        yield separator + dumps(name) + b':' + block.encode()
+        separator = b','
+        total += count
+    yield b'},"total_samples":%d,"raw_data_count":%d}' % (total, total)
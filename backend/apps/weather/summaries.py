@@ -0,0 +1,86 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Station summaries for the Weather Prediction application.
+
+    Summaries are read from the station_monthly_summary rollup table, which
+    the loaders keep up to date (see data/summaries.py), so a request reads
+    one row per month of the station instead of its observations. Monthly
+    sums and counts are combined into exact means and totals for each month
+    and for each season over the requested range.
+"""
+
+from .models import StationMonthlySummary
+from data.features import season_of
+
+# Season names indexed by data.features.season_of
+SEASONS = ('winter', 'spring', 'summer', 'fall')
+
+# Rollup columns combined into every summary, in storage order
+ROLLUP_FIELDS = (
+    'observations', 'tmax_sum', 'tmax_count', 'tmin_sum', 'tmin_count', 'prcp_sum', 'prcp_count'
+)
+
+def mean(total, count):
+    """Mean of count values summing to total, or None without values."""
+    return total / count if count else None
+
+def describe(totals):
+    """
+    Turns combined rollup sums and counts into the values returned to clients.
+
+    Args:
+        totals (dict): Sums of the ROLLUP_FIELDS over one or more months
+
+    Returns:
+        dict: observations, mean_tmax, mean_tmin, total_prcp and the number
+            of days with each measurement
+    """
+    return {
+        "observations": totals["observations"],
+        "mean_tmax": mean(totals["tmax_sum"], totals["tmax_count"]),
+        "mean_tmin": mean(totals["tmin_sum"], totals["tmin_count"]),
+        "total_prcp": totals["prcp_sum"] if totals["prcp_count"] else None,
+        "tmax_days": totals["tmax_count"],
+        "tmin_days": totals["tmin_count"],
+        "prcp_days": totals["prcp_count"],
+    }
+
+def summarize_station(station, start=None, end=None):
+    """
+    Summarizes a station's observations by month and by season.
+
+    Args:
+        station (Station): The station to summarize
+        start (date): Only include months from the one containing this date
+        end (date): Only include months up to the one containing this date
+
+    Returns:
+        dict: Contains:
+            - monthly: One entry per month (YYYY-MM) with observations
+            - seasonal: One entry per season with observations, combining
+              that season's months across the years in range
+    """
+    months = StationMonthlySummary.objects.filter(station=station)
+    if start is not None:
+        months = months.filter(month__gte=start.replace(day=1))
+    if end is not None:
+        months = months.filter(month__lte=end)
+
+    monthly = []
+    seasons = {}
+    for month, *values in months.order_by('month').values_list('month', *ROLLUP_FIELDS):
+        totals = dict(zip(ROLLUP_FIELDS, (value or 0 for value in values)))
+        monthly.append({"month": f"{month:%Y-%m}", **describe(totals)})
+
+        season = seasons.setdefault(season_of(month.month), dict.fromkeys(('months',) + ROLLUP_FIELDS, 0))
+        season["months"] += 1
+        for field in ROLLUP_FIELDS:
+            season[field] += totals[field]
+
+    seasonal = [
+        {"season": SEASONS[index], "months": seasons[index]["months"], **describe(seasons[index])}
+        for index in sorted(seasons)
+    ]
+    return {"monthly": monthly, "seasonal": seasonal}
@@ -0,0 +1,112 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Shared fixtures for the Weather Prediction application tests.
+
+    The observation and prediction tables are unmanaged, so the test cases
+    that need them create them in the test database with
+    UnmanagedTablesMixin. Tests that train models use TrainingDirsMixin to
+    keep the model registry and feature store in a temporary directory.
+"""
+
+import math
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+import numpy as np
+from django.db import connection
+from django.test import override_settings
+from .. import training
+from ..models import ML_Predictions, WeatherData
+
+class UnmanagedTablesMixin:
+    """Creates the unmanaged tables for the duration of a TestCase class."""
+
+    unmanaged_models = (WeatherData, ML_Predictions)
+
+    @classmethod
+    def setUpClass(cls):
+        # Created before the class-wide transaction, so setUpTestData can use them
+        with connection.schema_editor() as editor:
+            for model in cls.unmanaged_models:
+                editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            for model in cls.unmanaged_models:
+                editor.delete_model(model)
+
+def prediction(name, day=date(2024, 5, 1), value=70.0):
+    """An ML_Predictions row for tests."""
+    return ML_Predictions(
+        name=name, latitude=35.0, longitude=-80.0, year=day.year, month=day.month, day=day.day, date=day,
+        predicted_precip=0.1, predicted_temp_max=value, predicted_temp_min=value - 20,
+        actual_precip=0.0, actual_temp_max=value + 1, actual_temp_min=value - 19,
+    )
+
+def observation(name, day, tmax=70.0, tmin=50.0, prcp=0.0, latitude=35.0, longitude=-80.0):
+    """A WeatherData row for tests."""
+    return WeatherData(
+        name=name, date=day, latitude=latitude, longitude=longitude, tmax=tmax, tmin=tmin, prcp=prcp
+    )
+
+def observation_series(names, start=date(2024, 1, 1), days=60):
+    """Daily WeatherData rows with a smooth seasonal pattern for every station."""
+    rows = []
+    for offset, name in enumerate(names):
+        for day in range(days):
+            wave = math.sin((day + 7 * offset) / 9)
+            rows.append(observation(
+                name, start + timedelta(days=day), tmax=60 + 10 * wave + offset, tmin=40 + 8 * wave,
+                prcp=max(wave, 0.0), latitude=35.0 + offset, longitude=-80.0 - offset
+            ))
+    return rows
+
+def synthetic_columns(stations=3, days=120, seed=0):
+    """
+    Typed columns of daily observations for several stations, in the form
+    features.build_features takes, with each day's weather following the
+    day before plus noise.
+    """
+    rng = np.random.default_rng(seed)
+    station_names = np.array([f"STATION {i}" for i in range(stations)])
+    station = np.repeat(np.arange(stations, dtype=np.int32), days)
+    day = np.tile(np.arange(days), stations)
+    base = 60 + 5 * station + 10 * np.sin(day / 20)
+    tmax = base + rng.normal(0, 2, len(day))
+    return station_names, {
+        "station": station,
+        "date": np.datetime64("2023-01-01") + day.astype("timedelta64[D]"),
+        "latitude": (35.0 + 0.5 * station).astype(np.float32),
+        "longitude": (-80.0 - 0.5 * station).astype(np.float32),
+        "prcp": np.abs(rng.normal(0.1, 0.2, len(day))).astype(np.float32),
+        "tmax": tmax.astype(np.float32),
+        "tmin": (tmax - 20 + rng.normal(0, 1, len(day))).astype(np.float32),
+    }
+
+class TrainingDirsMixin:
+    """Keeps the model registry and feature store in a temporary directory."""
+
+    def setUp(self):
+        super().setUp()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        directories = override_settings(
+            MODEL_REGISTRY_DIR=os.path.join(root, "models"), FEATURE_STORE_DIR=os.path.join(root, "features")
+        )
+        directories.enable()
+        self.addCleanup(directories.disable)
+        self.addCleanup(self.reset_training_state)
+        self.reset_training_state()
+
+    @staticmethod
+    def reset_training_state():
+        """Drops the process-wide registry, feature store and fingerprint."""
+        training._registry = None
+        training._feature_store = None
+        training._fingerprint = (None, None)
@@ -0,0 +1,97 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the response cache: content negotiation, keys, ETags and
+    invalidation by data version.
+"""
+
+from datetime import date
+from django.db import connection
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase
+from ..cache import accepted_encodings, cache_key, choose_encoding, get_backend
+from ..models import ML_Predictions
+from .helpers import UnmanagedTablesMixin, prediction
+from data.data_version import ML_PREDICTIONS, bump_sql
+
+class EncodingTests(SimpleTestCase):
+    """Accept-Encoding is parsed with its q-values."""
+
+    def test_parses_codings_and_qualities(self):
+        self.assertEqual(
+            accepted_encodings("GZIP;q=0.5, br, identity;q=0, x;q=bad"),
+            {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+        )
+
+    def test_chooses_highest_quality(self):
+        self.assertEqual(choose_encoding("gzip, br", ("br", "gzip")), "br")
+        self.assertEqual(choose_encoding("br;q=0.5, gzip", ("br", "gzip")), "gzip")
+        self.assertEqual(choose_encoding("*", ("gzip",)), "gzip")
+
+    def test_refused_codings_are_not_sent(self):
+        self.assertIsNone(choose_encoding("gzip;q=0", ("gzip",)))
+        self.assertIsNone(choose_encoding("*;q=0", ("br", "gzip")))
+        self.assertIsNone(choose_encoding("", ("gzip",)))
+        self.assertEqual(choose_encoding("gzip;q=0, *", ("br", "gzip")), "br")
+
+class CacheKeyTests(SimpleTestCase):
+    """Cache keys depend on the query and the data versions only."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_parameter_order_does_not_matter(self):
+        first = self.factory.get("/api/ml_data/pred/?stations=RALEIGH&start=2024-01-01")
+        second = self.factory.get("/api/ml_data/pred/?start=2024-01-01&stations=RALEIGH")
+        self.assertEqual(cache_key(first, {"ml_predictions": 1}), cache_key(second, {"ml_predictions": 1}))
+
+    def test_query_and_version_change_the_key(self):
+        request = self.factory.get("/api/ml_data/pred/?stations=RALEIGH")
+        other = self.factory.get("/api/ml_data/pred/?stations=CHARLOTTE")
+        self.assertNotEqual(cache_key(request, {"ml_predictions": 1}), cache_key(other, {"ml_predictions": 1}))
+        self.assertNotEqual(cache_key(request, {"ml_predictions": 1}), cache_key(request, {"ml_predictions": 2}))
+
+class CachedEndpointTests(UnmanagedTablesMixin, TestCase):
+    """Responses are cached per query and data version."""
+
+    @classmethod
+    def setUpTestData(cls):
+        ML_Predictions.objects.bulk_create([
+            prediction("RALEIGH DURHAM AIRPORT, NC US"),
+            prediction("WILMINGTON AIRPORT, NC US", date(2024, 5, 2)),
+        ])
+
+    def setUp(self):
+        get_backend().clear()
+        self.client = Client(HTTP_HOST="localhost")
+
+    def test_cache_hit_etag_and_not_modified(self):
+        first = self.client.get("/api/ml_data/pred/", {"stations": "RALEIGH"}, HTTP_ACCEPT_ENCODING="identity")
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertIn("Accept-Encoding", first["Vary"])
+        etag = first["ETag"]
+
+        second = self.client.get("/api/ml_data/pred/", {"stations": "RALEIGH"}, HTTP_ACCEPT_ENCODING="identity")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second["ETag"], etag)
+        self.assertEqual(second.content, first.content)
+
+        not_modified = self.client.get("/api/ml_data/pred/", {"stations": "RALEIGH"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+
+    def test_compressed_only_when_accepted(self):
+        refused = self.client.get("/api/ml_data/pred/", HTTP_ACCEPT_ENCODING="gzip;q=0")
+        self.assertFalse(refused.has_header("Content-Encoding"))
+        self.assertIn("stations", refused.json())
+        accepted = self.client.get("/api/ml_data/pred/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(accepted["Content-Encoding"], "gzip")
+
+    def test_loading_predictions_changes_the_etag(self):
+        etag = self.client.get("/api/ml_data/pred/")["ETag"]
+        with connection.cursor() as cursor:
+            cursor.execute(bump_sql(ML_PREDICTIONS))
+        response = self.client.get("/api/ml_data/pred/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response["X-Cache"], "MISS")
@@ -0,0 +1,92 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the CSV loader in data/clean_data.py, run against the test
+    database.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from unittest import mock
+from django.db import connection
+from django.test import TransactionTestCase
+from ..models import DataVersion
+from data.clean_data import TABLE_NAME, clean_data
+
+HEADER = "STATION,NAME,LATITUDE,LONGITUDE,DATE,PRCP,TMAX,TMIN\n"
+
+class CleanDataTests(TransactionTestCase):
+    """Full loads replace the table; incremental loads append per station."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        database = connection.settings_dict
+        environment = mock.patch.dict(os.environ, {
+            "DB_NAME": database["NAME"], "DB_USER": database["USER"], "DB_PASSWORD": database["PASSWORD"],
+            "DB_HOST": database["HOST"] or "localhost", "DB_PORT": str(database["PORT"] or 5432),
+        })
+        environment.start()
+        self.addCleanup(environment.stop)
+        # Dropped before the flush, which cannot truncate stations while it is referenced
+        self.addCleanup(self.drop_table)
+
+    def drop_table(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME} CASCADE")
+
+    def load(self, rows, incremental=False):
+        path = os.path.join(self.directory, "climate.csv")
+        with open(path, "w") as csv_file:
+            csv_file.write(HEADER)
+            for name, day, tmax in rows:
+                csv_file.write(f'X1,"{name}",35.5,-80.5,{day},0.1,{tmax},40\n')
+        with redirect_stdout(io.StringIO()) as output:
+            clean_data(path, incremental=incremental, chunksize=2)
+        self.assertNotIn("Error", output.getvalue())
+
+    def stored(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id, name, date::text, tmax FROM {TABLE_NAME} ORDER BY id")
+            return cursor.fetchall()
+
+    def version(self):
+        row = DataVersion.objects.filter(name="weather_data").first()
+        return row.version if row else 0
+
+    def test_full_load_replaces_the_table(self):
+        self.load([("RALEIGH, NC US", "2024-01-01", 50), ("DURHAM", "2024-01-01", 51), ("DURHAM", "2024-01-02", 52)])
+        self.assertEqual(self.version(), 1)
+        self.load([("DURHAM", "2024-02-01", 60)])
+        self.assertEqual(self.stored(), [(0, "DURHAM", "2024-02-01", 60.0)])
+        self.assertEqual(self.version(), 2)
+
+    def test_incremental_uses_each_stations_latest_date(self):
+        self.load([
+            ("RALEIGH", "2024-01-01", 50), ("RALEIGH", "2024-01-05", 51), ("DURHAM", "2024-01-02", 52),
+        ])
+        self.load([
+            ("RALEIGH", "2024-01-04", 60),  # already covered for RALEIGH
+            ("RALEIGH", "2024-01-05", 61),
+            ("RALEIGH", "2024-01-06", 62),
+            ("DURHAM", "2024-01-03", 63),  # DURHAM is behind RALEIGH but still gets its late row
+            ("ASHEVILLE", "2023-12-31", 64),  # a new station loads everything
+        ], incremental=True)
+        self.assertEqual(self.stored()[3:], [
+            (3, "RALEIGH", "2024-01-06", 62.0), (4, "DURHAM", "2024-01-03", 63.0), (5, "ASHEVILLE", "2023-12-31", 64.0),
+        ])
+        self.assertEqual(self.version(), 2)
+
+    def test_incremental_without_new_rows_keeps_the_version(self):
+        self.load([("RALEIGH", "2024-01-05", 50)])
+        self.load([("RALEIGH", "2024-01-05", 50)], incremental=True)
+        self.assertEqual(len(self.stored()), 1)
+        self.assertEqual(self.version(), 1)
+
+    def test_incremental_into_a_missing_table_loads_everything(self):
+        self.load([("RALEIGH", "2024-01-05", 50)], incremental=True)
+        self.assertEqual(self.stored(), [(0, "RALEIGH", "2024-01-05", 50.0)])
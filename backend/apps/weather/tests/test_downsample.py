@@ -0,0 +1,91 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for series downsampling and the time series endpoint.
+"""
+
+from datetime import date, timedelta
+import numpy as np
+from django.test import Client, SimpleTestCase, TestCase
+from ..cache import get_backend
+from ..downsample import downsample, lttb, minmax, station_series
+from ..models import WeatherData
+from .helpers import UnmanagedTablesMixin, observation_series
+
+class DownsampleTests(SimpleTestCase):
+    """Series are reduced to at most the requested number of points."""
+
+    def setUp(self):
+        self.x = np.arange(1000, dtype=np.float64)
+        self.y = np.sin(self.x / 25) + np.random.default_rng(0).normal(0, 0.1, 1000)
+
+    def test_lttb_keeps_endpoints_and_point_count(self):
+        kept = lttb(self.x, self.y, 50)
+        self.assertEqual(len(kept), 50)
+        self.assertEqual(kept[0], 0)
+        self.assertEqual(kept[-1], 999)
+        self.assertTrue(np.all(np.diff(kept) > 0))
+
+    def test_lttb_returns_short_series_unchanged(self):
+        np.testing.assert_array_equal(lttb(self.x[:10], self.y[:10], 50), np.arange(10))
+
+    def test_lttb_rejects_fewer_than_three_points(self):
+        with self.assertRaises(ValueError):
+            lttb(self.x, self.y, 2)
+
+    def test_minmax_keeps_extremes(self):
+        kept = minmax(self.x, self.y, 40)
+        self.assertLessEqual(len(kept), 40)
+        self.assertIn(np.argmin(self.y), kept)
+        self.assertIn(np.argmax(self.y), kept)
+
+    def test_downsample_drops_nan(self):
+        y = self.y.copy()
+        y[::3] = np.nan
+        for method in ("lttb", "minmax"):
+            kept = downsample(self.x, y, 30, method)
+            self.assertFalse(np.isnan(y[kept]).any())
+            self.assertLessEqual(len(kept), 30)
+
+    def test_station_series_downsamples_each_station(self):
+        start = date(2020, 1, 1)
+        rows = [
+            (name, start + timedelta(days=day), float(day), float(-day))
+            for name in ("A", "B") for day in range(100)
+        ]
+        series = station_series(rows, ("tmax", "tmin"), 10)
+        self.assertEqual(sorted(series), ["A", "B"])
+        for station in series.values():
+            self.assertEqual(len(station["tmax"]["date"]), 10)
+            self.assertEqual(station["tmax"]["date"][0], "2020-01-01")
+            self.assertEqual(station["tmin"]["value"][-1], -99.0)
+        self.assertEqual(station_series([], ("tmax",), 10), {})
+
+class TimeseriesViewTests(UnmanagedTablesMixin, TestCase):
+    """The time series endpoint downsamples every requested station."""
+
+    @classmethod
+    def setUpTestData(cls):
+        WeatherData.objects.bulk_create(observation_series(["ASHEVILLE", "RALEIGH"], days=200))
+
+    def setUp(self):
+        get_backend().clear()
+        self.client = Client(HTTP_HOST="localhost")
+
+    def test_observations(self):
+        response = self.client.get("/api/timeseries/", {
+            "source": "observations", "station": "RALEIGH", "fields": "tmax", "points": 25, "method": "minmax",
+        })
+        self.assertEqual(response.status_code, 200)
+        stations = response.json()["stations"]
+        self.assertEqual(list(stations), ["RALEIGH"])
+        self.assertEqual(list(stations["RALEIGH"]), ["tmax"])
+        self.assertLessEqual(len(stations["RALEIGH"]["tmax"]["value"]), 25)
+
+    def test_invalid_parameters(self):
+        for params in ({"source": "forecast"}, {"method": "mean"}, {"points": 1}, {"points": "many"}):
+            with self.subTest(params=params):
+                response = self.client.get("/api/timeseries/", params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["status"], "error")
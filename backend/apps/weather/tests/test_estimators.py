@@ -0,0 +1,85 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the estimator backends of data/linear_regression.py and the
+    run_pipeline command that selects them.
+"""
+
+import io
+from unittest import mock
+import numpy as np
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+from sklearn.linear_model import LinearRegression
+from .helpers import synthetic_columns
+from data.features import build_features, drop_incomplete
+from data.linear_regression import LeastSquares, train
+
+class LeastSquaresTests(SimpleTestCase):
+    """The closed-form backend matches scikit-learn's least squares."""
+
+    def test_matches_linear_regression(self):
+        rng = np.random.default_rng(2)
+        X = rng.normal(size=(200, 4))
+        # A column that always sums to one with another, like the one-hot seasons
+        X = np.column_stack([X, 1 - X[:, 0]])
+        y = X[:, :3] @ rng.normal(size=(3, 3)) + rng.normal(0, 0.1, (200, 3))
+        np.testing.assert_allclose(
+            LeastSquares().fit(X, y).predict(X), LinearRegression().fit(X, y).predict(X), atol=1e-8
+        )
+
+class EstimatorBackendTests(SimpleTestCase):
+    """train() fits the backend chosen by the estimator hyperparameter."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.station_names, columns = synthetic_columns()
+        cls.features = drop_incomplete(build_features(**columns))
+
+    def predicted(self, metrics):
+        return np.array([[p["predicted_temp_max"], p["predicted_temp_min"]] for p in metrics["predictions"]])
+
+    def test_lstsq_is_the_unregularized_ridge(self):
+        lstsq = train(self.features, self.station_names)
+        ridge = train(self.features, self.station_names, {"estimator": "ridge", "alpha": 1e-9})
+        self.assertIsInstance(lstsq["model"], LeastSquares)
+        np.testing.assert_allclose(self.predicted(lstsq), self.predicted(ridge), atol=1e-4)
+        heavy = train(self.features, self.station_names, {"estimator": "ridge", "alpha": 1e6})
+        self.assertGreater(heavy["training_loss"], lstsq["training_loss"])
+
+    def test_closed_form_reports_one_epoch(self):
+        calls = []
+        metrics = train(self.features, self.station_names, progress=lambda *args: calls.append(args))
+        self.assertEqual(calls, [(1, 1, metrics["training_loss"])])
+
+    def test_fitted_model_is_reused(self):
+        metrics = train(self.features, self.station_names, {"estimator": "ridge"})
+        fitted = (metrics["model"], metrics["preprocessor"], metrics["output_scaler"])
+        again = train(self.features, self.station_names, {"estimator": "ridge"}, fitted=fitted)
+        self.assertIs(again["model"], metrics["model"])
+        self.assertEqual(again["predictions"], metrics["predictions"])
+
+    def test_unknown_estimator(self):
+        with self.assertRaises(ValueError):
+            train(self.features, self.station_names, {"estimator": "forest"})
+
+class RunPipelineTests(SimpleTestCase):
+    """run_pipeline passes its options through as hyperparameters."""
+
+    @mock.patch("backend.apps.weather.management.commands.run_pipeline.insert_ml_predictions")
+    @mock.patch("backend.apps.weather.management.commands.run_pipeline.get_or_train_model")
+    def test_estimator_option(self, get_or_train_model, insert_ml_predictions):
+        get_or_train_model.return_value = (
+            mock.Mock(key="abc"), {"total_samples": 10, "raw_data_count": 12, "test_loss": 0.5}
+        )
+        insert_ml_predictions.return_value = {"written": 2, "rejected": 0}
+        output = io.StringIO()
+        call_command("run_pipeline", "--estimator", "ridge", "--epochs", "3", stdout=output)
+        get_or_train_model.assert_called_once_with({"estimator": "ridge", "epochs": 3}, retrain=False)
+        self.assertIn("Successfully wrote 2 predictions", output.getvalue())
+
+    def test_unknown_estimator(self):
+        with self.assertRaises(CommandError):
+            call_command("run_pipeline", "--estimator", "forest")
@@ -0,0 +1,134 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for rolling-origin cross-validation and the fold cache.
+"""
+
+import os
+import shutil
+import tempfile
+import numpy as np
+from django.test import SimpleTestCase
+from sklearn.preprocessing import StandardScaler
+from .helpers import synthetic_columns
+from data.evaluation import FoldCache, columns_key, evaluate, parameter_grid, rolling_origin_splits
+
+def days(*values):
+    """datetime64[D] array of ISO dates."""
+    return np.array(values, dtype="datetime64[D]")
+
+class RollingOriginSplitsTests(SimpleTestCase):
+    """Folds test on consecutive windows after everything they train on."""
+
+    def setUp(self):
+        self.dates = np.arange(np.datetime64("2024-01-01"), np.datetime64("2024-04-10"))
+
+    def test_expanding_windows(self):
+        splits = rolling_origin_splits(self.dates, folds=3, horizon=10, gap=2)
+        self.assertEqual(splits, [
+            (np.datetime64("2024-03-09"), np.datetime64("2024-03-11"), np.datetime64("2024-03-21")),
+            (np.datetime64("2024-03-19"), np.datetime64("2024-03-21"), np.datetime64("2024-03-31")),
+            (np.datetime64("2024-03-29"), np.datetime64("2024-03-31"), np.datetime64("2024-04-10")),
+        ])
+
+    def test_no_training_data(self):
+        with self.assertRaises(ValueError):
+            rolling_origin_splits(self.dates, folds=10, horizon=10)
+
+    def test_empty_test_windows_are_left_out(self):
+        dates = np.concatenate([self.dates[:65], self.dates[90:]])
+        splits = rolling_origin_splits(dates, folds=4, horizon=10)
+        # 2024-03-06 to 2024-03-30 has no observations
+        self.assertEqual([str(split[1]) for split in splits], ["2024-03-01", "2024-03-31"])
+
+class ParameterGridTests(SimpleTestCase):
+    """Grids expand into every combination over the defaults."""
+
+    def test_combinations(self):
+        candidates = parameter_grid({"alpha": [0.1, 1.0], "lags": [[1], [1, 7]]})
+        self.assertEqual(len(candidates), 4)
+        self.assertEqual({(c["alpha"], tuple(c["lags"])) for c in candidates},
+                         {(0.1, (1,)), (0.1, (1, 7)), (1.0, (1,)), (1.0, (1, 7))})
+        self.assertEqual(candidates[0]["estimator"], "lstsq")
+
+    def test_rejected_parameters(self):
+        for grid in ({"learning_rate": [0.1]}, {"per_station": [True]}):
+            with self.subTest(grid=grid):
+                with self.assertRaises(ValueError):
+                    parameter_grid(grid)
+
+class FoldCacheTests(SimpleTestCase):
+    """Entries round trip and entries of other data are pruned."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.cache = FoldCache(self.root)
+        self.settings = {"lags": [1], "rolling": None}
+        self.split = tuple(days("2024-03-01", "2024-03-01", "2024-03-11"))
+
+    def save(self, key):
+        scaler = StandardScaler().fit(np.ones((2, 3)))
+        arrays = {name: np.arange(6, dtype=np.float64).reshape(2, 3) for name in FoldCache.ARRAYS}
+        arrays["station_test"] = np.array([0, 1], dtype=np.int32)
+        self.cache.save(key, arrays, scaler)
+
+    def test_round_trip(self):
+        key = self.cache.key("data", self.settings, self.split)
+        self.assertFalse(self.cache.exists(key))
+        self.save(key)
+        self.assertTrue(self.cache.exists(key))
+        arrays, scaler = self.cache.load(key)
+        np.testing.assert_array_equal(arrays["X_train"], np.arange(6).reshape(2, 3))
+        np.testing.assert_array_equal(arrays["station_test"], [0, 1])
+        self.assertIsInstance(scaler, StandardScaler)
+
+    def test_key_depends_on_data_settings_and_split(self):
+        key = self.cache.key("data", self.settings, self.split)
+        self.assertNotEqual(key, self.cache.key("other", self.settings, self.split))
+        self.assertNotEqual(key, self.cache.key("data", {"lags": [1, 2], "rolling": None}, self.split))
+        self.assertNotEqual(key, self.cache.key("data", self.settings, tuple(days("2024-03-02", "2024-03-02", "2024-03-12"))))
+
+    def test_prune_keeps_current_data(self):
+        current = self.cache.key("current", self.settings, self.split)
+        stale = self.cache.key("stale", self.settings, self.split)
+        self.save(current)
+        self.save(stale)
+        os.makedirs(os.path.join(self.root, ".in-progress"))
+        self.assertEqual(self.cache.prune("current"), 1)
+        self.assertTrue(self.cache.exists(current))
+        self.assertFalse(self.cache.exists(stale))
+        self.assertTrue(os.path.isdir(os.path.join(self.root, ".in-progress")))
+        self.assertEqual(FoldCache(os.path.join(self.root, "missing")).prune("current"), 0)
+
+class EvaluateTests(SimpleTestCase):
+    """evaluate scores every parameter set on every fold and reuses cached folds."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.station_names, self.columns = synthetic_columns(stations=3, days=120)
+
+    def run_evaluation(self, columns, grid):
+        return evaluate(columns, self.station_names, grid, folds=3, horizon=15, workers=2, cache_root=self.root)
+
+    def test_sweep(self):
+        report = self.run_evaluation(self.columns, {"estimator": ["lstsq", "ridge"], "lags": [[1], [1, 2]]})
+        self.assertEqual(len(report["folds"]), 3)
+        self.assertEqual(len(report["results"]), 12)
+        self.assertEqual(len(report["prepare_seconds"]), 2)
+        means = [entry["mean_test_mse"] for entry in report["summary"]]
+        self.assertEqual(means, sorted(means))
+        result = report["results"][0]
+        self.assertEqual(result["test_samples"], 45)
+        self.assertEqual(sorted(result["stations"]), list(self.station_names))
+        self.assertEqual(len(os.listdir(self.root)), 6)
+
+    def test_changed_data_prunes_old_folds(self):
+        self.run_evaluation(self.columns, {"alpha": [1.0]})
+        changed = {**self.columns, "tmax": self.columns["tmax"] + 1}
+        self.run_evaluation(changed, {"alpha": [1.0]})
+        entries = os.listdir(self.root)
+        self.assertEqual(len(entries), 3)
+        self.assertTrue(all(entry.startswith(columns_key(changed)) for entry in entries))
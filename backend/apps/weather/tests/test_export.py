@@ -0,0 +1,107 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the Arrow IPC and Parquet export.
+"""
+
+import io
+from datetime import date
+import numpy as np
+from django.test import Client, TestCase
+from ..cache import get_backend
+from ..export import columns_to_bytes, queryset_to_columns
+from ..models import TrainingJob, WeatherData
+from .helpers import UnmanagedTablesMixin, observation
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+class QuerysetToColumnsTests(UnmanagedTablesMixin, TestCase):
+    """QuerySets are read into one typed array per field."""
+
+    @classmethod
+    def setUpTestData(cls):
+        WeatherData.objects.bulk_create([
+            observation("RALEIGH", date(2024, 1, day), tmax=40.0 + day, prcp=None if day == 2 else 0.5)
+            for day in range(1, 8)
+        ])
+        TrainingJob.objects.create(total_epochs=5, loss=0.25)
+        TrainingJob.objects.create()
+
+    def test_types_and_values(self):
+        columns = queryset_to_columns(WeatherData.objects.order_by("date"), ("date", "name", "tmax", "prcp"), chunk_size=3)
+        self.assertEqual(columns["date"].dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(columns["name"].dtype, object)
+        np.testing.assert_array_equal(columns["tmax"], np.arange(41.0, 48.0))
+        self.assertTrue(np.isnan(columns["prcp"][1]))
+        self.assertEqual(str(columns["date"][-1]), "2024-01-07")
+
+    def test_nullable_integers_become_float(self):
+        columns = queryset_to_columns(TrainingJob.objects.order_by("id"), ("id", "total_epochs", "loss"))
+        self.assertEqual(columns["id"].dtype, np.int64)
+        self.assertEqual(columns["total_epochs"].dtype, np.float64)
+        self.assertEqual(columns["total_epochs"][0], 5)
+        self.assertTrue(np.isnan(columns["total_epochs"][1]))
+
+    def test_row_count_changing_after_the_count(self):
+        queryset = WeatherData.objects.order_by("date")
+        for count in (0, 2, 50):
+            queryset.count = lambda count=count: count
+            columns = queryset_to_columns(queryset, ("date", "tmax"), chunk_size=2)
+            self.assertEqual(len(columns["tmax"]), 7)
+            np.testing.assert_array_equal(columns["tmax"], np.arange(41.0, 48.0))
+
+    def test_empty_queryset(self):
+        columns = queryset_to_columns(WeatherData.objects.none(), ("date", "tmax"))
+        self.assertEqual(len(columns["date"]), 0)
+
+class BinaryFormatTests(UnmanagedTablesMixin, TestCase):
+    """Columns are written as Arrow IPC streams and Parquet files."""
+
+    @classmethod
+    def setUpTestData(cls):
+        WeatherData.objects.bulk_create([
+            observation(name, date(2024, 1, day), tmax=50.0 + day)
+            for name in ("ASHEVILLE", "RALEIGH") for day in range(1, 4)
+        ])
+
+    def setUp(self):
+        if pa is None:
+            self.skipTest("pyarrow is not installed")
+        get_backend().clear()
+        self.client = Client(HTTP_HOST="localhost")
+
+    def test_round_trip_with_nulls(self):
+        columns = {
+            "date": np.array(["2024-01-01", "NaT"], dtype="datetime64[D]"),
+            "name": np.array(["A", "B"], dtype=object),
+            "tmax": np.array([1.5, np.nan]),
+        }
+        table = pa.ipc.open_stream(columns_to_bytes(columns, "arrow")).read_all()
+        self.assertEqual(table.column("tmax").to_pylist(), [1.5, None])
+        self.assertEqual(table.column("date").to_pylist(), [date(2024, 1, 1), None])
+        self.assertTrue(pa.types.is_dictionary(table.column("name").type))
+        self.assertEqual(table.column("name").to_pylist(), ["A", "B"])
+
+    def test_raw_data_parquet(self):
+        response = self.client.get("/api/raw-data/", {"format": "parquet", "station": "RALEIGH", "fields": "date,tmax"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/vnd.apache.parquet")
+        self.assertIn('raw_data.parquet', response["Content-Disposition"])
+        table = pq.read_table(io.BytesIO(response.content))
+        self.assertEqual(table.column_names, ["date", "tmax"])
+        self.assertEqual(table.column("tmax").to_pylist(), [51.0, 52.0, 53.0])
+
+    def test_pred_data_arrow(self):
+        response = self.client.get("/api/ml_data/pred/", {"format": "arrow"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(pa.ipc.open_stream(response.content).read_all().num_rows, 0)
+
+    def test_unknown_format(self):
+        response = self.client.get("/api/raw-data/", {"format": "csv"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["status"], "error")
@@ -0,0 +1,120 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the vectorized feature builder.
+"""
+
+from datetime import date
+import numpy as np
+from django.test import SimpleTestCase
+from data.features import (
+    TARGET_COLUMNS, build_features, columns_from_records, columns_from_rows, feature_columns,
+    input_columns, to_datetime64
+)
+
+def sample_columns():
+    """Typed columns of two stations: five consecutive days, and two days around a gap."""
+    days = np.array(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05",
+                     "2024-06-01", "2024-06-03"], dtype="datetime64[D]")
+    return {
+        "station": np.array([0, 0, 0, 0, 0, 1, 1], dtype=np.int32),
+        "date": days,
+        "latitude": np.array([35.0] * 5 + [36.0] * 2, dtype=np.float32),
+        "longitude": np.array([-80.0] * 5 + [-78.0] * 2, dtype=np.float32),
+        "prcp": np.array([0.0, 0.1, 0.2, 0.3, 0.4, 1.0, 2.0], dtype=np.float32),
+        "tmax": np.array([50, 51, 52, 53, 54, 80, 82], dtype=np.float32),
+        "tmin": np.array([30, 31, 32, 33, 34, 60, 62], dtype=np.float32),
+    }
+
+class ColumnsTests(SimpleTestCase):
+    """Rows are converted into typed columns."""
+
+    def test_columns_from_rows(self):
+        rows = [
+            ("RALEIGH", date(2024, 1, 2), 35.9, -78.8, 0.1, 50.0, 30.0),
+            ("ASHEVILLE", date(2024, 1, 1), 35.4, -82.5, 0.0, 45.0, 25.0),
+        ]
+        station_names, columns = columns_from_rows(rows)
+        self.assertEqual(list(station_names), ["ASHEVILLE", "RALEIGH"])
+        np.testing.assert_array_equal(columns["station"], [1, 0])
+        self.assertEqual(columns["date"].dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(columns["tmax"].dtype, np.float32)
+
+    def test_existing_encoding_marks_unknown_stations(self):
+        _, columns = columns_from_rows(
+            [("RALEIGH", "2024-01-01", 0, 0, 0, 0, 0), ("DURHAM", "2024-01-01", 0, 0, 0, 0, 0)],
+            station_names=np.array(["ASHEVILLE", "RALEIGH"], dtype=object)
+        )
+        np.testing.assert_array_equal(columns["station"], [1, -1])
+
+    def test_dates_and_strings_convert_alike(self):
+        np.testing.assert_array_equal(
+            to_datetime64([date(2020, 2, 29), date(1969, 12, 31)]),
+            to_datetime64(["2020-02-29", "1969-12-31"])
+        )
+
+    def test_matches_the_row_by_row_pipeline(self):
+        from data.linear_regression import add_season, split_date_data
+
+        records = {"ML_data": [
+            {"name": "RALEIGH", "date": f"2024-{month:02d}-15", "latitude": 35.9, "longitude": -78.8,
+             "precip": 0.1 * month, "temp_max": 40.0 + month, "temp_min": 20.0 + month}
+            for month in range(1, 13)
+        ]}
+        legacy = add_season(np.array(split_date_data(records), dtype=object))
+        station_names, columns = columns_from_records(records)
+        features = build_features(**columns)
+        np.testing.assert_allclose(features[:, 1:10], legacy[:, 1:10].astype(float), rtol=1e-6)
+
+class FeatureTests(SimpleTestCase):
+    """The feature matrix has the layout train() expects."""
+
+    def setUp(self):
+        self.columns = sample_columns()
+
+    def test_layout_and_lags(self):
+        features = build_features(**self.columns, lags=(1, 2))
+        self.assertEqual(features.shape, (7, len(feature_columns((1, 2)))))
+        np.testing.assert_array_equal(features[2, 3:6], [2024, 1, 3])
+        self.assertEqual(features[2, 9], 0)
+        self.assertEqual(features[5, 9], 2)
+        # Lag 1 of temp max and lag 2 of precip for 2024-01-03
+        self.assertEqual(features[2, 11], 51)
+        self.assertAlmostEqual(features[2, 13], 0.0)
+
+    def test_targets_are_not_inputs(self):
+        inputs = input_columns(13)
+        self.assertNotIn(0, inputs)
+        for column in TARGET_COLUMNS:
+            self.assertNotIn(column, inputs)
+        self.assertEqual(inputs, [1, 2, 3, 4, 5, 9, 10, 11, 12])
+
+class WindowFeatureTests(SimpleTestCase):
+    """Lags and rolling windows are computed per station over calendar days."""
+
+    def setUp(self):
+        self.columns = sample_columns()
+
+    def test_lags_stay_within_station_and_calendar(self):
+        features = build_features(**self.columns)
+        # First day of station 1 does not borrow station 0's last day, and
+        # the day after its gap has no lag
+        self.assertTrue(np.isnan(features[5, 10:13]).all())
+        self.assertTrue(np.isnan(features[6, 10:13]).all())
+        self.assertTrue(np.isnan(features[0, 10:13]).all())
+
+    def test_rolling_windows(self):
+        features = build_features(**self.columns, rolling={"tmax": [(3, "mean")], "prcp": [(2, "sum")]})
+        names = feature_columns(rolling={"tmax": [(3, "mean")], "prcp": [(2, "sum")]})
+        tmax_mean3, prcp_sum2 = names.index("tmax_mean3"), names.index("prcp_sum2")
+        self.assertAlmostEqual(features[4, tmax_mean3], 52.0)
+        self.assertAlmostEqual(features[4, prcp_sum2], 0.5, places=5)
+        # Windows skip the missing day instead of reaching into station 0
+        self.assertAlmostEqual(features[6, tmax_mean3], 80.0)
+        self.assertTrue(np.isnan(features[5, tmax_mean3]))
+
+    def test_unsorted_rows_give_the_same_features(self):
+        order = np.array([6, 2, 0, 5, 4, 1, 3])
+        shuffled = build_features(**{name: values[order] for name, values in self.columns.items()})
+        np.testing.assert_array_equal(shuffled, build_features(**self.columns)[order])
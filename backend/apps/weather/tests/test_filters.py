@@ -0,0 +1,65 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the station filters and the grouping of predictions by station.
+"""
+
+from datetime import date, timedelta
+from django.http import QueryDict
+from django.test import Client, TestCase
+from ..cache import get_backend
+from ..filters import filter_weather_data
+from ..models import ML_Predictions
+from .helpers import UnmanagedTablesMixin, prediction
+
+class StationFilterTests(UnmanagedTablesMixin, TestCase):
+    """stations= matches substrings, station= exact names; predictions come grouped by station."""
+
+    @classmethod
+    def setUpTestData(cls):
+        day = date(2024, 5, 1)
+        ML_Predictions.objects.bulk_create([
+            prediction("CHARLOTTE DOUGLAS AIRPORT, NC US", day),
+            prediction("CHARLOTTE 2 NE, NC US", day),
+            prediction("RALEIGH DURHAM AIRPORT, NC US", day),
+            prediction("WILMINGTON AIRPORT, NC US", day + timedelta(days=2), value=75.0),
+            prediction("WILMINGTON AIRPORT, NC US", day + timedelta(days=1)),
+        ])
+
+    def setUp(self):
+        get_backend().clear()
+        self.client = Client(HTTP_HOST="localhost")
+
+    def test_stations_matches_substrings(self):
+        response = self.client.get("/api/ml_data/pred/", {"stations": "charlotte,RALEIGH"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.json()["stations"]), [
+            "CHARLOTTE 2 NE, NC US", "CHARLOTTE DOUGLAS AIRPORT, NC US", "RALEIGH DURHAM AIRPORT, NC US"
+        ])
+
+    def test_station_matches_exact_names(self):
+        response = self.client.get("/api/ml_data/pred/?station=CHARLOTTE 2 NE, NC US&station=CHARLOTTE")
+        self.assertEqual(list(response.json()["stations"]), ["CHARLOTTE 2 NE, NC US"])
+
+    def test_filter_combines_with_dates(self):
+        params = QueryDict("stations=AIRPORT&start=2024-05-02&end=2024-05-02")
+        names = filter_weather_data(ML_Predictions.objects.all(), params).values_list("name", flat=True)
+        self.assertEqual(list(names), ["WILMINGTON AIRPORT, NC US"])
+
+    def test_grouped_by_station_in_date_order(self):
+        stations = self.client.get("/api/ml_data/pred/").json()["stations"]
+        self.assertEqual(sorted(stations), [
+            "CHARLOTTE 2 NE, NC US", "CHARLOTTE DOUGLAS AIRPORT, NC US",
+            "RALEIGH DURHAM AIRPORT, NC US", "WILMINGTON AIRPORT, NC US",
+        ])
+        wilmington = stations["WILMINGTON AIRPORT, NC US"]
+        self.assertEqual([record["date"] for record in wilmington], ["2024-05-02", "2024-05-03"])
+        self.assertEqual(wilmington[1]["predicted_temp_max"], 75.0)
+
+    def test_invalid_filters(self):
+        for params in ({"start": "May 1"}, {"bbox": "1,2,3"}):
+            with self.subTest(params=params):
+                response = self.client.get("/api/ml_data/pred/", params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["status"], "error")
@@ -0,0 +1,93 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the prediction endpoint and its feature rows.
+"""
+
+import json
+import numpy as np
+from django.test import Client, SimpleTestCase, TestCase
+from ..models import WeatherData
+from ..training import get_or_train_model
+from .helpers import TrainingDirsMixin, UnmanagedTablesMixin, observation_series
+from .test_features import sample_columns
+from data.features import TARGET_COLUMNS, build_features, complete_inputs, inference_features, input_columns
+
+class InferenceFeatureTests(SimpleTestCase):
+    """Inference rows are built exactly like training rows."""
+
+    def test_inference_matches_training_inputs(self):
+        columns = sample_columns()
+        rolling = {"prcp": [(3, "sum")]}
+        training = build_features(**columns, lags=(1, 2), rolling=rolling)
+        history = {name: values[:4] for name, values in columns.items()}
+        rows = inference_features(
+            np.array([0, 1]), np.array(["2024-01-05", "2024-01-05"], dtype="datetime64[D]"),
+            history, lags=(1, 2), rolling=rolling
+        )
+        inputs = input_columns(training.shape[1])
+        np.testing.assert_array_equal(rows[0, inputs], training[4, inputs])
+        self.assertTrue(np.isnan(rows[:, TARGET_COLUMNS]).all())
+        # Station 1 has no history before the day, so it cannot be predicted
+        np.testing.assert_array_equal(complete_inputs(rows), [True, False])
+
+    def test_unknown_station_has_no_inputs(self):
+        columns = sample_columns()
+        rows = inference_features(np.array([-1]), np.array(["2024-01-05"], dtype="datetime64[D]"), columns)
+        self.assertFalse(complete_inputs(rows)[0])
+
+class PredictEndpointTests(TrainingDirsMixin, UnmanagedTablesMixin, TestCase):
+    """The predict endpoint serves the latest model for single and batch points."""
+
+    @classmethod
+    def setUpTestData(cls):
+        WeatherData.objects.bulk_create(observation_series(["ASHEVILLE", "RALEIGH"]))
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client(HTTP_HOST="localhost")
+
+    def test_no_model_yet(self):
+        response = self.client.get("/api/predict/", {"station": "RALEIGH", "date": "2024-02-01"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "error")
+
+    def test_single_point(self):
+        entry, _ = get_or_train_model()
+        response = self.client.get("/api/predict/", {"station": "RALEIGH", "date": "2024-02-01"})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["model_key"], entry.key)
+        (point,) = body["predictions"]
+        self.assertEqual((point["name"], point["date"], point["month"]), ("RALEIGH", "2024-02-01", 2))
+        self.assertAlmostEqual(point["latitude"], 36.0, places=4)
+        for value in ("precipitation", "temp_max", "temp_min"):
+            self.assertTrue(np.isfinite(point[value]))
+
+    def test_batch_matches_single_points(self):
+        get_or_train_model()
+        points = [
+            {"station": "ASHEVILLE", "date": "2024-01-20"},
+            {"station": "RALEIGH", "date": "2024-02-01"},
+            {"station": "DURHAM", "date": "2024-02-01"},
+            {"station": "RALEIGH", "date": "2023-06-01"},
+        ]
+        response = self.client.post("/api/predict/", json.dumps({"points": points}), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        predictions = response.json()["predictions"]
+        (single,) = self.client.get("/api/predict/", {"station": "RALEIGH", "date": "2024-02-01"}).json()["predictions"]
+        self.assertEqual(predictions[1].keys(), single.keys())
+        for key, value in single.items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(predictions[1][key], value, places=6)
+            else:
+                self.assertEqual(predictions[1][key], value)
+        self.assertEqual(predictions[2]["error"], "Unknown station")
+        self.assertEqual(predictions[3]["error"], "No observations for the days before this date")
+
+    def test_malformed_points(self):
+        response = self.client.get("/api/predict/", {"station": "RALEIGH", "date": "2024-13-01"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post("/api/predict/", json.dumps({"points": []}), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
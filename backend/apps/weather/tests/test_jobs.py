@@ -0,0 +1,121 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the background training job queue and the training endpoint.
+"""
+
+import json
+import time
+from datetime import timedelta
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from ..jobs import Heartbeat, claim_next_job, enqueue_training, job_status, reclaim_stale_jobs
+from ..models import TrainingJob
+from data.linear_regression import check_hyperparameters
+
+class HyperparameterTests(SimpleTestCase):
+    """Hyperparameter names and values are checked before training."""
+
+    def test_valid(self):
+        check_hyperparameters(None)
+        check_hyperparameters({"estimator": "ridge", "alpha": 0, "epochs": 5, "test_size": 0.25, "per_station": True})
+
+    def test_invalid(self):
+        for hyperparameters in (
+            {"learning_rate": 0.1},
+            {"estimator": "forest"},
+            {"alpha": -1},
+            {"epochs": 0},
+            {"epochs": 2.5},
+            {"test_size": 1},
+            {"per_station": "yes"},
+            {"random_state": True},
+        ):
+            with self.subTest(hyperparameters=hyperparameters):
+                with self.assertRaises(ValueError):
+                    check_hyperparameters(hyperparameters)
+
+class JobQueueTests(TestCase):
+    """Jobs are claimed oldest first and dead workers' jobs are failed."""
+
+    def test_claim_oldest_first(self):
+        first = enqueue_training({"estimator": "ridge"})
+        second = enqueue_training(retrain=True)
+        claimed = claim_next_job()
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual(claimed.status, TrainingJob.RUNNING)
+        self.assertIsNotNone(claimed.started_at)
+        self.assertEqual(claimed.heartbeat_at, claimed.started_at)
+        self.assertEqual(claim_next_job().pk, second.pk)
+        self.assertIsNone(claim_next_job())
+
+    def test_reclaim_stale_jobs(self):
+        now = timezone.now()
+        old = now - timedelta(minutes=10)
+        stale = TrainingJob.objects.create(status=TrainingJob.RUNNING, started_at=old, heartbeat_at=old)
+        silent = TrainingJob.objects.create(status=TrainingJob.RUNNING, started_at=old)
+        alive = TrainingJob.objects.create(status=TrainingJob.RUNNING, started_at=old, heartbeat_at=now)
+        starting = TrainingJob.objects.create(status=TrainingJob.RUNNING, started_at=now)
+        queued = TrainingJob.objects.create()
+        self.assertEqual(reclaim_stale_jobs(stale_after=300), 2)
+        statuses = dict(TrainingJob.objects.values_list("pk", "status"))
+        self.assertEqual(statuses[stale.pk], TrainingJob.FAILED)
+        self.assertEqual(statuses[silent.pk], TrainingJob.FAILED)
+        self.assertEqual(statuses[alive.pk], TrainingJob.RUNNING)
+        self.assertEqual(statuses[starting.pk], TrainingJob.RUNNING)
+        self.assertEqual(statuses[queued.pk], TrainingJob.QUEUED)
+        stale.refresh_from_db()
+        self.assertIn("heartbeat", stale.message)
+        self.assertIsNotNone(stale.finished_at)
+
+    def test_job_status(self):
+        job = enqueue_training()
+        status = job_status(job)
+        self.assertEqual(status["job_id"], job.pk)
+        self.assertEqual(status["status"], TrainingJob.QUEUED)
+        self.assertIsNone(status["model_key"])
+        self.assertIsNone(status["message"])
+
+class HeartbeatTests(TransactionTestCase):
+    """The heartbeat thread writes through its own connection, so it needs committed rows."""
+
+    def test_heartbeat_updates_running_job(self):
+        enqueue_training()
+        job = claim_next_job()
+        started = job.heartbeat_at
+        with Heartbeat(job, interval=0.05):
+            time.sleep(0.3)
+        job.refresh_from_db()
+        self.assertGreater(job.heartbeat_at, started)
+
+class TrainEndpointTests(TestCase):
+    """POST queues a job only for valid hyperparameters."""
+
+    def setUp(self):
+        self.client = Client(HTTP_HOST="localhost")
+
+    def post(self, body):
+        return self.client.post("/api/ml_data/train/", json.dumps(body), content_type="application/json")
+
+    def test_queues_job(self):
+        response = self.post({"hyperparameters": {"estimator": "ridge", "alpha": 2.0}, "retrain": True})
+        self.assertEqual(response.status_code, 202)
+        job = TrainingJob.objects.get(pk=response.json()["job_id"])
+        self.assertEqual(job.hyperparameters, {"estimator": "ridge", "alpha": 2.0})
+        self.assertTrue(job.retrain)
+        status = self.client.get(f"/api/ml_data/train/{job.pk}/")
+        self.assertEqual(status.json()["status"], TrainingJob.QUEUED)
+
+    def test_rejects_bad_hyperparameters(self):
+        for hyperparameters in ({"learning_rate": 0.1}, {"epochs": -3}, {"estimator": "forest"}):
+            with self.subTest(hyperparameters=hyperparameters):
+                response = self.post({"hyperparameters": hyperparameters})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["status"], "error")
+        self.assertFalse(TrainingJob.objects.exists())
+
+    def test_rejects_malformed_body(self):
+        response = self.client.post("/api/ml_data/train/", "not json", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(TrainingJob.objects.exists())
@@ -0,0 +1,137 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the COPY based ML predictions loader.
+"""
+
+import csv
+import io
+from collections import Counter
+from contextlib import redirect_stdout
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from ..load_db import CopyStream, create_table, insert_ml_predictions, prediction_rows
+from ..models import DataVersion, Station
+
+def record(name, date="2024-05-01", temp_max=70.0, **overrides):
+    """A prediction record in the shape train() returns."""
+    year, month, day = (int(part) for part in str(date).split("-")) if "-" in str(date) else (2024, 5, 1)
+    return {
+        "name": name, "latitude": 35.5, "longitude": -80.5, "year": year, "month": month, "day": day,
+        "date": date, "predicted_precip": 0.1, "predicted_temp_max": temp_max, "predicted_temp_min": 50.0,
+        "actual_precip": 0.0, "actual_temp_max": 71.0, "actual_temp_min": 49.0, **overrides,
+    }
+
+class CopyStreamTests(SimpleTestCase):
+    """CopyStream encodes rows as CSV a batch at a time."""
+
+    def test_reads_all_rows_in_small_chunks(self):
+        rows = [(f"STATION, {i}", i, 'say "hi"') for i in range(25)]
+        stream = CopyStream(rows, batch_rows=4)
+        chunks = []
+        while chunk := stream.read(7):
+            chunks.append(chunk)
+        self.assertTrue(all(len(chunk) <= 7 for chunk in chunks))
+        self.assertEqual(stream.count, 25)
+        parsed = list(csv.reader(io.StringIO("".join(chunks))))
+        self.assertEqual(parsed, [[name, str(i), quote] for name, i, quote in rows])
+
+    def test_reads_lazily(self):
+        stream = CopyStream(((i,) for i in range(10**9)), batch_rows=3)
+        stream.read(1)
+        self.assertEqual(stream.count, 3)
+
+    def test_read_everything(self):
+        stream = CopyStream([(1, 2), (3, 4)])
+        self.assertEqual(stream.read(), "1,2\r\n3,4\r\n")
+        self.assertEqual(stream.read(), "")
+
+class PredictionRowsTests(SimpleTestCase):
+    """Bad records are counted by reason and skipped."""
+
+    def test_rejections(self):
+        records = [
+            record("GOOD"),
+            record("BAD DATE", date="2024-02-30"),
+            record("NAN", predicted_temp_max=float("nan")),
+            record("TEXT", latitude="north"),
+            record("MISSING"),
+            record("", date="2024-05-01"),
+            record("X" * 256),
+        ]
+        del records[4]["longitude"]
+        rejected = Counter()
+        rows = list(prediction_rows({"predictions": records}, rejected))
+        self.assertEqual([row[0] for row in rows], ["GOOD"])
+        self.assertEqual(rows[0][6], "2024-05-01")
+        self.assertEqual(rejected, Counter({
+            "invalid date": 1, "NaN or infinite value": 1, "missing field longitude": 1,
+            "non-numeric value": 1, "missing name or date": 1, "name too long": 1,
+        }))
+
+    def test_grouped_by_station(self):
+        data = {"stations": {"A": [record("A")], "B": [record("B"), record("B", date="2024-05-02")]}}
+        self.assertEqual(len(list(prediction_rows(data, Counter()))), 3)
+
+class InsertPredictionsTests(TransactionTestCase):
+    """
+    insert_ml_predictions commits on its own connection, so these tests use
+    a real transaction and the table schema the loader itself creates.
+    """
+
+    def setUp(self):
+        self.conn = connection.get_new_connection(connection.get_connection_params())
+        self.addCleanup(self.conn.close)
+        with self.conn.cursor() as cursor:
+            create_table(cursor)
+        self.conn.commit()
+        self.addCleanup(self.drop_table)
+
+    def drop_table(self):
+        # Dropped before the flush, which cannot truncate stations while it is referenced
+        with self.conn.cursor() as cursor:
+            cursor.execute("DROP TABLE ml_predictions CASCADE")
+        self.conn.commit()
+
+    def insert(self, records):
+        with redirect_stdout(io.StringIO()):
+            return insert_ml_predictions({"predictions": records}, conn=self.conn)
+
+    def rows(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT name, date::text, predicted_temp_max FROM ml_predictions ORDER BY name, date")
+            return cursor.fetchall()
+
+    def version(self):
+        row = DataVersion.objects.filter(name="ml_predictions").first()
+        return row.version if row else 0
+
+    def test_upsert(self):
+        result = self.insert([record("RALEIGH"), record("DURHAM")])
+        self.assertEqual((result["written"], result["duplicates"], result["rejected"]), (2, 0, 0))
+        result = self.insert([record("RALEIGH", temp_max=80.0), record("RALEIGH", date="2024-05-02")])
+        self.assertEqual(result["written"], 2)
+        self.assertEqual(self.rows(), [
+            ("DURHAM", "2024-05-01", 70.0), ("RALEIGH", "2024-05-01", 80.0), ("RALEIGH", "2024-05-02", 70.0),
+        ])
+
+    def test_last_duplicate_wins(self):
+        result = self.insert([record("RALEIGH", temp_max=t) for t in (60.0, 65.0, 75.0)])
+        self.assertEqual((result["written"], result["duplicates"]), (1, 2))
+        self.assertEqual(self.rows(), [("RALEIGH", "2024-05-01", 75.0)])
+
+    def test_rejected_rows_are_skipped(self):
+        result = self.insert([record("RALEIGH"), record("BROKEN", date="not a date")])
+        self.assertEqual((result["written"], result["rejected"]), (1, 1))
+        self.assertEqual(result["reasons"], {"invalid date": 1})
+        self.assertEqual([row[0] for row in self.rows()], ["RALEIGH"])
+
+    def test_links_stations_and_bumps_version(self):
+        before = self.version()
+        self.insert([record("RALEIGH")])
+        self.assertEqual(self.version(), before + 1)
+        station = Station.objects.get(name="RALEIGH")
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT station_id FROM ml_predictions")
+            self.assertEqual(cursor.fetchone()[0], station.pk)
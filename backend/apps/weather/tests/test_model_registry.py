@@ -0,0 +1,77 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the persisted model registry.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from django.test import SimpleTestCase
+from data.model_registry import ModelRegistry, registry_key
+
+class ModelRegistryTests(SimpleTestCase):
+    """Models are saved under a key and loaded back once per process."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.registry = ModelRegistry(self.root, max_loaded=2, latest_ttl=0)
+
+    def save(self, registry, key, model="model"):
+        return registry.save(key, {"model": model}, "preprocessor", "scaler", ["A"], {"test_loss": 0.5})
+
+    def test_key_depends_on_fingerprint_and_hyperparameters(self):
+        key = registry_key({"rows": 10}, {"alpha": 1.0})
+        self.assertEqual(key, registry_key({"rows": 10}, {"alpha": 1.0}))
+        self.assertNotEqual(key, registry_key({"rows": 11}, {"alpha": 1.0}))
+        self.assertNotEqual(key, registry_key({"rows": 10}, {"alpha": 2.0}))
+
+    def test_round_trip_records_the_kind(self):
+        self.save(self.registry, "a")
+        entry = ModelRegistry(self.root).load("a")
+        self.assertEqual(entry.model, {"model": "model"})
+        self.assertEqual(entry.fitted, ({"model": "model"}, "preprocessor", "scaler"))
+        self.assertEqual(entry.metadata, {"test_loss": 0.5, "kind": "pickle"})
+        self.assertIsNone(self.registry.load("missing"))
+
+    def test_entries_without_a_kind_still_load(self):
+        self.save(self.registry, "a")
+        path = os.path.join(self.root, "a", "metadata.json")
+        with open(path) as file:
+            metadata = json.load(file)
+        del metadata["kind"]
+        with open(path, "w") as file:
+            json.dump(metadata, file)
+        self.assertEqual(ModelRegistry(self.root).load("a").model, {"model": "model"})
+
+    def test_rejects_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            self.registry.save("a", None, None, None, [], {}, kind="onnx")
+
+    def test_loaded_entries_are_bounded(self):
+        for key in ("a", "b", "c"):
+            self.save(self.registry, key)
+        self.assertEqual(list(self.registry._loaded), ["b", "c"])
+        self.registry.load("b")
+        self.save(self.registry, "d")
+        self.assertEqual(list(self.registry._loaded), ["b", "d"])
+
+    def test_latest_sees_entries_saved_by_other_processes(self):
+        self.assertIsNone(self.registry.latest())
+        self.save(self.registry, "a")
+        self.assertEqual(self.registry.latest().key, "a")
+        other = ModelRegistry(self.root)
+        entry = self.save(other, "b", model="newer")
+        # Directory timestamps may not move between two quick saves
+        os.utime(os.path.join(self.root, "b", "metadata.json"), (2e9, 2e9))
+        os.utime(self.root, (2e9, 2e9))
+        self.assertEqual(self.registry.latest().key, entry.key)
+
+    def test_latest_is_reused_within_the_ttl(self):
+        registry = ModelRegistry(self.root, latest_ttl=3600)
+        self.save(registry, "a")
+        self.save(ModelRegistry(self.root), "b")
+        self.assertEqual(registry.latest().key, "a")
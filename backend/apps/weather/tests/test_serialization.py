@@ -0,0 +1,106 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the JSON serializers and the records and columns response
+    shapes.
+"""
+
+import json
+from datetime import date
+import numpy as np
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from ..cache import get_backend
+from ..filters import FilterError
+from ..models import ML_Predictions, WeatherData
+from ..serialization import dumps, dumps_json, dumps_orjson, parse_shape, to_columns, to_records
+from .helpers import UnmanagedTablesMixin, observation, prediction
+
+class ShapeTests(SimpleTestCase):
+    """Rows are shaped as records or columns."""
+
+    def setUp(self):
+        self.fields = ("name", "tmax")
+        self.rows = [("A", 1.0), ("B", 2.0)]
+
+    def test_records_and_columns(self):
+        self.assertEqual(to_records(self.rows, self.fields), [{"name": "A", "tmax": 1.0}, {"name": "B", "tmax": 2.0}])
+        self.assertEqual(to_columns(self.rows, self.fields), {"name": ["A", "B"], "tmax": [1.0, 2.0]})
+
+    def test_no_rows(self):
+        self.assertEqual(to_records([], self.fields), [])
+        self.assertEqual(to_columns([], self.fields), {"name": [], "tmax": []})
+
+    def test_parse_shape(self):
+        self.assertEqual(parse_shape(None), "records")
+        self.assertEqual(parse_shape("columns"), "columns")
+        with self.assertRaises(FilterError):
+            parse_shape("rows")
+
+class SerializerTests(SimpleTestCase):
+    """Both serializers encode the same documents."""
+
+    def test_backends_agree(self):
+        data = {
+            "date": date(2024, 5, 1),
+            "values": np.array([1.5, 2.25]),
+            "counts": np.arange(3),
+            "scalar": np.int64(7),
+            "nested": [{"name": "RALEIGH", "missing": None}],
+        }
+        expected = {
+            "date": "2024-05-01", "values": [1.5, 2.25], "counts": [0, 1, 2], "scalar": 7,
+            "nested": [{"name": "RALEIGH", "missing": None}],
+        }
+        self.assertEqual(json.loads(dumps_json(data)), expected)
+        self.assertEqual(json.loads(dumps_orjson(data)), expected)
+
+    def test_configured_backend(self):
+        with override_settings(JSON_SERIALIZER="json"):
+            self.assertEqual(dumps({"a": 1}), b'{"a":1}')
+        with override_settings(JSON_SERIALIZER="pickle"):
+            with self.assertRaises(ValueError):
+                dumps({"a": 1})
+
+class ShapedEndpointTests(UnmanagedTablesMixin, TestCase):
+    """The raw data and prediction endpoints return either shape with either serializer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        WeatherData.objects.bulk_create([
+            observation("RALEIGH", date(2024, 5, 1), tmax=71.0),
+            observation("DURHAM", date(2024, 5, 2), tmax=72.5),
+        ])
+        ML_Predictions.objects.bulk_create([prediction("RALEIGH"), prediction("RALEIGH", date(2024, 5, 2))])
+
+    def setUp(self):
+        get_backend().clear()
+        self.client = Client(HTTP_HOST="localhost")
+
+    def get(self, url, **params):
+        get_backend().clear()
+        return self.client.get(url, params)
+
+    def test_raw_data_columns_match_records(self):
+        for serializer in ("json", "orjson"):
+            with self.subTest(serializer=serializer), override_settings(JSON_SERIALIZER=serializer):
+                records = self.get("/api/raw-data/", fields="date,name,tmax").json()["raw_data"]
+                columns = self.get("/api/raw-data/", fields="date,name,tmax", shape="columns").json()["raw_data"]
+                self.assertEqual(columns, {
+                    "date": ["2024-05-01", "2024-05-02"], "name": ["RALEIGH", "DURHAM"], "tmax": [71.0, 72.5],
+                })
+                self.assertEqual(records, to_records(list(zip(*columns.values())), tuple(columns)))
+
+    def test_predictions_columns_match_records(self):
+        records = self.get("/api/ml_data/pred/").json()["stations"]["RALEIGH"]
+        columns = self.get("/api/ml_data/pred/", shape="columns").json()["stations"]["RALEIGH"]
+        # The station name is already the key, so the columns leave it out
+        without_name = [{field: value for field, value in record.items() if field != "name"} for record in records]
+        self.assertEqual(without_name, to_records(list(zip(*columns.values())), tuple(columns)))
+
+    def test_invalid_shapes(self):
+        for params in ({"shape": "rows"}, {"shape": "columns", "stream": "true"}):
+            with self.subTest(params=params):
+                response = self.get("/api/raw-data/", **params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["status"], "error")
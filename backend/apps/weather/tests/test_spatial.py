@@ -0,0 +1,69 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for the station spatial index and the nearest stations endpoint.
+"""
+
+import numpy as np
+from django.test import Client, SimpleTestCase, TestCase
+from .. import spatial
+from ..models import Station
+from ..spatial import StationIndex, haversine_km
+
+class StationIndexTests(SimpleTestCase):
+    """The grid index answers like a brute force search."""
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.latitudes = rng.uniform(33.5, 36.6, 300)
+        self.longitudes = rng.uniform(-84.3, -75.4, 300)
+        self.names = [f"STATION {i:03d}" for i in range(300)]
+        self.index = StationIndex(self.names, self.latitudes, self.longitudes)
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lon in ((35.2, -80.8), (34.0, -77.9), (40.0, -70.0)):
+            distances = haversine_km(lat, lon, self.latitudes, self.longitudes)
+            expected = [self.names[i] for i in np.argsort(distances, kind="stable")[:7]]
+            found = self.index.nearest(lat, lon, 7)
+            self.assertEqual([self.index.names[position] for position, _ in found], expected)
+            np.testing.assert_allclose([distance for _, distance in found], np.sort(distances)[:7])
+
+    def test_nearest_caps_k_at_station_count(self):
+        self.assertEqual(len(self.index.nearest(35.0, -79.0, 1000)), 300)
+        self.assertEqual(StationIndex([], [], []).nearest(35.0, -79.0, 3), [])
+
+    def test_within_matches_brute_force(self):
+        bbox = (-81.0, 34.5, -78.0, 36.0)
+        inside = (
+            (self.longitudes >= bbox[0]) & (self.longitudes <= bbox[2])
+            & (self.latitudes >= bbox[1]) & (self.latitudes <= bbox[3])
+        )
+        expected = sorted(name for name, keep in zip(self.names, inside) if keep)
+        self.assertEqual([self.index.names[position] for position in self.index.within(*bbox)], expected)
+
+class NearestStationsViewTests(TestCase):
+    """The nearest stations endpoint reads the stations table."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Station.objects.bulk_create([
+            Station(name="ASHEVILLE AIRPORT, NC US", latitude=35.43, longitude=-82.54),
+            Station(name="CHARLOTTE DOUGLAS AIRPORT, NC US", latitude=35.22, longitude=-80.95),
+            Station(name="RALEIGH DURHAM AIRPORT, NC US", latitude=35.89, longitude=-78.78),
+        ])
+
+    def setUp(self):
+        spatial._index = None
+        self.client = Client(HTTP_HOST="localhost")
+
+    def test_closest_first(self):
+        response = self.client.get("/api/stations/nearest/", {"lat": 35.3, "lon": -80.9, "k": 2})
+        self.assertEqual(response.status_code, 200)
+        names = [station["name"] for station in response.json()["stations"]]
+        self.assertEqual(names, ["CHARLOTTE DOUGLAS AIRPORT, NC US", "ASHEVILLE AIRPORT, NC US"])
+
+    def test_invalid_point(self):
+        response = self.client.get("/api/stations/nearest/", {"lat": 95, "lon": -80.9})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["status"], "error")
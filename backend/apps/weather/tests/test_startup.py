@@ -0,0 +1,41 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests that the web application starts without the training libraries.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.test import SimpleTestCase
+
+# Every route of the weather application
+ROUTES = (
+    "/api/raw-data/", "/api/ml_data/train/", "/api/ml_data/train/1/", "/api/ml_data/pred/",
+    "/api/predict/", "/api/timeseries/", "/api/stations/", "/api/stations/nearest/",
+    "/api/stations/RALEIGH/summary/",
+)
+
+class LazyImportTests(SimpleTestCase):
+    """Importing the URLconf and views does not import TensorFlow, scikit-learn or requests."""
+
+    def test_urlconf_does_not_import_training_libraries(self):
+        script = (
+            "import json, sys, django\n"
+            "django.setup()\n"
+            "from django.urls import resolve\n"
+            "import backend.apps.weather.views\n"
+            f"for path in {ROUTES!r}:\n"
+            "    resolve(path)\n"
+            "print(json.dumps([name for name in ('tensorflow', 'keras', 'sklearn', 'requests') if name in sys.modules]))\n"
+        )
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "backend.config.settings"}
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, timeout=120
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout.strip().splitlines()[-1]), [])
@@ -0,0 +1,63 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Tests for per-station training across the worker pool.
+"""
+
+import numpy as np
+from django.test import SimpleTestCase
+from .helpers import synthetic_columns
+from data.features import build_features, drop_incomplete
+from data.linear_regression import train
+from data.station_training import MIN_STATION_ROWS, StationModels, station_ranges, train_per_station
+
+class StationRangesTests(SimpleTestCase):
+    """Row ranges are found from station-sorted codes."""
+
+    def test_ranges(self):
+        self.assertEqual(station_ranges(np.array([0, 0, 2, 2, 2, 5])), [(0, 0, 2), (2, 2, 5), (5, 5, 6)])
+
+class TrainPerStationTests(SimpleTestCase):
+    """Each station gets the model train() would fit on its rows alone."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.station_names, columns = synthetic_columns(stations=4, days=90)
+        features = drop_incomplete(build_features(**columns))
+        # Station 3 keeps too few rows for a model of its own
+        codes = features[:, 0]
+        small = np.flatnonzero(codes == 3)[MIN_STATION_ROWS - 1:]
+        cls.features = np.delete(features, small, axis=0)
+        # Shuffled, so the pool has to group the rows by station itself
+        np.random.default_rng(3).shuffle(cls.features)
+        cls.metrics = train_per_station(cls.features, cls.station_names, workers=2)
+
+    def test_matches_single_station_training(self):
+        self.assertEqual(self.metrics["skipped"], ["STATION 3"])
+        self.assertEqual(sorted(self.metrics["stations"]), ["STATION 0", "STATION 1", "STATION 2"])
+        rows = self.features[np.argsort(self.features[:, 0], kind="stable")]
+        alone = train(rows[rows[:, 0] == 1], self.station_names)
+        station = self.metrics["stations"]["STATION 1"]
+        self.assertAlmostEqual(station["test_loss"], alone["test_loss"], places=6)
+        self.assertEqual(station["training_samples"], alone["training_samples"])
+        ours = [p for p in self.metrics["predictions"] if p["name"] == "STATION 1"]
+        self.assertEqual([p["date"] for p in ours], [p["date"] for p in alone["predictions"]])
+        np.testing.assert_allclose(
+            [p["predicted_temp_max"] for p in ours], [p["predicted_temp_max"] for p in alone["predictions"]],
+            rtol=1e-6
+        )
+
+    def test_station_models_predict(self):
+        model = self.metrics["model"]
+        self.assertIsInstance(model, StationModels)
+        predicted = model.predict(self.features[:50])
+        known = self.features[:50, 0] != 3
+        self.assertTrue(np.isfinite(predicted[known]).all())
+        self.assertTrue(np.isnan(predicted[~known]).all())
+
+    def test_fitted_models_are_reused(self):
+        fitted = (self.metrics["model"], None, None)
+        again = train_per_station(self.features, self.station_names, fitted=fitted, workers=2)
+        self.assertEqual(again["predictions"], self.metrics["predictions"])
@@ -0,0 +1,273 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Model training and reuse for the Weather Prediction application.
+
+    This module connects the ML code in the data package to the database and
+    the model registry. It includes functions for:
+    - Fingerprinting the observation table so a model is only retrained when
+      the data changes; the fingerprint is reused until a loader bumps the
+      weather_data version, so edits made outside the loaders need a retrain
+    - Loading observations as typed columns and building the feature matrix,
+      or memory-mapping the matrix saved in the feature store for the same data
+    - Returning a trained model from the registry, training and saving one
+      only when no model exists for the current data and hyperparameters
+"""
+
+from functools import partial
+from itertools import groupby
+from operator import itemgetter
+from django.conf import settings
+from django.db.models import Count, Max, Q, Sum
+from .cache import data_versions
+from .models import WeatherData
+from data.data_version import WEATHER_DATA
+from data.feature_store import FeatureStore, store_key
+from data.features import build_features, columns_from_rows, drop_incomplete, input_names
+from data.model_registry import ModelRegistry, registry_key
+
+_registry = None
+_feature_store = None
+_fingerprint = (None, None)
+
+def get_registry():
+    """
+    Returns the process-wide model registry, creating it on first use.
+
+    Returns:
+        ModelRegistry: Registry rooted at settings.MODEL_REGISTRY_DIR
+    """
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry(settings.MODEL_REGISTRY_DIR)
+    return _registry
+
+def get_feature_store():
+    """
+    Returns the process-wide feature store, creating it on first use.
+
+    Returns:
+        FeatureStore: Store rooted at settings.FEATURE_STORE_DIR
+    """
+    global _feature_store
+    if _feature_store is None:
+        _feature_store = FeatureStore(settings.FEATURE_STORE_DIR)
+    return _feature_store
+
+def complete_observations():
+    """
+    Returns observations with temperature and precipitation all present.
+
+    Returns:
+        QuerySet: WeatherData rows usable for training
+    """
+    return WeatherData.objects.exclude(
+        Q(tmax__isnull=True) | Q(tmin__isnull=True) | Q(prcp__isnull=True)
+    )
+
+def data_fingerprint():
+    """
+    Summarizes the training data in a single aggregate query.
+
+    Any import that adds, removes or changes observations changes at least
+    one of these values, so they identify the data a model was trained on.
+
+    Returns:
+        dict: Row count, latest date, highest id and column checksums
+    """
+    summary = complete_observations().aggregate(
+        rows=Count('id'),
+        max_date=Max('date'),
+        max_id=Max('id'),
+        tmax_sum=Sum('tmax'),
+        tmin_sum=Sum('tmin'),
+        prcp_sum=Sum('prcp'),
+    )
+    summary['max_date'] = summary['max_date'].isoformat() if summary['max_date'] else None
+    for column in ('tmax_sum', 'tmin_sum', 'prcp_sum'):
+        summary[column] = round(summary[column] or 0.0, 4)
+    return summary
+
+def current_fingerprint(refresh=False):
+    """
+    Returns data_fingerprint(), recomputed only after a loader changes the data.
+
+    The loaders bump the weather_data version whenever they change the
+    observations, so the fingerprint computed at one version is reused
+    until the version changes, replacing a full table aggregate with a
+    single row lookup.
+
+    Only the version bump invalidates the memoized fingerprint. Changes made
+    to the observation table any other way (manual SQL, the Django admin, a
+    loader that does not call bump_sql) are not seen until the next bump or
+    a call with refresh=True, and a model trained on the old data would be
+    reused in the meantime.
+
+    Args:
+        refresh (bool): Recompute the fingerprint from the data even if the
+            version has not changed
+
+    Returns:
+        dict: Output of data_fingerprint for the current observations
+    """
+    global _fingerprint
+    version = data_versions((WEATHER_DATA,))[WEATHER_DATA]
+    cached_version, fingerprint = _fingerprint
+    if refresh or fingerprint is None or cached_version != version:
+        fingerprint = data_fingerprint()
+        _fingerprint = (version, fingerprint)
+    return fingerprint
+
+def load_training_data(lags=(1,), rolling=None, fingerprint=None):
+    """
+    Returns the feature matrix used for training, from the feature store
+    when it holds one for the current data.
+
+    A stored matrix is memory-mapped read-only; otherwise the observations
+    are read and the matrix is built and saved for the next run.
+
+    Args:
+        lags (tuple): Lags in days passed to build_features
+        rolling (dict): Rolling windows passed to build_features
+        fingerprint (dict): Output of current_fingerprint, if already known
+
+    Returns:
+        tuple: (station_names, feature matrix, number of observations read)
+    """
+    feature_settings = {"lags": list(lags), "rolling": rolling}
+    fingerprint = fingerprint or current_fingerprint()
+    key = store_key(fingerprint, feature_settings)
+    store = get_feature_store()
+    stored = store.load(key)
+    if stored is not None:
+        station_names, features, metadata = stored
+        return station_names, features, metadata["raw_data_count"]
+
+    station_names, features, raw_count = build_training_data(lags, rolling)
+    store.save(key, station_names, features, {
+        "fingerprint": fingerprint,
+        "features": feature_settings,
+        "raw_data_count": raw_count,
+    })
+    return station_names, features, raw_count
+
+def build_training_data(lags=(1,), rolling=None):
+    """
+    Reads the observations and builds the feature matrix used for training.
+
+    Args:
+        lags (tuple): Lags in days passed to build_features
+        rolling (dict): Rolling windows passed to build_features
+
+    Returns:
+        tuple: (station_names, feature matrix, number of observations read)
+    """
+    station_names, columns, raw_count = load_observation_columns()
+    features = drop_incomplete(build_features(**columns, lags=lags, rolling=rolling))
+    return station_names, features, raw_count
+
+def load_observation_columns():
+    """
+    Reads the complete observations as typed columns, ordered by station and date.
+
+    Returns:
+        tuple: (station_names, columns for build_features, number of observations read)
+    """
+    rows = list(complete_observations().order_by('name', 'date').values_list(
+        'name', 'date', 'latitude', 'longitude', 'prcp', 'tmax', 'tmin'
+    ))
+    station_names, columns = columns_from_rows(rows)
+    return station_names, columns, len(rows)
+
+# Feature settings the model is trained with; saved with each registry entry
+# so inference builds the same columns
+FEATURE_SETTINGS = {
+    "lags": [1],
+    "rolling": None,
+}
+
+def group_by_station(predictions):
+    """
+    Groups prediction records by station name.
+
+    Training returns its predictions sorted by (name, date), so each
+    station's records are consecutive and are sliced off in one pass.
+
+    Args:
+        predictions (list): Prediction dicts with a "name" key, sorted by name
+
+    Returns:
+        dict: Station name to the list of its predictions, in input order
+    """
+    return {name: list(group) for name, group in groupby(predictions, key=itemgetter("name"))}
+
+def get_or_train_model(hyperparameters=None, retrain=False, progress=None):
+    """
+    Returns the model for the current data, training it only if needed.
+
+    Args:
+        hyperparameters (dict): Overrides for linear_regression.HYPERPARAMETERS
+        retrain (bool): Train and save a new model even if one exists; the
+            data fingerprint is also recomputed instead of memoized
+        progress (callable): Called as progress(epoch, total_epochs, loss)
+            after every epoch when a model is trained
+
+    Returns:
+        tuple: (ModelEntry, metrics) where metrics is the output of train(),
+            or of train_per_station when the per_station hyperparameter is
+            set, on the current data, with test set predictions
+
+    Raises:
+        ValueError: If a hyperparameter name or the estimator is unknown
+    """
+    from data.linear_regression import HYPERPARAMETERS, check_hyperparameters, train
+
+    check_hyperparameters(hyperparameters)
+    params = {**HYPERPARAMETERS, **(hyperparameters or {})}
+    if params["per_station"]:
+        from data.station_training import train_per_station
+        train = partial(train_per_station, workers=settings.TRAINING_WORKERS)
+    fingerprint = current_fingerprint(refresh=retrain)
+    # The input column names are part of the key so that models fitted on a
+    # different input layout are never reused
+    inputs = input_names(tuple(FEATURE_SETTINGS["lags"]), FEATURE_SETTINGS["rolling"])
+    key = registry_key(fingerprint, {**params, **FEATURE_SETTINGS, "inputs": inputs})
+    registry = get_registry()
+    station_names, features, raw_count = load_training_data(**FEATURE_SETTINGS, fingerprint=fingerprint)
+
+    entry = None if retrain else registry.load(key)
+    if entry is not None:
+        metrics = train(features, station_names, params, fitted=entry.fitted)
+    else:
+        metrics = train(features, station_names, params, progress=progress)
+        entry = registry.save(
+            key, metrics["model"], metrics["preprocessor"], metrics["output_scaler"], station_names,
+            {
+                "fingerprint": fingerprint,
+                "hyperparameters": params,
+                "features": FEATURE_SETTINGS,
+                "inputs": inputs,
+                "test_loss": metrics["test_loss"],
+                "training_loss": metrics["training_loss"],
+                "training_samples": metrics["training_samples"],
+                "test_samples": metrics["test_samples"],
+            },
+            # A single Keras model is saved in its own format; closed-form and
+            # per-station models are pickled
+            kind="keras" if params["estimator"] == "keras" and not params["per_station"] else "pickle",
+        )
+    metrics["raw_data_count"] = raw_count
+    metrics["total_samples"] = len(features)
+    return entry, metrics
+
+def get_current_model():
+    """
+    Returns the most recently trained model without training or querying
+    the database, for inference endpoints.
+
+    Returns:
+        ModelEntry: The newest registry entry, or None if no model has been
+            trained yet
+    """
+    return get_registry().latest()
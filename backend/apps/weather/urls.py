@@ -17,6 +17,18 @@ urlpatterns = [
     path('api/raw-data/', views.get_raw_data, name='raw_data'),
     # Cleans the data and trains the ML model
     path('api/ml_data/train/', views.train_ml_model, name='train_ml_model'),
+    # Progress of a queued training job
+    path('api/ml_data/train/<int:job_id>/', views.training_job_status, name='training_job_status'),
     # Predictions sent to web application
     path('api/ml_data/pred/', views.get_pred_data, name='pred_data'),
+    # Predictions from the trained model for (station, date) points
+    path('api/predict/', views.predict, name='predict'),
+    # Per-station series downsampled for plotting
+    path('api/timeseries/', views.timeseries, name='timeseries'),
+    # Stations, optionally within a bounding box
+    path('api/stations/', views.stations, name='stations'),
+    # Stations closest to a point
+    path('api/stations/nearest/', views.nearest_stations, name='nearest_stations'),
+    # Monthly and seasonal summaries of a station's observations
+    path('api/stations/<str:name>/summary/', views.station_summary, name='station_summary'),
 ] 
\ No newline at end of file
@@ -9,25 +9,112 @@ and machine learning operations. It includes endpoints for retrieving raw weathe
 preparing data for ML processing, training ML models, and retrieving predictions.
 """
 
+import json
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
-from .models import WeatherData, ML_Predictions
+from django.views.decorators.csrf import csrf_exempt
+from .models import WeatherData, ML_Predictions, Station, TrainingJob
+from .cache import cached_response
+from .export import ExportError, export_response
+from .filters import (
+    FilterError, after_cursor, encode_cursor, filter_weather_data, parse_bbox, parse_date,
+    parse_fields, parse_limit, parse_number
+)
 from django.db.models import Q
-from data.linear_regression import train, split_date_data, add_lag, add_season
-import numpy as np
+from data.data_version import ML_PREDICTIONS, WEATHER_DATA
+from .training import get_current_model, get_or_train_model, group_by_station
+from .jobs import enqueue_training, job_status
+from .inference import PredictionError, fetch_history, parse_points, predict_points
+from .summaries import summarize_station
+from .downsample import DOWNSAMPLE_METHODS, MAX_POINTS, MIN_POINTS, station_series
+from .spatial import MAX_NEIGHBORS, get_station_index
+from .serialization import SHAPES, FastJsonResponse, dumps, parse_shape
+from .station_blocks import fetch_station_blocks, station_blocks_json
+
+# Columns returned by the raw data endpoint, in output order
+RAW_DATA_FIELDS = ('date', 'name', 'latitude', 'longitude', 'tmax', 'tmin', 'prcp')
+
+# Columns returned by the prediction endpoint, in output order
+PRED_DATA_FIELDS = (
+    'name', 'latitude', 'longitude', 'year', 'month', 'day', 'date',
+    'predicted_precip', 'predicted_temp_max', 'predicted_temp_min',
+    'actual_precip', 'actual_temp_max', 'actual_temp_min'
+)
+
+# Series the time series endpoint can return, by source
+TIMESERIES_FIELDS = {
+    'predictions': (
+        'predicted_temp_max', 'actual_temp_max', 'predicted_temp_min', 'actual_temp_min',
+        'predicted_precip', 'actual_precip'
+    ),
+    'observations': ('tmax', 'tmin', 'prcp'),
+}
+
+# Number of rows fetched per server-side cursor round-trip and written per chunk
+STREAM_CHUNK_SIZE = 2000
+
+def stream_json_rows(key, rows, fields, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Write rows as a JSON object holding a single array, one chunk at a time.
+
+    Only one chunk of encoded rows is held in memory at any point, so peak
+    memory stays flat regardless of how many rows the iterator yields.
+
+    Args:
+        key (str): Name of the array in the enclosing JSON object
+        rows (iterable): Tuples of values in the same order as fields
+        fields (tuple): Names of the values in each row
+        chunk_size (int): Number of rows encoded per yielded chunk
+
+    Yields:
+        bytes: Consecutive pieces of the JSON document
+    """
+    yield f'{{"{key}":['.encode()
+    buffer = []
+    separator = b''
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            # Encode the chunk as one array and drop its brackets
+            yield separator + dumps([dict(zip(fields, row)) for row in buffer])[1:-1]
+            separator = b','
+            buffer = []
+    if buffer:
+        yield separator + dumps([dict(zip(fields, row)) for row in buffer])[1:-1]
+    yield b']}'
 
 @require_http_methods(["GET"])
+@cached_response(WEATHER_DATA)
 def get_raw_data(request):
     """
-    Retrieve all raw weather data from the database.
+    Retrieve raw weather data from the database.
     
     This view fetches weather data from the database, excluding records with
     null values for temperature or precipitation. The data is ordered by date
-    and returned as a JSON response.
+    and returned as a JSON response. Query parameters narrow the rows and
+    columns so clients only download what they display. Responses are cached
+    until the observations are reloaded (see cache.py).
+
+    Query Parameters:
+        station (str): Station name; repeat the parameter for several stations
+        start (str): First date to include (YYYY-MM-DD)
+        end (str): Last date to include (YYYY-MM-DD)
+        bbox (str): Bounding box as min_lon,min_lat,max_lon,max_lat
+        fields (str): Comma separated subset of the fields listed below
+        limit (int): Page size; enables keyset pagination on (date, id)
+        cursor (str): The next_cursor value returned by the previous page
+        stream (str): When "true", rows are read through a server-side cursor
+            and written to the client in chunks instead of being built into a
+            single response body
+        format (str): "arrow" or "parquet" to download the filtered rows as a
+            columnar binary file instead of JSON (pagination is ignored)
+        shape (str): "records" (default) for a list of objects, or "columns"
+            for a single object holding one array per field; columns cannot
+            be streamed
 
     Returns:
-        JsonResponse: Contains a list of weather data records with the following fields:
+        HttpResponse: JSON containing a list of weather data records with the following fields:
             - date: Date of the measurement
             - name: Station name
             - latitude: Station latitude
@@ -35,96 +122,127 @@ def get_raw_data(request):
             - tmax: Maximum temperature
             - tmin: Minimum temperature
             - prcp: Precipitation amount
+          and, when paginating, next_cursor (None on the last page)
+        StreamingHttpResponse: The same document when streaming is requested
+        HttpResponse: Arrow IPC stream or Parquet file when a format is requested
+        On invalid parameters (status 400):
+            - status: "error"
+            - message: Error description
     """
-    raw_data = WeatherData.objects.exclude(
-        Q(tmax__isnull=True) | Q(tmin__isnull=True) | Q(prcp__isnull=True)
-    ).order_by('date')
-    
-    raw_data = [
-        {
-            "date": data.date,
-            "name": data.name,
-            "latitude": data.latitude,
-            "longitude": data.longitude,
-            "tmax": data.tmax,
-            "tmin": data.tmin,
-            "prcp": data.prcp
-        }
-        for data in raw_data
-    ]
-    
-    return JsonResponse({"raw_data": raw_data})
+    try:
+        fields = parse_fields(request.GET.get('fields'), RAW_DATA_FIELDS)
+        limit = parse_limit(request.GET.get('limit'))
+        shape = parse_shape(request.GET.get('shape'))
+        stream = request.GET.get('stream', '').lower() == 'true'
+        if stream and shape == 'columns':
+            raise FilterError("shape=columns cannot be streamed")
+        raw_data = filter_weather_data(
+            WeatherData.objects.exclude(
+                Q(tmax__isnull=True) | Q(tmin__isnull=True) | Q(prcp__isnull=True)
+            ),
+            request.GET
+        ).order_by('date', 'id')
+        fmt = request.GET.get('format', 'json')
+        if fmt != 'json':
+            return export_response(raw_data, fields, fmt, "raw_data")
+        raw_data = after_cursor(raw_data, request.GET.get('cursor'))
+    except (FilterError, ExportError) as e:
+        return JsonResponse({
+            "status": "error",
+            "message": str(e)
+        }, status=400)
 
-@require_http_methods(["GET"])
+    if limit is not None:
+        # Fetch the keyset columns alongside the requested fields for the cursor
+        page = list(raw_data.values_list('date', 'id', *fields)[:limit])
+        next_cursor = encode_cursor(page[-1][0], page[-1][1]) if len(page) == limit else None
+        return FastJsonResponse({
+            "raw_data": SHAPES[shape]([row[2:] for row in page], fields),
+            "next_cursor": next_cursor
+        })
+
+    rows = raw_data.values_list(*fields)
+    if stream:
+        return StreamingHttpResponse(
+            stream_json_rows("raw_data", rows.iterator(chunk_size=STREAM_CHUNK_SIZE), fields),
+            content_type="application/json"
+        )
+
+    return FastJsonResponse({"raw_data": SHAPES[shape](list(rows), fields)})
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
 def train_ml_model(request):
     """
     Train the machine learning model and return performance metrics.
+
+    A POST queues the training as a background job for the
+    run_training_worker command and returns immediately with the job id;
+    progress is available from the training job status endpoint and the
+    predictions are written to ml_predictions when the job finishes.
     
-    This view handles the ML model training process, including:
+    A GET trains synchronously. This view handles the ML model training process, including:
     - Data retrieval and preprocessing
     - Feature engineering (seasonal and lag features)
-    - Model training
+    - Model training, or reuse of the saved model when the data and
+      hyperparameters have not changed since it was trained
     - Prediction generation
     - Results organization by station
 
+    Query Parameters:
+        retrain (str): When "true", train and save a new model even if a
+            saved model matches the current data
+
+    Request Body (POST, optional):
+        {"hyperparameters": {...}, "retrain": true|false}
+
     Returns:
-        JsonResponse: Contains:
+        JsonResponse (POST, status 202): Contains:
+            - job_id: Id of the queued training job
+            - status: "queued"
+        JsonResponse (GET): Contains:
             - stations: Dictionary of predictions grouped by station
             - total_samples: Number of samples used for training
             - raw_data_count: Number of raw data points
+            - model_key: Registry key of the model that made the predictions
         On error:
             - status: "error"
             - message: Error description
     """
-    try:
-        # Get and process data - sort by name and date
-        ML_data = WeatherData.objects.exclude(
-            Q(tmax__isnull=True) | Q(tmin__isnull=True) | Q(prcp__isnull=True)
-        ).order_by('name', 'date').values('name', 'date', 'latitude', 'longitude', 'tmax', 'tmin', 'prcp')
-
-        data = {
-            "ML_data": [
-                {
-                    "name": data['name'],
-                    "latitude": data['latitude'],
-                    "longitude": data['longitude'],
-                    "date": data['date'], 
-                    "precip": data['prcp'],
-                    "temp_max": data['tmax'],
-                    "temp_min": data['tmin']
-                }
-                for data in ML_data
-            ]
-        }
-        
-        # Process data for ML
-        updated_data = split_date_data(data)
-        updated_data = np.array(updated_data)
+    retrain = request.GET.get('retrain', '').lower() == 'true'
+    if request.method == "POST":
+        try:
+            options = json.loads(request.body) if request.body else {}
+            hyperparameters = options.get("hyperparameters") or {}
+            if not isinstance(hyperparameters, dict):
+                raise ValueError
+        except (ValueError, AttributeError):
+            return JsonResponse({
+                "status": "error",
+                "message": 'Body must be JSON of the form {"hyperparameters": {...}, "retrain": true}'
+            }, status=400)
+        # Imported here so scikit-learn is only loaded when a job is queued
+        from data.linear_regression import check_hyperparameters
+        try:
+            check_hyperparameters(hyperparameters)
+        except ValueError as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=400)
+        job = enqueue_training(hyperparameters, retrain or bool(options.get("retrain")))
+        return JsonResponse({"job_id": job.pk, "status": job.status}, status=202)
 
-        #add season feature
-        updated_data = add_season(updated_data)
-        
-        # Add lag features
-        updated_data = add_lag(updated_data, 6)  # Lag precipitation
-        updated_data = add_lag(updated_data, 7)  # Lag max temperature
-        updated_data = add_lag(updated_data, 8)  # Lag min temperature
-        
-        # Train model and get metrics
-        metrics = train(updated_data)
+    try:
+        # Load the saved model for the current data, or train and save one
+        entry, metrics = get_or_train_model(retrain=retrain)
         
         # Group predictions by station
-        stations = {}
-        for pred in metrics["predictions"]:
-            station_name = pred["name"]
-            if station_name not in stations:
-                stations[station_name] = []
-            stations[station_name].append(pred)
+        stations = group_by_station(metrics["predictions"])
         
         # Create final response with grouped predictions
         return JsonResponse({
             "stations": stations,
-            "total_samples": len(updated_data),
-            "raw_data_count": len(data["ML_data"])
+            "total_samples": metrics["total_samples"],
+            "raw_data_count": metrics["raw_data_count"],
+            "model_key": entry.key
         })
     except Exception as e:
         return JsonResponse({
@@ -133,33 +251,312 @@ def train_ml_model(request):
         }, status=500)
     
 @require_http_methods(["GET"])
+def training_job_status(request, job_id):
+    """
+    Report the state and progress of a training job.
+
+    Returns:
+        JsonResponse: Contains:
+            - job_id, status (queued, running, succeeded or failed)
+            - epoch, total_epochs, loss: Progress of the training run
+            - model_key: Registry key of the trained model once finished
+            - predictions_written: Rows written to ml_predictions
+            - message: Error description for failed jobs
+            - created_at, started_at, heartbeat_at, finished_at
+        On an unknown job id (status 404):
+            - status: "error"
+            - message: Error description
+    """
+    try:
+        job = TrainingJob.objects.get(pk=job_id)
+    except TrainingJob.DoesNotExist:
+        return JsonResponse({
+            "status": "error",
+            "message": f"Training job {job_id} does not exist"
+        }, status=404)
+    return JsonResponse(job_status(job))
+
+@require_http_methods(["GET"])
+@cached_response(ML_PREDICTIONS)
 def get_pred_data(request):
     """
     Retrieve all predicted weather data from the database.
     
     This view fetches ML predictions and actual weather data from the database,
-    organizing the results by weather station.
+    organizing the results by weather station. PostgreSQL groups the rows and
+    builds each station's JSON (see station_blocks.py), so the view only
+    joins the station blocks or, when streaming, writes them one at a time.
+    Responses are cached until new predictions are loaded (see cache.py).
+
+    Query Parameters:
+        station (str): Station name; repeat the parameter for several stations
+        stations (str): Comma separated substrings of station names, such as
+            "ASHEVILLE,RALEIGH"; every station whose name contains any of them
+            is kept (case-insensitive). Use repeated station= for exact names
+        start (str): First date to include (YYYY-MM-DD)
+        end (str): Last date to include (YYYY-MM-DD)
+        bbox (str): Bounding box as min_lon,min_lat,max_lon,max_lat
+        format (str): "arrow" or "parquet" to download the predictions as a
+            columnar binary file instead of JSON
+        shape (str): "records" (default) for a list of prediction objects per
+            station, or "columns" for one array per field per station (the
+            name is left out, as it is the station's key)
+        stream (str): When "true", station blocks are read through a
+            server-side cursor and written to the client as they arrive
 
     Returns:
-        JsonResponse: Contains:
+        HttpResponse: JSON containing:
             - stations: Dictionary of predictions grouped by station
             - total_samples: Total number of predictions
             - raw_data_count: Number of data points
+        StreamingHttpResponse: The same document when streaming is requested
+        HttpResponse: Arrow IPC stream or Parquet file when a format is requested
+        On invalid parameters (status 400):
+            - status: "error"
+            - message: Error description
     """
-    pred_data = ML_Predictions.objects.values(
-        'name', 'latitude', 'longitude', 'year', 'month', 'day', 'date',
-        'predicted_precip', 'predicted_temp_max', 'predicted_temp_min',
-        'actual_precip', 'actual_temp_max', 'actual_temp_min'
+    try:
+        shape = parse_shape(request.GET.get('shape'))
+        pred_data = filter_weather_data(ML_Predictions.objects.all(), request.GET)
+        fmt = request.GET.get('format', 'json')
+        if fmt != 'json':
+            return export_response(pred_data.order_by('name', 'date'), PRED_DATA_FIELDS, fmt, "ml_predictions")
+    except (FilterError, ExportError) as e:
+        return JsonResponse({
+            "status": "error",
+            "message": str(e)
+        }, status=400)
+
+    if request.GET.get('stream', '').lower() == 'true':
+        return StreamingHttpResponse(
+            station_blocks_json(fetch_station_blocks(pred_data, PRED_DATA_FIELDS, shape, stream=True)),
+            content_type="application/json"
+        )
+
+    return HttpResponse(
+        b''.join(station_blocks_json(fetch_station_blocks(pred_data, PRED_DATA_FIELDS, shape))),
+        content_type="application/json"
     )
-    stations = {}
-    for pred in pred_data:
-        station_name = pred["name"]
-        if station_name not in stations:
-            stations[station_name] = []
-        stations[station_name].append(pred)
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def predict(request):
+    """
+    Predict precipitation and temperatures for (station, date) points.
     
+    This view uses the most recently trained model, kept in memory between
+    requests. Features for each point are built from the station's
+    observations on the days before the date, with the same code and fitted
+    preprocessor used in training, and all points go through the model in a
+    single call.
+
+    Query Parameters (GET, single point):
+        station (str): Station name
+        date (str): Date to predict (YYYY-MM-DD)
+
+    Request Body (POST, batch):
+        {"points": [{"station": "...", "date": "YYYY-MM-DD"}, ...]}
+
+    Returns:
+        JsonResponse: Contains:
+            - model_key: Registry key of the model that made the predictions
+            - predictions: One entry per point with name, date, latitude,
+              longitude, year, month, day, precipitation, temp_max and
+              temp_min, or name, date and error if it could not be predicted
+        On error (status 400, or 503 if no model has been trained):
+            - status: "error"
+            - message: Error description
+    """
+    try:
+        names, dates = parse_points(request)
+    except PredictionError as e:
+        return JsonResponse({
+            "status": "error",
+            "message": str(e)
+        }, status=400)
+
+    entry = get_current_model()
+    if entry is None:
+        return JsonResponse({
+            "status": "error",
+            "message": "No trained model is available; train one at /api/ml_data/train/"
+        }, status=503)
+
+    history = fetch_history(entry, names, dates)
+    return JsonResponse({
+        "model_key": entry.key,
+        "predictions": predict_points(entry, names, dates, history)
+    })
+
+@require_http_methods(["GET"])
+def stations(request):
+    """
+    List stations, optionally only those inside a bounding box.
+
+    Stations are read from the in-memory spatial index, so the request does
+    not query the database.
+
+    Query Parameters:
+        bbox (str): "min_lon,min_lat,max_lon,max_lat"
+
+    Returns:
+        JsonResponse: Contains:
+            - stations: name, latitude and longitude of every station, by name
+        On invalid parameters (status 400):
+            - status: "error"
+            - message: Error description
+    """
+    try:
+        bbox = parse_bbox(request.GET['bbox']) if request.GET.get('bbox') else (-180, -90, 180, 90)
+    except FilterError as e:
+        return JsonResponse({
+            "status": "error",
+            "message": str(e)
+        }, status=400)
+
+    index = get_station_index()
+    return JsonResponse({
+        "stations": [index.describe(position) for position in index.within(*bbox)]
+    })
+
+@require_http_methods(["GET"])
+def nearest_stations(request):
+    """
+    Find the stations closest to a point.
+
+    Distances are great-circle distances computed from the in-memory spatial
+    index, which only examines the grid cells around the point.
+
+    Query Parameters:
+        lat (float): Latitude of the point, from -90 to 90
+        lon (float): Longitude of the point, from -180 to 180
+        k (int): Number of stations to return (default 5, at most 100)
+
+    Returns:
+        JsonResponse: Contains:
+            - stations: name, latitude, longitude and distance_km of the
+              closest stations, closest first
+        On invalid parameters (status 400):
+            - status: "error"
+            - message: Error description
+    """
+    try:
+        lat = parse_number(request.GET.get('lat'), 'lat', -90, 90)
+        lon = parse_number(request.GET.get('lon'), 'lon', -180, 180)
+        k = parse_number(request.GET.get('k', 5), 'k', 1, MAX_NEIGHBORS, kind=int)
+    except FilterError as e:
+        return JsonResponse({
+            "status": "error",
+            "message": str(e)
+        }, status=400)
+
+    index = get_station_index()
+    return JsonResponse({
+        "stations": [index.describe(position, distance) for position, distance in index.nearest(lat, lon, k)]
+    })
+
+@require_http_methods(["GET"])
+@cached_response(WEATHER_DATA)
+def station_summary(request, name):
+    """
+    Summarize a station's observations by month and by season.
+
+    The summary is read from the monthly rollups maintained by the loaders,
+    so its cost grows with the number of months, not observations.
+    Responses are cached until the observations are reloaded.
+
+    Query Parameters:
+        start (str): Only include months from the one containing this date (YYYY-MM-DD)
+        end (str): Only include months up to the one containing this date (YYYY-MM-DD)
+
+    Returns:
+        JsonResponse: Contains:
+            - station: name, latitude and longitude of the station
+            - monthly: One entry per month with month (YYYY-MM), observations,
+              mean_tmax, mean_tmin, total_prcp, tmax_days, tmin_days and prcp_days
+            - seasonal: One entry per season (winter, spring, summer, fall)
+              with months and the same values over that season's months
+        On invalid parameters (status 400) or an unknown station (status 404):
+            - status: "error"
+            - message: Error description
+    """
+    try:
+        start = parse_date(request.GET['start'], 'start') if request.GET.get('start') else None
+        end = parse_date(request.GET['end'], 'end') if request.GET.get('end') else None
+    except FilterError as e:
+        return JsonResponse({
+            "status": "error",
+            "message": str(e)
+        }, status=400)
+
+    try:
+        station = Station.objects.get(name=name)
+    except Station.DoesNotExist:
+        return JsonResponse({
+            "status": "error",
+            "message": f"Station '{name}' does not exist"
+        }, status=404)
+
+    return JsonResponse({
+        "station": {"name": station.name, "latitude": station.latitude, "longitude": station.longitude},
+        **summarize_station(station, start, end)
+    })
+
+@require_http_methods(["GET"])
+@cached_response(ML_PREDICTIONS, WEATHER_DATA)
+def timeseries(request):
+    """
+    Return per-station time series downsampled for plotting.
+
+    Every series is reduced on the server to at most the requested number of
+    points, so the payload stays bounded however long the date range is.
+
+    Query Parameters:
+        station (str): Station name; repeat the parameter for several
+            stations (all stations when omitted)
+        start (str): First date to include (YYYY-MM-DD)
+        end (str): Last date to include (YYYY-MM-DD)
+        source (str): "predictions" (default) for predicted vs. actual
+            values, or "observations" for the raw observations
+        fields (str): Comma separated subset of the source's series
+        points (int): Largest number of points per series (default 1000)
+        method (str): "lttb" (default) to preserve the shape of the series,
+            or "minmax" to keep the extremes of every bucket
+
+    Returns:
+        JsonResponse: Contains:
+            - source, method, points: The settings used
+            - stations: {station name: {series: {"date": [...], "value": [...]}}}
+        On invalid parameters (status 400):
+            - status: "error"
+            - message: Error description
+    """
+    try:
+        source = request.GET.get('source', 'predictions')
+        if source not in TIMESERIES_FIELDS:
+            raise FilterError(f"'source' must be one of {', '.join(TIMESERIES_FIELDS)}")
+        fields = parse_fields(request.GET.get('fields'), TIMESERIES_FIELDS[source])
+        method = request.GET.get('method', 'lttb')
+        if method not in DOWNSAMPLE_METHODS:
+            raise FilterError(f"'method' must be one of {', '.join(DOWNSAMPLE_METHODS)}")
+        try:
+            points = int(request.GET.get('points', 1000))
+        except ValueError:
+            points = 0
+        if not MIN_POINTS <= points <= MAX_POINTS:
+            raise FilterError(f"'points' must be an integer from {MIN_POINTS} to {MAX_POINTS}")
+
+        model = ML_Predictions if source == 'predictions' else WeatherData
+        rows = filter_weather_data(model.objects.all(), request.GET).order_by('name', 'date')
+    except FilterError as e:
+        return JsonResponse({
+            "status": "error",
+            "message": str(e)
+        }, status=400)
+
     return JsonResponse({
-        "stations":stations,
-        "total_samples": len(pred_data),
-        "raw_data_count": len(pred_data)
+        "source": source,
+        "method": method,
+        "points": points,
+        "stations": station_series(list(rows.values_list('name', 'date', *fields)), fields, points, method)
     })
@@ -141,6 +141,29 @@ STATICFILES_DIRS = [
     FRONTEND_DIR / 'dist',
 ]
 
+# Machine learning model registry
+# Directory where trained models are saved, keyed by data fingerprint and hyperparameters
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", str(BASE_DIR / 'data' / 'models'))
+
+# Training feature store
+# Directory where feature matrices are saved, keyed by data fingerprint and feature settings
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", str(BASE_DIR / 'data' / 'feature_store'))
+
+# Worker processes for per-station training; unset or 0 uses every CPU core
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS") or 0) or None
+
+# Response cache for the raw data and prediction endpoints
+# BACKEND is "memory" (per-process LRU) or "file" (shared directory at LOCATION);
+# MAX_BYTES caps the compressed bodies kept before the least recently used are evicted
+RESPONSE_CACHE = {
+    'BACKEND': os.getenv("RESPONSE_CACHE_BACKEND", 'memory'),
+    'LOCATION': os.getenv("RESPONSE_CACHE_DIR", str(BASE_DIR / '.response_cache')),
+    'MAX_BYTES': int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+}
+
+# JSON encoder for the large data endpoints: "orjson" (used when installed) or "json" (standard library)
+JSON_SERIALIZER = os.getenv("JSON_SERIALIZER", 'orjson')
+
 # Default primary key field type
 # Specifies the type of auto-created primary key fields
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField' 
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Benchmark for the columnar export formats.
+
+    Builds a synthetic observation set shaped like climate_data2020_2024
+    (one row per station per day over 2020-2024) and compares payload size,
+    encode time and decode time of the JSON response body against the Arrow
+    IPC and Parquet exports. No database is needed.
+
+    Usage:
+        python -m benchmarks.bench_columnar_export [n_stations]
+"""
+
+import io
+import sys
+import json
+import time
+import numpy as np
+from django.core.serializers.json import DjangoJSONEncoder
+from backend.apps.weather.export import columns_to_bytes
+
+def synthetic_columns(n_stations):
+    """
+    Builds typed columns for n_stations stations with daily rows for 2020-2024.
+
+    Args:
+        n_stations (int): Number of stations to generate
+
+    Returns:
+        dict: Field name to numpy array, in the raw data endpoint field order
+    """
+    rng = np.random.default_rng(111)
+    days = np.arange(np.datetime64("2020-01-01"), np.datetime64("2025-01-01"))
+    n_rows = n_stations * len(days)
+    station_names = np.array([f"STATION {i}, NC US" for i in range(n_stations)], dtype=object)
+    lat = rng.uniform(34.0, 36.5, n_stations)
+    lon = rng.uniform(-84.0, -76.0, n_stations)
+    station = np.repeat(np.arange(n_stations), len(days))
+    return {
+        "date": np.tile(days, n_stations),
+        "name": station_names[station],
+        "latitude": lat[station],
+        "longitude": lon[station],
+        "tmax": rng.normal(70, 15, n_rows).round(),
+        "tmin": rng.normal(50, 15, n_rows).round(),
+        "prcp": rng.exponential(0.1, n_rows).round(2),
+    }
+
+def encode_json(columns):
+    """Encodes columns the way get_raw_data does: a list of row objects."""
+    fields = list(columns)
+    dates = columns["date"].astype(object)
+    rows = zip(dates, *(columns[field].tolist() for field in fields[1:]))
+    return json.dumps({"raw_data": [dict(zip(fields, row)) for row in rows]}, cls=DjangoJSONEncoder).encode()
+
+def decode(fmt, body):
+    """Decodes a payload back into a table (or list of dicts for JSON)."""
+    if fmt == "json":
+        return json.loads(body)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if fmt == "arrow":
+        return pa.ipc.open_stream(body).read_all()
+    return pq.read_table(io.BytesIO(body))
+
+def timed(func, *args, repeat=3):
+    """Runs func repeat times and returns (result, best seconds)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def main():
+    n_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    columns = synthetic_columns(n_stations)
+    print(f"{len(columns['date'])} rows from {n_stations} stations\n")
+
+    print(f"{'format':<10}{'size (MB)':>12}{'ratio':>8}{'encode (ms)':>14}{'decode (ms)':>14}")
+    json_size = None
+    for fmt in ("json", "arrow", "parquet"):
+        if fmt == "json":
+            body, encode_time = timed(encode_json, columns)
+            json_size = len(body)
+        else:
+            body, encode_time = timed(columns_to_bytes, columns, fmt)
+        _, decode_time = timed(decode, fmt, body)
+        print(f"{fmt:<10}{len(body) / 1e6:>12.2f}{json_size / len(body):>8.1f}"
+              f"{encode_time * 1000:>14.1f}{decode_time * 1000:>14.1f}")
+
+if __name__ == "__main__":
+    main()
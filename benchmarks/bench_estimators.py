@@ -0,0 +1,69 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Benchmark for the estimator backends of linear_regression.train.
+
+    Builds features for synthetic stations with seasonal temperatures and
+    day-to-day persistence, so the lag features carry signal, preprocesses
+    and splits them the way train() does, and then reports the fit time and
+    the scaled test MSE of every backend in ESTIMATORS on the same split.
+
+    Usage:
+        python -m benchmarks.bench_estimators [n_stations] [keras_epochs]
+"""
+
+import sys
+import time
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from data.features import TARGET_COLUMNS, build_features, drop_incomplete
+from data.linear_regression import ESTIMATORS, HYPERPARAMETERS, mean_squared_error, preprocess_data
+
+def synthetic_columns(n_stations, days=1827):
+    """Typed columns for one row per station per day from 2020-01-01."""
+    rng = np.random.default_rng(111)
+    day = np.arange(days)
+    dates = np.datetime64("2020-01-01", "D") + day
+    season = np.sin((day - 100) * 2 * np.pi / 365.25)
+    columns = {name: [] for name in ("station", "date", "latitude", "longitude", "prcp", "tmax", "tmin")}
+    for station in range(n_stations):
+        # AR(1) anomalies so yesterday's weather predicts today's
+        anomaly = np.zeros(days)
+        noise = rng.normal(0, 5, days)
+        for index in range(1, days):
+            anomaly[index] = 0.7 * anomaly[index - 1] + noise[index]
+        columns["station"].append(np.full(days, station, dtype=np.int32))
+        columns["date"].append(dates)
+        columns["latitude"].append(np.full(days, rng.uniform(34.0, 36.5)))
+        columns["longitude"].append(np.full(days, rng.uniform(-84.0, -76.0)))
+        columns["tmax"].append(72 + 15 * season + anomaly)
+        columns["tmin"].append(50 + 15 * season + 0.8 * anomaly + rng.normal(0, 3, days))
+        columns["prcp"].append(np.maximum(rng.normal(0.05, 0.2, days) - 0.02 * anomaly, 0))
+    return {name: np.concatenate(values) for name, values in columns.items()}
+
+def main():
+    n_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    epochs = int(sys.argv[2]) if len(sys.argv) > 2 else HYPERPARAMETERS["epochs"]
+    features = drop_incomplete(build_features(**synthetic_columns(n_stations)))
+
+    X = preprocess_data(features.shape[1]).fit_transform(features)
+    y = StandardScaler().fit_transform(features[:, TARGET_COLUMNS].astype(float))
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=HYPERPARAMETERS["test_size"], random_state=HYPERPARAMETERS["random_state"]
+    )
+    print(f"{len(X_train)} training and {len(X_test)} test rows, {X.shape[1]} features\n")
+
+    print(f"{'estimator':<12}{'fit (ms)':>12}{'train MSE':>12}{'test MSE':>12}")
+    for name, fit in ESTIMATORS.items():
+        params = {**HYPERPARAMETERS, "estimator": name, "epochs": epochs}
+        start = time.perf_counter()
+        model = fit(X_train, y_train, params)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12}{elapsed * 1000:>12.1f}"
+              f"{mean_squared_error(model, X_train, y_train):>12.5f}{mean_squared_error(model, X_test, y_test):>12.5f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Benchmark for the feature engineering pipeline.
+
+    Compares the row-by-row split_date_data/add_season/add_lag pipeline from
+    linear_regression.py against features.build_features on a synthetic
+    dataset shaped like the 2020-2024 observations. Reports wall time, peak
+    traced memory and the size of the resulting feature matrix, and checks
+    that both produce the same date, season and measurement columns (lags
+    differ on purpose: the legacy lags wrap across stations). The "build
+    only" line excludes the conversion of database rows into typed columns;
+    the "store" line memory-maps the same matrix back from a FeatureStore
+    and touches every page of it, as a training run on unchanged data does.
+
+    Usage:
+        python -m benchmarks.bench_feature_pipeline [n_stations]
+"""
+
+import sys
+import time
+import datetime
+import tempfile
+import tracemalloc
+import numpy as np
+from data.feature_store import FeatureStore
+from data.features import build_features, columns_from_rows
+from data.linear_regression import split_date_data, add_season, add_lag
+
+def synthetic_rows(n_stations):
+    """
+    Builds (name, date, latitude, longitude, prcp, tmax, tmin) rows with one
+    row per station per day over 2020-2024, sorted by station and date.
+    """
+    rng = np.random.default_rng(111)
+    start = datetime.date(2020, 1, 1)
+    n_days = (datetime.date(2025, 1, 1) - start).days
+    rows = []
+    for station in range(n_stations):
+        lat, lon = rng.uniform(34.0, 36.5), rng.uniform(-84.0, -76.0)
+        for day in range(n_days):
+            rows.append((
+                f"STATION {station:03d}, NC US", start + datetime.timedelta(days=day), lat, lon,
+                round(float(rng.exponential(0.1)), 2), float(rng.integers(40, 95)), float(rng.integers(20, 70))
+            ))
+    return rows
+
+def legacy_pipeline(rows):
+    """Runs the original pipeline the way train_ml_model used to."""
+    data = {"ML_data": [
+        {"name": name, "latitude": lat, "longitude": lon, "date": date.isoformat(),
+         "precip": prcp, "temp_max": tmax, "temp_min": tmin}
+        for name, date, lat, lon, prcp, tmax, tmin in rows
+    ]}
+    updated_data = np.array(split_date_data(data))
+    updated_data = add_season(updated_data)
+    updated_data = add_lag(updated_data, 6)
+    updated_data = add_lag(updated_data, 7)
+    updated_data = add_lag(updated_data, 8)
+    return updated_data
+
+def vectorized_pipeline(rows):
+    """Runs the typed column pipeline used by train_ml_model."""
+    station_names, columns = columns_from_rows(rows)
+    return station_names, build_features(**columns)
+
+def measure(func, rows):
+    """
+    Returns (result, seconds, peak traced MB). Time and memory are measured
+    in separate calls since tracing allocations slows the code down.
+    """
+    start = time.perf_counter()
+    result = func(rows)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+def main():
+    n_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rows = synthetic_rows(n_stations)
+    print(f"{len(rows)} rows from {n_stations} stations\n")
+
+    legacy, legacy_time, legacy_peak = measure(legacy_pipeline, rows)
+    (station_names, features), new_time, new_peak = measure(vectorized_pipeline, rows)
+
+    _, columns = columns_from_rows(rows)
+    _, build_time, build_peak = measure(lambda typed: build_features(**typed), columns)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = FeatureStore(root)
+        store.save("bench", station_names, features, {})
+
+        def from_store(key):
+            _, stored, _ = store.load(key)
+            return stored, float(np.nansum(stored))
+
+        (stored, _), store_time, store_peak = measure(from_store, "bench")
+        same_stored = np.array_equal(stored, features, equal_nan=True)
+        del stored
+
+    same_names = np.array_equal(station_names[features[:, 0].astype(int)], legacy[:, 0])
+    same_values = np.allclose(legacy[:, 1:10].astype(float), features[:, 1:10], atol=1e-4)
+
+    print(f"{'pipeline':<12}{'time (ms)':>12}{'peak (MB)':>12}{'matrix (MB)':>14}")
+    print(f"{'legacy':<12}{legacy_time * 1000:>12.1f}{legacy_peak:>12.1f}{legacy.nbytes / 1e6:>14.1f}")
+    print(f"{'vectorized':<12}{new_time * 1000:>12.1f}{new_peak:>12.1f}{features.nbytes / 1e6:>14.1f}")
+    print(f"{'build only':<12}{build_time * 1000:>12.1f}{build_peak:>12.1f}{features.nbytes / 1e6:>14.1f}")
+    print(f"{'store':<12}{store_time * 1000:>12.1f}{store_peak:>12.1f}{features.nbytes / 1e6:>14.1f}")
+    print(f"\nspeedup: {legacy_time / new_time:.1f}x, outputs match: {same_names and same_values}, "
+          f"stored matrix matches: {same_stored}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Import-time benchmark and check for Django startup.
+
+    Starts fresh interpreters with `python -X importtime` that set up Django
+    and resolve the URLs of the data endpoints, the work every web and
+    manage.py process does before serving anything, and reports the wall
+    time, peak RSS and the slowest imports. A second run also imports the
+    training code, to show what the ML dependencies would add if they were
+    imported at startup.
+
+    The check fails (exit status 1) if TensorFlow, Keras or scikit-learn is
+    imported by the startup run; these must only be imported once training
+    or inference actually runs.
+
+    Usage:
+        python -m benchmarks.bench_import_time [slowest]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Data endpoints whose URL resolution must not import the ML dependencies
+DATA_URLS = (
+    "/api/raw-data/", "/api/ml_data/pred/", "/api/timeseries/",
+    "/api/stations/", "/api/stations/nearest/", "/api/stations/STATION/summary/",
+)
+
+# Modules that must not be loaded by startup
+HEAVY_MODULES = ("tensorflow", "keras", "sklearn")
+
+STARTUP = f"""
+import json, resource, sys
+import django
+django.setup()
+from django.urls import resolve
+for url in {DATA_URLS!r}:
+    resolve(url)
+{{extra}}
+print(json.dumps({{
+    "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+    "modules": len(sys.modules),
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+def run(extra=""):
+    """
+    Runs the startup code in a fresh interpreter.
+
+    Returns:
+        tuple: (wall seconds, result dict, [(cumulative us, module)] from -X importtime)
+    """
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "backend.config.settings")}
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP.replace("{extra}", extra)],
+        capture_output=True, text=True, env=env, check=True
+    )
+    elapsed = time.perf_counter() - start
+
+    imports = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # top-level imports only
+            imports.append((int(cumulative), name.strip()))
+    return elapsed, json.loads(process.stdout.strip().splitlines()[-1]), imports
+
+def main():
+    slowest = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    failed = []
+    for label, extra in (
+        ("startup", ""),
+        ("startup + training imports", "import data.linear_regression, data.model_registry; from tensorflow import keras"),
+    ):
+        elapsed, result, imports = run(extra)
+        print(f"{label}: {elapsed:.2f} s wall, {result['rss_mb']:.0f} MB peak RSS, "
+              f"{result['modules']} modules, heavy modules loaded: {', '.join(result['loaded']) or 'none'}")
+        for cumulative, name in sorted(imports, reverse=True)[:slowest]:
+            print(f"    {cumulative / 1000:>9.1f} ms  {name}")
+        if label == "startup":
+            failed = result["loaded"]
+    if failed:
+        print(f"FAIL: startup imported {', '.join(failed)}")
+        sys.exit(1)
+    print("OK: startup does not import the ML dependencies")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Benchmark for JSON serialization of the prediction endpoint.
+
+    Builds synthetic prediction rows (see bench_timeseries) grouped by
+    station as /api/ml_data/pred/ returns them, and times shaping plus
+    encoding for the records and columns response shapes with the standard
+    library encoder JsonResponse uses and with orjson, reporting the payload
+    size of each. The database query is not included.
+
+    Usage:
+        python -m benchmarks.bench_json [n_stations] [repeats]
+"""
+
+import json
+import sys
+import time
+from django.core.serializers.json import DjangoJSONEncoder
+
+from benchmarks.bench_timeseries import FIELDS, synthetic_series
+from backend.apps.weather.serialization import SHAPES, dumps_json, dumps_orjson, orjson
+
+def encode_baseline(stations, shape):
+    """Encodes like the previous JsonResponse, only for records."""
+    return json.dumps({"stations": {
+        name: SHAPES[shape](rows, ("name", "date", *FIELDS)) for name, rows in stations.items()
+    }}, cls=DjangoJSONEncoder).encode()
+
+def encoder(dumps):
+    """Shapes the station rows and encodes them with dumps."""
+    def encode(stations, shape):
+        if shape == "columns":
+            return dumps({"stations": {
+                name: SHAPES[shape]([row[1:] for row in rows], ("date", *FIELDS)) for name, rows in stations.items()
+            }})
+        return dumps({"stations": {
+            name: SHAPES[shape](rows, ("name", "date", *FIELDS)) for name, rows in stations.items()
+        }})
+    return encode
+
+def main():
+    n_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    stations = {}
+    for row in synthetic_series(n_stations):
+        stations.setdefault(row[0], []).append(row)
+    n_rows = sum(len(rows) for rows in stations.values())
+    print(f"{n_rows} rows from {n_stations} stations, best of {repeats}\n")
+
+    cases = [("JsonResponse", "records", encode_baseline)]
+    cases += [("json", shape, encoder(dumps_json)) for shape in SHAPES]
+    if orjson is not None:
+        cases += [("orjson", shape, encoder(dumps_orjson)) for shape in SHAPES]
+    else:
+        print("orjson is not installed; only the standard library is timed\n")
+
+    print(f"{'encoder':<14}{'shape':<10}{'time (ms)':>10}{'size (MB)':>11}{'speedup':>9}")
+    baseline = None
+    for name, shape, encode in cases:
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            payload = encode(stations, shape)
+            best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        print(f"{name:<14}{shape:<10}{best * 1000:>10.1f}{len(payload) / 1e6:>11.2f}{baseline / best:>9.1f}")
+
+if __name__ == "__main__":
+    main()
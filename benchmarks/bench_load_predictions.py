@@ -0,0 +1,103 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Benchmark for loading ML predictions into PostgreSQL.
+
+    Compares the previous loader (one INSERT ... ON CONFLICT round-trip per
+    record) against the bulk COPY + set-based merge in load_db. Both runs
+    write to a scratch table that is dropped afterwards, so ml_predictions
+    is never touched. Uses the same DB_* environment variables as load_db.
+
+    Usage:
+        python -m benchmarks.bench_load_predictions [n_records]
+"""
+
+import sys
+import time
+import datetime
+import psycopg2
+from psycopg2 import sql
+from backend.apps.weather.load_db import (
+    DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER, PREDICTION_COLUMNS, create_table,
+    insert_ml_predictions
+)
+
+SCRATCH_TABLE = "ml_predictions_benchmark"
+
+def synthetic_predictions(n_records):
+    """Builds n_records prediction records grouped by station."""
+    stations = {}
+    start = datetime.date(2020, 1, 1)
+    per_station = 1827
+    for i in range(n_records):
+        name = f"STATION {i // per_station:03d}, NC US"
+        date = start + datetime.timedelta(days=i % per_station)
+        stations.setdefault(name, []).append({
+            "name": name, "latitude": 35.5, "longitude": -79.5,
+            "year": date.year, "month": date.month, "day": date.day, "date": date.isoformat(),
+            "predicted_precip": 0.1, "predicted_temp_max": 70.0, "predicted_temp_min": 50.0,
+            "actual_precip": 0.2, "actual_temp_max": 72.0, "actual_temp_min": 48.0,
+        })
+    return {"stations": stations}
+
+def per_row_insert(conn, data):
+    """The previous loader: one upsert round-trip per record."""
+    cursor = conn.cursor()
+    create_table(cursor, SCRATCH_TABLE)
+    query = sql.SQL("""
+        INSERT INTO {} ({}) VALUES ({})
+        ON CONFLICT (name, date) DO UPDATE SET
+            predicted_precip = EXCLUDED.predicted_precip,
+            predicted_temp_max = EXCLUDED.predicted_temp_max,
+            predicted_temp_min = EXCLUDED.predicted_temp_min,
+            actual_precip = EXCLUDED.actual_precip,
+            actual_temp_max = EXCLUDED.actual_temp_max,
+            actual_temp_min = EXCLUDED.actual_temp_min
+    """).format(
+        sql.Identifier(SCRATCH_TABLE),
+        sql.SQL(", ").join(map(sql.Identifier, PREDICTION_COLUMNS)),
+        sql.SQL(", ").join(sql.Placeholder() * len(PREDICTION_COLUMNS))
+    )
+    for records in data["stations"].values():
+        for record in records:
+            cursor.execute(query, [record[column] for column in PREDICTION_COLUMNS])
+    conn.commit()
+    cursor.close()
+
+def drop_scratch(conn):
+    """Drops the scratch table."""
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(SCRATCH_TABLE)))
+    conn.commit()
+
+def main():
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    data = synthetic_predictions(n_records)
+    conn = psycopg2.connect(dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT)
+    print(f"{n_records} records\n")
+
+    try:
+        results = {}
+        for label, load in (
+            ("per-row", lambda: per_row_insert(conn, data)),
+            ("bulk", lambda: insert_ml_predictions(data, conn=conn, table=SCRATCH_TABLE)),
+        ):
+            # Time an initial load into an empty table, then a full upsert over it
+            drop_scratch(conn)
+            start = time.perf_counter()
+            load()
+            insert_time = time.perf_counter() - start
+            start = time.perf_counter()
+            load()
+            results[label] = (insert_time, time.perf_counter() - start)
+    finally:
+        drop_scratch(conn)
+        conn.close()
+
+    print(f"\n{'loader':<10}{'insert (s)':>12}{'upsert (s)':>12}{'rows/s':>12}")
+    for label, (insert_time, upsert_time) in results.items():
+        print(f"{label:<10}{insert_time:>12.2f}{upsert_time:>12.2f}{n_records / upsert_time:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
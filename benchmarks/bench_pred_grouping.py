@@ -0,0 +1,62 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Benchmark for grouping predictions by station.
+
+    Builds the /api/ml_data/pred/ document from the ml_predictions table in
+    the configured database two ways: loading every row into Python and
+    grouping them in a dict before encoding with serialization.dumps, and
+    with the per-station JSON blocks PostgreSQL builds (station_blocks.py).
+    Both response shapes are timed, the response cache is not involved.
+
+    Usage:
+        python -m benchmarks.bench_pred_grouping [repeats]
+"""
+
+import os
+import sys
+import time
+
+def group_in_python(queryset, fields, shape):
+    """Builds the document from rows grouped in Python."""
+    from backend.apps.weather.serialization import SHAPES, dumps
+
+    rows = list(queryset.order_by('name', 'date').values_list(*fields))
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row[0], []).append(row)
+    if shape == "columns":
+        stations = {name: SHAPES[shape]([row[1:] for row in group], fields[1:]) for name, group in grouped.items()}
+    else:
+        stations = {name: SHAPES[shape](group, fields) for name, group in grouped.items()}
+    return dumps({"stations": stations, "total_samples": len(rows), "raw_data_count": len(rows)})
+
+def group_in_sql(queryset, fields, shape):
+    """Builds the document from station blocks grouped by PostgreSQL."""
+    from backend.apps.weather.station_blocks import fetch_station_blocks, station_blocks_json
+
+    return b''.join(station_blocks_json(fetch_station_blocks(queryset, fields, shape)))
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.config.settings')
+    import django
+    django.setup()
+    from backend.apps.weather.models import ML_Predictions
+    from backend.apps.weather.views import PRED_DATA_FIELDS
+
+    queryset = ML_Predictions.objects.all()
+    print(f"{queryset.count()} predictions, best of {repeats}\n")
+    print(f"{'grouping':<10}{'shape':<10}{'time (ms)':>10}{'size (MB)':>11}")
+    for shape in ("records", "columns"):
+        for label, build in (("python", group_in_python), ("sql", group_in_sql)):
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                payload = build(queryset, PRED_DATA_FIELDS, shape)
+                best = min(best, time.perf_counter() - start)
+            print(f"{label:<10}{shape:<10}{best * 1000:>10.1f}{len(payload) / 1e6:>11.2f}")
+
+if __name__ == "__main__":
+    main()
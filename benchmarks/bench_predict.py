@@ -0,0 +1,79 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Micro-benchmark for the prediction endpoint.
+
+    Trains a small model on synthetic observations (one epoch, the accuracy
+    does not matter here) and measures predict_points, the code behind
+    /api/predict/ after the observation query:
+    - single point latency (p50/p99) over many requests
+    - batch throughput in predictions per second
+
+    The database query that fetches history is not included; it is a single
+    indexed range query per request.
+
+    Usage:
+        python -m benchmarks.bench_predict [n_stations]
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.config.settings')
+import django
+django.setup()
+
+from benchmarks.bench_feature_pipeline import synthetic_rows
+from backend.apps.weather.inference import predict_points
+from data.features import build_features, columns_from_rows, drop_incomplete
+from data.linear_regression import train
+from data.model_registry import ModelEntry
+
+def slice_history(history, mask):
+    """Returns the history rows selected by a boolean mask."""
+    return {column: values[mask] for column, values in history.items()}
+
+def main():
+    n_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rows = synthetic_rows(n_stations)
+    station_names, history = columns_from_rows(rows)
+    features = drop_incomplete(build_features(**history))
+    metrics = train(features, station_names, {"epochs": 1})
+    entry = ModelEntry(
+        "benchmark", metrics["model"], metrics["preprocessor"], metrics["output_scaler"],
+        station_names, {"features": {"lags": [1], "rolling": None}}
+    )
+    rng = np.random.default_rng(111)
+    days = np.unique(history["date"])[1:]
+
+    # Single point requests, each with only the history a real request fetches
+    latencies = []
+    for _ in range(1000):
+        station = int(rng.integers(n_stations))
+        day = days[rng.integers(len(days))]
+        mask = (history["station"] == station) & (history["date"] == day - 1)
+        point_history = slice_history(history, mask)
+        start = time.perf_counter()
+        predict_points(entry, [station_names[station]], np.array([day]), point_history)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies[10:]) * 1000
+    print(f"single point: p50 {np.percentile(latencies, 50):.2f} ms, "
+          f"p99 {np.percentile(latencies, 99):.2f} ms")
+
+    # One batch over random stations and days
+    batch_size = 10000
+    stations = rng.integers(n_stations, size=batch_size)
+    dates = days[rng.integers(len(days), size=batch_size)]
+    names = station_names[stations].tolist()
+    start = time.perf_counter()
+    results = predict_points(entry, names, dates, history)
+    elapsed = time.perf_counter() - start
+    predicted = sum("error" not in result for result in results)
+    print(f"batch of {batch_size}: {elapsed * 1000:.1f} ms, "
+          f"{batch_size / elapsed:,.0f} predictions/s ({predicted} predicted)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Benchmark for the raw data endpoint.
+
+    Compares the buffered JsonResponse path of get_raw_data against the
+    streaming path (?stream=true). Each mode runs in its own process so the
+    reported peak RSS is not polluted by the other run.
+
+    Usage:
+        python -m benchmarks.bench_raw_data_stream
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import subprocess
+
+MODES = ["buffered", "stream"]
+
+def run_mode(mode):
+    """
+    Calls get_raw_data once in the given mode and measures it.
+
+    Args:
+        mode (str): "buffered" or "stream"
+
+    Returns:
+        dict: ttfb, total time, bytes written and peak RSS growth in MB
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.config.settings')
+    import django
+    django.setup()
+    from django.test import RequestFactory
+    from backend.apps.weather.views import get_raw_data
+
+    params = {"stream": "true"} if mode == "stream" else {}
+    request = RequestFactory().get('/api/raw-data/', params)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    response = get_raw_data(request)
+
+    size = 0
+    ttfb = None
+    if response.streaming:
+        for chunk in response.streaming_content:
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+            size += len(chunk)
+    else:
+        size = len(response.content)
+        ttfb = time.perf_counter() - start
+    total = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "mode": mode,
+        "ttfb_ms": ttfb * 1000,
+        "total_ms": total * 1000,
+        "bytes": size,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": (rss_after - rss_before) / 1024,
+    }
+
+def main():
+    if len(sys.argv) > 1:
+        print(json.dumps(run_mode(sys.argv[1])))
+        return
+
+    print(f"{'mode':<10}{'ttfb (ms)':>12}{'total (ms)':>12}{'MB sent':>10}{'peak RSS +MB':>14}")
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_raw_data_stream", mode],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{result['mode']:<10}{result['ttfb_ms']:>12.1f}{result['total_ms']:>12.1f}"
+              f"{result['bytes'] / 1e6:>10.1f}{result['peak_rss_mb']:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Benchmark for the station spatial index.
+
+    Places synthetic stations across North Carolina and times nearest-station
+    and bounding-box lookups through StationIndex, the code behind
+    /api/stations/nearest/ and /api/stations/, against a brute-force scan
+    of every station. Results of both are compared for every query.
+
+    Usage:
+        python -m benchmarks.bench_spatial [n_stations] [queries]
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.config.settings')
+import django
+django.setup()
+
+from backend.apps.weather.spatial import StationIndex, haversine_km
+
+def main():
+    n_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = np.random.default_rng(111)
+    latitudes = rng.uniform(33.8, 36.6, n_stations)
+    longitudes = rng.uniform(-84.3, -75.5, n_stations)
+    names = [f"STATION {station:04d}, NC US" for station in range(n_stations)]
+
+    start = time.perf_counter()
+    index = StationIndex(names, latitudes, longitudes)
+    print(f"{n_stations} stations indexed in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    points = np.column_stack([rng.uniform(33.8, 36.6, queries), rng.uniform(-84.3, -75.5, queries)])
+    for k in (1, 5, 25):
+        start = time.perf_counter()
+        found = [index.nearest(lat, lon, k) for lat, lon in points]
+        indexed = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = [np.sort(haversine_km(lat, lon, latitudes, longitudes))[:k] for lat, lon in points]
+        scanned = time.perf_counter() - start
+        assert all(
+            np.allclose([distance for _, distance in result], distances)
+            for result, distances in zip(found, expected)
+        )
+        print(f"nearest k={k}: {indexed / queries * 1e6:.0f} us/query "
+              f"(brute force {scanned / queries * 1e6:.0f} us/query)")
+
+    boxes = np.column_stack([points[:, 1], points[:, 0], points[:, 1] + 0.5, points[:, 0] + 0.5])
+    start = time.perf_counter()
+    found = [index.within(*box) for box in boxes]
+    indexed = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = [
+        sorted(names[position] for position in np.flatnonzero(
+            (longitudes >= min_lon) & (latitudes >= min_lat)
+            & (longitudes <= max_lon) & (latitudes <= max_lat)
+        ))
+        for min_lon, min_lat, max_lon, max_lat in boxes
+    ]
+    scanned = time.perf_counter() - start
+    assert all(index.names[result].tolist() == inside for result, inside in zip(found, expected))
+    print(f"bbox 0.5 deg: {indexed / queries * 1e6:.0f} us/query "
+          f"(brute force {scanned / queries * 1e6:.0f} us/query)")
+
+if __name__ == "__main__":
+    main()
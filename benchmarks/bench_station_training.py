@@ -0,0 +1,55 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Benchmark for per-station training.
+
+    Trains one model per synthetic station (see bench_estimators) serially
+    in this process, then with train_per_station for a doubling number of
+    worker processes up to the CPU count, and reports wall time, speedup
+    over the serial run and the merged test loss, which must not depend on
+    the number of workers. The forkserver the pools fork from is started
+    once per process, which is timed separately first.
+
+    Usage:
+        python -m benchmarks.bench_station_training [n_stations] [max_workers]
+"""
+
+import os
+import sys
+import time
+
+from benchmarks.bench_estimators import synthetic_columns
+from data.features import build_features, drop_incomplete, encode_stations
+from data.linear_regression import train
+from data.station_training import station_ranges, train_per_station
+
+def main():
+    n_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    features = drop_incomplete(build_features(**synthetic_columns(n_stations)))
+    station_names, _ = encode_stations([f"STATION {station:03d}, NC US" for station in range(n_stations)])
+    print(f"{len(features)} rows from {n_stations} stations, {os.cpu_count()} CPUs\n")
+
+    ranges = station_ranges(features[:, 0].astype(int))
+    start = time.perf_counter()
+    for _, first, last in ranges:
+        train(features[first:last], station_names)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    train_per_station(features[:ranges[0][2]], station_names, workers=1)
+    print(f"forkserver start and one station: {time.perf_counter() - start:.2f} s\n")
+
+    print(f"{'workers':<10}{'time (s)':>10}{'speedup':>10}{'test loss':>12}")
+    print(f"{'serial':<10}{serial:>10.2f}{1:>10.1f}")
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        metrics = train_per_station(features, station_names, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"{workers:<10}{elapsed:>10.2f}{serial / elapsed:>10.1f}{metrics['test_loss']:>12.5f}")
+        workers *= 2
+
+if __name__ == "__main__":
+    main()
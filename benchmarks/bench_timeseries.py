@@ -0,0 +1,69 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Benchmark for the downsampled time series endpoint.
+
+    Builds synthetic predicted vs. actual series (five years of daily values
+    per station) and compares the JSON payload of the full series, as
+    /api/ml_data/pred/ returns them, with the payload and the downsampling
+    time of station_series, the code behind /api/timeseries/, for both
+    methods. The database query is not included.
+
+    Usage:
+        python -m benchmarks.bench_timeseries [n_stations] [points]
+"""
+
+import datetime
+import json
+import sys
+import time
+import numpy as np
+
+from backend.apps.weather.downsample import DOWNSAMPLE_METHODS, station_series
+
+FIELDS = (
+    'predicted_temp_max', 'actual_temp_max', 'predicted_temp_min', 'actual_temp_min',
+    'predicted_precip', 'actual_precip'
+)
+
+def synthetic_series(n_stations, days=1827):
+    """Builds (name, date, *values) rows ordered by name and date."""
+    rng = np.random.default_rng(111)
+    start = datetime.date(2020, 1, 1)
+    dates = [start + datetime.timedelta(days=day) for day in range(days)]
+    season = np.sin(np.arange(days) * 2 * np.pi / 365.25)
+    rows = []
+    for station in range(n_stations):
+        name = f"STATION {station:03d}, NC US"
+        values = np.column_stack([
+            70 + 20 * season + rng.normal(0, 5, days) for _ in range(4)
+        ] + [rng.exponential(0.1, days) for _ in range(2)])
+        rows.extend((name, date, *row) for date, row in zip(dates, values.tolist()))
+    return rows
+
+def main():
+    n_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    points = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rows = synthetic_series(n_stations)
+
+    full = json.dumps({
+        "stations": [
+            {"name": name, "date": date.isoformat(), **dict(zip(FIELDS, values))}
+            for name, date, *values in rows
+        ]
+    })
+    print(f"{len(rows)} rows x {len(FIELDS)} series; full payload {len(full) / 1e6:.1f} MB")
+
+    for method in DOWNSAMPLE_METHODS:
+        station_series(rows[:5000], FIELDS, points, method)
+        start = time.perf_counter()
+        stations = station_series(rows, FIELDS, points, method)
+        elapsed = time.perf_counter() - start
+        payload = json.dumps({"stations": stations})
+        kept = sum(len(series["date"]) for station in stations.values() for series in station.values())
+        print(f"{method}: {elapsed * 1000:.1f} ms, {kept} points kept, "
+              f"payload {len(payload) / 1e6:.2f} MB ({len(full) / len(payload):.1f}x smaller)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Data version counters shared by the loaders and the web application.
+
+    Every loader that changes a table bumps that dataset's counter in the
+    data_versions table. The web application includes the counters in its
+    response cache keys, so cached responses are invalidated as soon as new
+    data is loaded, by any process.
+
+    The statements are plain SQL so they can be run through psycopg2,
+    SQLAlchemy or Django connections alike.
+"""
+
+# Datasets with a version counter
+WEATHER_DATA = "weather_data"
+ML_PREDICTIONS = "ml_predictions"
+DATASETS = (WEATHER_DATA, ML_PREDICTIONS)
+
+# Matches the table created by the DataVersion migration, for loaders that
+# run before the web application's migrations
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS data_versions (
+        name VARCHAR(64) PRIMARY KEY,
+        version BIGINT NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+    )
+"""
+
+def bump_sql(name):
+    '''
+    Builds the statement that increments a dataset's version counter.
+
+    Parameters:
+        name (str): one of DATASETS
+    Returns:
+        str: an upsert that creates the counter at 1 or increments it
+    '''
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset '{name}'; expected one of {DATASETS}")
+    return f"""
+        INSERT INTO data_versions (name, version, updated_at) VALUES ('{name}', 1, now())
+        ON CONFLICT (name) DO UPDATE SET version = data_versions.version + 1, updated_at = now()
+    """
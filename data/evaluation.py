@@ -0,0 +1,437 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Time-series cross-validation and hyperparameter sweeps for the weather
+    prediction model.
+
+    train() scores a model on a random split, which lets it learn from days
+    after the ones it is tested on. This module scores models the way they
+    are used, on days after everything they were trained on:
+    - rolling_origin_splits: expanding-window folds; each fold tests on the
+      next horizon days and trains on every day before them, and folds whose
+      test window holds no observations are left out
+    - parameter_grid: every combination of a grid of feature settings (lags,
+      rolling windows) and model settings (estimator, alpha, ...)
+    - FoldCache: preprocessed fold matrices saved on disk, keyed by the data,
+      the feature settings and the fold dates, so a sweep that only changes
+      model settings never rebuilds features or refits preprocessors; folds
+      built from data that has since changed are deleted on the next run
+    - evaluate: fits every (parameter set, fold) pair in a pool of worker
+      processes, which memory-map the cached matrices, and reports per-fold
+      timing and errors overall and per station
+"""
+
+import os
+import json
+import time
+import shutil
+import pickle
+import hashlib
+import itertools
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from data.features import TARGET_COLUMNS, build_features, drop_incomplete, input_names
+from data.linear_regression import ESTIMATORS, HYPERPARAMETERS, mean_squared_error, predict_scaled, preprocess_data
+
+# Default location of the fold cache, next to the feature store
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "feature_store", "folds")
+
+# Grid keys that change the feature matrix; every other key is a model setting
+FEATURE_KEYS = ("lags", "rolling")
+
+# Names of the target columns of the feature matrix, in order
+TARGETS = ("precip", "temp_max", "temp_min")
+
+def rolling_origin_splits(dates, folds=5, horizon=90, gap=0):
+    '''
+    Builds expanding-window folds over the last folds * horizon days.
+
+    Parameters:
+        dates (numpy array): datetime64[D] date of every row
+        folds (int): number of folds
+        horizon (int): days in each fold's test window
+        gap (int): days left out between the training and test windows
+    Returns:
+        list: (train_end, test_start, test_end) datetime64[D] tuples, oldest
+            first; a fold trains on dates < train_end and tests on
+            test_start <= date < test_end. Folds whose test window holds no
+            dates (a gap in the data) are left out, so there can be fewer
+            than folds
+    Raises:
+        ValueError: if the first fold would have no training days
+    '''
+    first, last = dates.min(), dates.max()
+    end = last + np.timedelta64(1, "D")
+    observed = np.unique(dates)
+    splits = []
+    for fold in range(folds):
+        test_start = end - np.timedelta64((folds - fold) * horizon, "D")
+        train_end = test_start - np.timedelta64(gap, "D")
+        splits.append((train_end, test_start, test_start + np.timedelta64(horizon, "D")))
+    if splits[0][0] <= first:
+        raise ValueError(
+            f"{folds} folds of {horizon} days leave no training data before {splits[0][1]}"
+        )
+    # Days observed in each test window; the last window always holds the last day
+    counts = np.searchsorted(observed, [split[2] for split in splits]) - np.searchsorted(
+        observed, [split[1] for split in splits]
+    )
+    return [split for split, count in zip(splits, counts) if count]
+
+def parameter_grid(grid):
+    '''
+    Expands a grid into every combination of its values.
+
+    Parameters:
+        grid (dict): parameter name to a list of values, e.g.
+            {"lags": [[1], [1, 2, 7]], "alpha": [0.1, 1.0]}; missing
+            parameters take their HYPERPARAMETERS (or feature) defaults
+    Returns:
+        list: one dict of lags, rolling and the HYPERPARAMETERS per combination
+    Raises:
+        ValueError: if a parameter name is unknown, or per_station is set;
+            folds are scored with one model over all stations
+    '''
+    defaults = {"lags": [1], "rolling": None, **HYPERPARAMETERS}
+    unknown = sorted(set(grid) - set(defaults))
+    if unknown:
+        raise ValueError(f"Unknown grid parameters {', '.join(unknown)}; expected any of {', '.join(defaults)}")
+    if any(grid.get("per_station", [])):
+        raise ValueError("per_station is not supported by evaluation, which fits one model over all stations")
+    names = sorted(grid)
+    return [
+        {**defaults, **dict(zip(names, values))}
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+def columns_key(columns):
+    '''
+    Fingerprints typed observation columns by their contents.
+
+    Parameters:
+        columns (dict): typed columns from features.columns_from_rows
+    Returns:
+        str: hex digest that changes whenever any value changes
+    '''
+    digest = hashlib.sha256()
+    for name in sorted(columns):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(columns[name]).view(np.uint8))
+    return digest.hexdigest()[:16]
+
+class FoldCache:
+    """
+    Saves preprocessed fold matrices to disk and memory-maps them back.
+
+    Each entry is a directory holding X_train, y_train, X_test, y_test (the
+    preprocessed features and scaled targets), the station code of every
+    test row, and the output scaler that unscales the targets. Entry names
+    start with the data fingerprint, so prune() can delete the entries of
+    data that has since changed.
+    """
+
+    ARRAYS = ("X_train", "y_train", "X_test", "y_test", "station_test")
+
+    def __init__(self, root=DEFAULT_CACHE_DIR):
+        self.root = str(root)
+
+    def key(self, data_key, feature_settings, split):
+        '''
+        Builds the cache key of one fold.
+
+        The names of the model's input columns are part of the key, so folds
+        preprocessed for a different input layout are never reused.
+
+        Parameters:
+            data_key (str): output of columns_key
+            feature_settings (dict): lags and rolling windows
+            split (tuple): (train_end, test_start, test_end) of the fold
+        Returns:
+            str: data_key and a short hex digest of the rest
+        '''
+        inputs = input_names(tuple(feature_settings["lags"]), feature_settings["rolling"])
+        payload = json.dumps(
+            {"data": data_key, "features": feature_settings, "inputs": inputs, "split": [str(day) for day in split]},
+            sort_keys=True, default=str
+        )
+        return f"{data_key}-{hashlib.sha256(payload.encode()).hexdigest()[:16]}"
+
+    def path(self, key):
+        """Directory holding the entry for a key."""
+        return os.path.join(self.root, key)
+
+    def exists(self, key):
+        """Whether an entry has been saved under a key."""
+        return os.path.exists(os.path.join(self.path(key), "scaler.pkl"))
+
+    def save(self, key, arrays, output_scaler):
+        '''
+        Saves one fold's matrices, written to a temporary directory first
+        and then moved into place.
+
+        Parameters:
+            key (str): cache key from key()
+            arrays (dict): the ARRAYS by name
+            output_scaler (StandardScaler): scaler fitted on the training targets
+        '''
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+        try:
+            for name in self.ARRAYS:
+                np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+            with open(os.path.join(staging, "scaler.pkl"), "wb") as file:
+                pickle.dump(output_scaler, file)
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            os.replace(staging, self.path(key))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def prune(self, data_key):
+        '''
+        Deletes every entry that was not built from the given data.
+
+        Entries of other data can never be loaded again once the data has
+        changed, so without pruning the cache would grow by a full set of
+        folds every time new observations are loaded. Staging directories
+        of saves in progress are left alone.
+
+        Parameters:
+            data_key (str): output of columns_key for the current data
+        Returns:
+            int: number of entries deleted
+        '''
+        if not os.path.isdir(self.root):
+            return 0
+        stale = [
+            name for name in os.listdir(self.root)
+            if not name.startswith((f"{data_key}-", "."))
+        ]
+        for name in stale:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        return len(stale)
+
+    def load(self, key):
+        '''
+        Memory-maps one fold's matrices.
+
+        Parameters:
+            key (str): cache key from key()
+        Returns:
+            tuple: (dict of read-only ARRAYS, output scaler)
+        '''
+        path = self.path(key)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in self.ARRAYS}
+        with open(os.path.join(path, "scaler.pkl"), "rb") as file:
+            return arrays, pickle.load(file)
+
+def prepare_folds(cache, columns, data_key, feature_settings, splits):
+    '''
+    Makes sure every fold of one feature setting is in the cache.
+
+    Features are only built when at least one fold is missing. Each fold's
+    preprocessor and output scaler are fitted on its training rows only.
+
+    Parameters:
+        cache (FoldCache): the fold cache
+        columns (dict): typed columns from features.columns_from_rows
+        data_key (str): output of columns_key(columns)
+        feature_settings (dict): lags and rolling windows
+        splits (list): output of rolling_origin_splits
+    Returns:
+        tuple: (cache key of every fold, seconds spent preparing)
+    '''
+    start = time.perf_counter()
+    keys = [cache.key(data_key, feature_settings, split) for split in splits]
+    missing = [(key, split) for key, split in zip(keys, splits) if not cache.exists(key)]
+    if missing:
+        features, dates = drop_incomplete(
+            build_features(
+                **columns, lags=tuple(feature_settings["lags"]), rolling=feature_settings["rolling"]
+            ),
+            columns["date"]
+        )
+        for key, (train_end, test_start, test_end) in missing:
+            train_rows = dates < train_end
+            test_rows = (dates >= test_start) & (dates < test_end)
+            preprocessor = preprocess_data(features.shape[1])
+            output_scaler = StandardScaler()
+            cache.save(key, {
+                "X_train": preprocessor.fit_transform(features[train_rows]),
+                "y_train": output_scaler.fit_transform(features[train_rows][:, TARGET_COLUMNS].astype(float)),
+                "X_test": preprocessor.transform(features[test_rows]),
+                "y_test": output_scaler.transform(features[test_rows][:, TARGET_COLUMNS].astype(float)),
+                "station_test": features[test_rows, 0].astype(np.int32),
+            }, output_scaler)
+    return keys, time.perf_counter() - start
+
+def station_errors(station, errors, station_names):
+    '''
+    Summarizes prediction errors per station.
+
+    Parameters:
+        station (numpy array): station code of every row
+        errors (numpy array): (rows, 3) prediction minus actual, unscaled
+        station_names (numpy array): names indexed by station code
+    Returns:
+        dict: station name to samples and the RMSE and MAE of every target
+    '''
+    codes, station = np.unique(station, return_inverse=True)
+    counts = np.bincount(station)
+    stations = {}
+    squared = np.column_stack([np.bincount(station, errors[:, i] ** 2) for i in range(3)]) / counts[:, None]
+    absolute = np.column_stack([np.bincount(station, np.abs(errors[:, i])) for i in range(3)]) / counts[:, None]
+    for index, code in enumerate(codes):
+        stations[str(station_names[code])] = {
+            "samples": int(counts[index]),
+            "rmse": dict(zip(TARGETS, np.sqrt(squared[index]).tolist())),
+            "mae": dict(zip(TARGETS, absolute[index].tolist())),
+        }
+    return stations
+
+# Worker process state, set once per process by init_worker
+_worker = {}
+
+def init_worker(cache_root, station_names):
+    '''
+    Sets up a worker process.
+
+    Parameters:
+        cache_root (str): root directory of the fold cache
+        station_names (numpy array): station names indexed by station code
+    '''
+    from threadpoolctl import threadpool_limits
+
+    _worker.update(
+        cache=FoldCache(cache_root),
+        station_names=station_names,
+        limits=threadpool_limits(limits=1),
+    )
+
+def fit_fold(key, params):
+    '''
+    Fits and scores one parameter set on one cached fold in a worker process.
+
+    Parameters:
+        key (str): fold cache key
+        params (dict): a parameter set from parameter_grid
+    Returns:
+        dict: training_samples, test_samples, fit_seconds, predict_seconds,
+            training_mse and test_mse (on scaled targets, as train() reports
+            them) and per-station errors in the original units
+    '''
+    arrays, output_scaler = _worker["cache"].load(key)
+
+    start = time.perf_counter()
+    model = ESTIMATORS[params["estimator"]](arrays["X_train"], arrays["y_train"], params)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = predict_scaled(model, arrays["X_test"])
+    predict_seconds = time.perf_counter() - start
+
+    errors = output_scaler.inverse_transform(y_pred) - output_scaler.inverse_transform(arrays["y_test"])
+    return {
+        "training_samples": len(arrays["X_train"]),
+        "test_samples": len(arrays["X_test"]),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+        "training_mse": mean_squared_error(model, arrays["X_train"], arrays["y_train"]),
+        "test_mse": float(np.mean((y_pred - arrays["y_test"]) ** 2)),
+        "stations": station_errors(arrays["station_test"], errors, _worker["station_names"]),
+    }
+
+def evaluate(columns, station_names, grid, folds=5, horizon=90, gap=0, workers=None,
+             cache_root=DEFAULT_CACHE_DIR, progress=None):
+    '''
+    Cross-validates every parameter set of a grid on rolling-origin folds.
+
+    Parameters:
+        columns (dict): typed columns from features.columns_from_rows
+        station_names (numpy array): names indexed by station code
+        grid (dict): parameter grid, see parameter_grid
+        folds (int): number of folds
+        horizon (int): days in each fold's test window
+        gap (int): days left out between training and test windows
+        workers (int): number of worker processes, default os.cpu_count()
+        cache_root (str): root directory of the fold cache
+        progress (callable): called as progress(done, total) after every fit
+    Fold cache entries built from other data are deleted once this data's
+    folds are prepared.
+
+    Returns:
+        dict: Contains:
+            - folds: (train_end, test_start, test_end) of every fold as strings
+            - prepare_seconds: per feature setting (as JSON), seconds spent
+              building fold matrices; near zero when they were cached
+            - results: one entry per (parameter set, fold) with the params,
+              the fold number and the output of fit_fold
+            - summary: one entry per parameter set with its params and the
+              mean and standard deviation of test_mse and mean fit_seconds
+              over folds, best first
+    '''
+    candidates = parameter_grid(grid)
+    for params in candidates:
+        if params["estimator"] not in ESTIMATORS:
+            raise ValueError(f"Unknown estimator '{params['estimator']}'; expected one of {tuple(ESTIMATORS)}")
+    splits = rolling_origin_splits(columns["date"], folds, horizon, gap)
+    data_key = columns_key(columns)
+    cache = FoldCache(cache_root)
+
+    fold_keys = {}
+    prepare_seconds = {}
+    for params in candidates:
+        setting = {name: params[name] for name in FEATURE_KEYS}
+        label = json.dumps(setting, sort_keys=True)
+        if label not in fold_keys:
+            fold_keys[label], prepare_seconds[label] = prepare_folds(cache, columns, data_key, setting, splits)
+    cache.prune(data_key)
+
+    tasks = [
+        (index, fold, fold_keys[json.dumps({name: params[name] for name in FEATURE_KEYS}, sort_keys=True)][fold])
+        for index, params in enumerate(candidates)
+        for fold in range(len(splits))
+    ]
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    scores = {}
+    with ProcessPoolExecutor(
+        max_workers=min(workers or os.cpu_count() or 1, len(tasks)),
+        mp_context=context,
+        initializer=init_worker,
+        initargs=(cache.root, station_names),
+    ) as executor:
+        futures = {
+            executor.submit(fit_fold, key, candidates[index]): (index, fold)
+            for index, fold, key in tasks
+        }
+        for future in as_completed(futures):
+            scores[futures[future]] = future.result()
+            if progress is not None:
+                progress(len(scores), len(tasks))
+
+    results = [
+        {"params": candidates[index], "fold": fold, **scores[index, fold]}
+        for index, fold in sorted(scores)
+    ]
+    summary = []
+    for index, params in enumerate(candidates):
+        folds_scored = [scores[index, fold] for fold in range(len(splits))]
+        test_mse = [score["test_mse"] for score in folds_scored]
+        summary.append({
+            "params": params,
+            "mean_test_mse": float(np.mean(test_mse)),
+            "std_test_mse": float(np.std(test_mse)),
+            "mean_fit_seconds": float(np.mean([score["fit_seconds"] for score in folds_scored])),
+        })
+    summary.sort(key=lambda entry: entry["mean_test_mse"])
+
+    return {
+        "folds": [[str(day) for day in split] for split in splits],
+        "prepare_seconds": prepare_seconds,
+        "results": results,
+        "summary": summary,
+    }
@@ -0,0 +1,140 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    On-disk feature store for the weather prediction model.
+
+    Building the training matrix means reading every observation from the
+    database and computing the lag and window features, which takes seconds.
+    The store persists the result under a key derived from a fingerprint of
+    the observation table and the feature settings, so a later run on the
+    same data memory-maps the saved matrix instead. Each entry is a
+    directory holding:
+    - features.npy: the feature matrix from features.build_features
+    - station_names.npy: the station names indexed by station code
+    - metadata.json: the key inputs, the matrix shape and the number of
+      observations it was built from
+
+    Loading an entry maps the matrix read-only without copying it, so pages
+    are only read from disk as training touches them. Entries for data that
+    has since changed are never loaded again and are removed once more than
+    MAX_ENTRIES are stored.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+
+# Default location of the store, next to this module
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(__file__), "feature_store")
+
+# Number of entries kept; older entries are removed when a new one is saved
+MAX_ENTRIES = 4
+
+def store_key(fingerprint, feature_settings):
+    '''
+    Builds the store key for a data fingerprint and feature settings.
+
+    Parameters:
+        fingerprint (dict): JSON serializable summary of the training data
+        feature_settings (dict): lags and rolling windows passed to build_features
+    Returns:
+        str: a short hex digest that changes whenever either input changes
+    '''
+    payload = json.dumps(
+        {"fingerprint": fingerprint, "features": feature_settings},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+class FeatureStore:
+    """
+    Saves feature matrices to disk and memory-maps them back.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, max_entries=MAX_ENTRIES):
+        self.root = str(root)
+        self.max_entries = max_entries
+
+    def path(self, key):
+        """Directory holding the entry for a key."""
+        return os.path.join(self.root, key)
+
+    def exists(self, key):
+        """Whether an entry has been saved under a key."""
+        return os.path.exists(os.path.join(self.path(key), "metadata.json"))
+
+    def save(self, key, station_names, features, metadata):
+        '''
+        Saves a feature matrix under a key, replacing any existing entry.
+
+        The entry is written to a temporary directory first and then moved
+        into place, so readers never see a partially written entry.
+
+        Parameters:
+            key (str): store key from store_key()
+            station_names (numpy array): station names indexed by station code
+            features (numpy array): feature matrix from build_features
+            metadata (dict): JSON serializable fingerprint and feature settings
+        Returns:
+            dict: the metadata as saved, with the shape and dtype of the matrix
+        '''
+        os.makedirs(self.root, exist_ok=True)
+        metadata = {**metadata, "shape": list(features.shape), "dtype": str(features.dtype)}
+        staging = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+        try:
+            np.save(os.path.join(staging, "features.npy"), np.ascontiguousarray(features))
+            # Fixed-width strings so the names load without pickle
+            np.save(os.path.join(staging, "station_names.npy"), np.asarray(station_names).astype(str))
+            with open(os.path.join(staging, "metadata.json"), "w") as file:
+                json.dump(metadata, file, indent=2, default=str)
+
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            os.replace(staging, self.path(key))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.prune(keep=key)
+        return metadata
+
+    def load(self, key):
+        '''
+        Memory-maps the entry for a key.
+
+        Parameters:
+            key (str): store key from store_key()
+        Returns:
+            tuple: (station_names, read-only memory-mapped feature matrix,
+                metadata), or None if nothing is saved under the key
+        '''
+        if not self.exists(key):
+            return None
+        path = self.path(key)
+        try:
+            with open(os.path.join(path, "metadata.json")) as file:
+                metadata = json.load(file)
+            features = np.load(os.path.join(path, "features.npy"), mmap_mode="r")
+            station_names = np.load(os.path.join(path, "station_names.npy")).astype(object)
+        except (OSError, ValueError):
+            # Removed by another process's prune, or damaged; rebuild it
+            return None
+        return station_names, features, metadata
+
+    def prune(self, keep=None):
+        '''
+        Removes the least recently saved entries beyond max_entries.
+
+        Parameters:
+            keep (str): key that is never removed
+        '''
+        saved = {}
+        for key in os.listdir(self.root):
+            try:
+                if not key.startswith(".") and key != keep:
+                    saved[key] = os.path.getmtime(os.path.join(self.path(key), "metadata.json"))
+            except OSError:
+                continue
+        for key in sorted(saved, key=saved.get, reverse=True)[max(self.max_entries - 1, 0):]:
+            shutil.rmtree(self.path(key), ignore_errors=True)
@@ -0,0 +1,405 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Vectorized feature engineering for the weather prediction model.
+
+    This module builds the model's feature matrix from typed columns (a
+    datetime64 date, float32 measurements and an integer station code) using
+    numpy array operations only. It produces the same column layout as the
+    row-by-row split_date_data/add_season/add_lag pipeline in
+    linear_regression.py, so the output can be passed straight to train():
+
+        0 station code     5 day           10 precip lag 1
+        1 latitude         6 precip        11 temp max lag 1
+        2 longitude        7 temp max      12 temp min lag 1
+        3 year             8 temp min      13+ extra lags and rolling windows
+        4 month            9 season (0 = winter, 1 = spring, 2 = summer, 3 = fall)
+
+    Columns 6-8 hold the same-day measurements. They are the model's targets
+    and are never among its inputs (see input_columns); the model only sees
+    the lagged copies.
+
+    Lags and rolling windows are computed per station over calendar days:
+    a lag of k is the value measured exactly k days earlier at the same
+    station, and a window of w covers the w days before the row. When those
+    days are missing the feature is NaN rather than a value borrowed from
+    another station or from weeks earlier.
+"""
+
+import numpy as np
+
+# Names of the columns that do not depend on the lag/window settings, in order
+BASE_COLUMNS = (
+    "station", "latitude", "longitude", "year", "month", "day",
+    "prcp", "tmax", "tmin", "season"
+)
+
+# Columns that receive lag features, in the order the lags are appended
+LAGGED_COLUMNS = ("prcp", "tmax", "tmin")
+
+# Positions of the same-day measurements, the targets, in the feature matrix
+TARGET_COLUMNS = [6, 7, 8]
+
+# Position of the season, the only categorical input
+SEASON_COLUMN = 9
+
+# Supported rolling window statistics
+ROLLING_STATS = ("mean", "sum")
+
+def encode_stations(names):
+    '''
+    Replaces station names with integer codes.
+
+    Parameters:
+        names (array-like): station name for every row
+    Returns:
+        station_names (numpy array): the distinct names, sorted; the code of a
+            name is its index in this array
+        codes (numpy array): int32 station code for every row
+    '''
+    station_names, codes = np.unique(np.asarray(names, dtype=object).astype(str), return_inverse=True)
+    return station_names.astype(object), codes.astype(np.int32)
+
+def lookup_stations(station_names, names):
+    '''
+    Looks up the codes of station names in an existing encoding.
+
+    Parameters:
+        station_names (numpy array): sorted distinct names from encode_stations
+        names (array-like): station name for every row
+    Returns:
+        numpy array: int32 station code for every row, -1 for unknown names
+    '''
+    names = np.asarray(names, dtype=object).astype(str)
+    known = np.asarray(station_names).astype(str)
+    if len(known) == 0:
+        return np.full(len(names), -1, dtype=np.int32)
+    index = np.minimum(np.searchsorted(known, names), len(known) - 1)
+    return np.where(known[index] == names, index, -1).astype(np.int32)
+
+# Proleptic Gregorian ordinal of 1970-01-01, the datetime64 epoch
+EPOCH_ORDINAL = 719163
+
+def to_datetime64(dates):
+    '''
+    Converts a list of dates to a datetime64[D] array.
+
+    numpy parses ISO strings quickly but converts date objects one at a time
+    through a slow path, so date objects go through their ordinals instead.
+
+    Parameters:
+        dates (list): date objects or ISO formatted strings
+    Returns:
+        numpy array: datetime64[D] dates
+    '''
+    if not dates or isinstance(dates[0], str):
+        return np.array(dates, dtype="datetime64[D]")
+    ordinals = np.fromiter((value.toordinal() for value in dates), dtype=np.int64, count=len(dates))
+    return (ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+
+def columns_from_rows(rows, station_names=None):
+    '''
+    Converts (name, date, latitude, longitude, prcp, tmax, tmin) rows into
+    typed columns, e.g. the output of a WeatherData values_list query.
+
+    Parameters:
+        rows (list): tuples of (name, date, latitude, longitude, prcp, tmax, tmin);
+            dates may be date objects or ISO strings
+        station_names (numpy array): existing encoding to reuse, e.g. the one a
+            model was trained with; names not in it get code -1
+    Returns:
+        station_names (numpy array): the distinct station names
+        columns (dict): typed columns accepted by build_features
+    '''
+    names, dates, latitude, longitude, prcp, tmax, tmin = (
+        list(column) for column in zip(*rows)
+    ) if rows else ([], [], [], [], [], [], [])
+    if station_names is None:
+        station_names, station = encode_stations(names)
+    else:
+        station = lookup_stations(station_names, names)
+    columns = {
+        "station": station,
+        "date": to_datetime64(dates),
+        "latitude": np.array(latitude, dtype=np.float32),
+        "longitude": np.array(longitude, dtype=np.float32),
+        "prcp": np.array(prcp, dtype=np.float32),
+        "tmax": np.array(tmax, dtype=np.float32),
+        "tmin": np.array(tmin, dtype=np.float32),
+    }
+    return station_names, columns
+
+def columns_from_records(data):
+    '''
+    Converts the ML_data records returned by the API into typed columns.
+
+    Parameters:
+        data (dict): {"ML_data": [{"name", "latitude", "longitude", "date",
+            "precip", "temp_max", "temp_min"}, ...]}
+    Returns:
+        station_names (numpy array): the distinct station names
+        columns (dict): typed columns accepted by build_features
+    '''
+    return columns_from_rows([
+        (entry["name"], entry["date"], entry["latitude"], entry["longitude"],
+         entry["precip"], entry["temp_max"], entry["temp_min"])
+        for entry in data["ML_data"]
+    ])
+
+def split_dates(dates):
+    '''
+    Splits datetime64 dates into year, month and day arrays.
+
+    Parameters:
+        dates (numpy array): datetime64[D] dates
+    Returns:
+        year, month, day (numpy arrays): int32 date components
+    '''
+    dates = dates.astype("datetime64[D]")
+    months = dates.astype("datetime64[M]")
+    year = months.astype("datetime64[Y]").astype(np.int32) + 1970
+    month = months.astype(np.int32) % 12 + 1
+    day = (dates - months).astype(np.int32) + 1
+    return year, month, day
+
+def season_of(month):
+    '''
+    Maps months to seasons: 0 = winter (Dec-Feb), 1 = spring (Mar-May),
+    2 = summer (Jun-Aug), 3 = fall (Sep-Nov).
+
+    Parameters:
+        month (numpy array): months numbered 1-12
+    Returns:
+        numpy array: the season of every month
+    '''
+    return (month % 12) // 3
+
+def feature_columns(lags=(1,), rolling=None):
+    '''
+    Lists the feature matrix column names for the given lag/window settings.
+
+    Parameters:
+        lags (tuple): lags in days applied to every column in LAGGED_COLUMNS
+        rolling (dict): column name to a list of (window days, stat) pairs
+    Returns:
+        tuple: column names in matrix order
+    '''
+    names = list(BASE_COLUMNS)
+    names += [f"{column}_lag{periods}" for periods in lags for column in LAGGED_COLUMNS]
+    for column, windows in (rolling or {}).items():
+        names += [f"{column}_{stat}{window}" for window, stat in windows]
+    return tuple(names)
+
+# Names of the feature matrix columns with the default settings
+FEATURE_COLUMNS = feature_columns()
+
+def input_columns(n_columns):
+    '''
+    Lists the feature matrix columns the model reads: every column except the
+    station code and the same-day measurements it predicts.
+
+    Parameters:
+        n_columns (int): number of columns in the feature matrix
+    Returns:
+        list: column positions, in matrix order
+    '''
+    return [index for index in range(1, n_columns) if index not in TARGET_COLUMNS]
+
+def input_names(lags=(1,), rolling=None):
+    '''
+    Names of the columns the model reads for the given lag/window settings.
+
+    Parameters:
+        lags (tuple): lags in days, as passed to build_features
+        rolling (dict): rolling windows, as passed to build_features
+    Returns:
+        list: column names, in matrix order
+    '''
+    names = feature_columns(lags, rolling)
+    return [names[index] for index in input_columns(len(names))]
+
+def station_day_keys(station, date):
+    '''
+    Combines station codes and dates into one sortable int64 key per row, so
+    that consecutive days of a station have consecutive keys and keys of
+    different stations never fall within any lag or window distance.
+
+    Parameters:
+        station (numpy array): integer station code for every row
+        date (numpy array): datetime64[D] date for every row
+    Returns:
+        numpy array: int64 keys
+    '''
+    days = date.astype("datetime64[D]").astype(np.int64)
+    return (station.astype(np.int64) << 32) + days
+
+def window_features(station, date, measures, lags=(1,), rolling=None):
+    '''
+    Computes per-station, calendar-aware lags and rolling windows for several
+    columns in one pass. Rows do not need to be sorted.
+
+    Parameters:
+        station (numpy array): integer station code for every row
+        date (numpy array): datetime64[D] date for every row
+        measures (dict): column name to values for every row
+        lags (tuple): lags in days applied to every column in measures
+        rolling (dict): column name to a list of (window days, stat) pairs,
+            where stat is "mean" or "sum"; windows cover the days before the row
+    Returns:
+        dict: feature name to float64 values, named as in feature_columns()
+            (NaN where the lagged day or every day of a window is missing)
+    '''
+    keys = station_day_keys(station, date)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    features = {}
+
+    for periods in lags:
+        target = keys - periods
+        index = np.minimum(np.searchsorted(sorted_keys, target), len(keys) - 1)
+        found = sorted_keys[index] == target if len(keys) else np.zeros(0, dtype=bool)
+        source = order[index]
+        for column, values in measures.items():
+            features[f"{column}_lag{periods}"] = np.where(found, values[source], np.nan)
+
+    # Bounds of each row's window in the sorted order, shared by all columns
+    window_bounds = {}
+    for column, windows in (rolling or {}).items():
+        sorted_values = np.asarray(measures[column], dtype=np.float64)[order]
+        missing = np.isnan(sorted_values)
+        totals = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, sorted_values))))
+        counts = np.concatenate(([0], np.cumsum(~missing)))
+        for window, stat in windows:
+            if stat not in ROLLING_STATS:
+                raise ValueError(f"Unknown rolling stat '{stat}'; expected one of {ROLLING_STATS}")
+            if window not in window_bounds:
+                window_bounds[window] = (
+                    np.searchsorted(sorted_keys, keys - window, side="left"),
+                    np.searchsorted(sorted_keys, keys, side="left"),
+                )
+            low, high = window_bounds[window]
+            total = totals[high] - totals[low]
+            count = counts[high] - counts[low]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result = total / count if stat == "mean" else total
+            features[f"{column}_{stat}{window}"] = np.where(count > 0, result, np.nan)
+
+    return features
+
+def drop_incomplete(features, *arrays):
+    '''
+    Removes rows with any NaN feature, e.g. the first day of each station or
+    days right after a gap, which have no lag value.
+
+    Parameters:
+        features (numpy array): feature matrix
+        *arrays (numpy arrays): other per-row arrays to filter the same way
+    Returns:
+        numpy array, or tuple of arrays when extra arrays are given
+    '''
+    complete = ~np.isnan(features).any(axis=1)
+    if not arrays:
+        return features[complete]
+    return (features[complete],) + tuple(array[complete] for array in arrays)
+
+def build_features(station, date, latitude, longitude, prcp, tmax, tmin,
+                   lags=(1,), rolling=None, dtype=np.float32):
+    '''
+    Builds the model's feature matrix from typed columns.
+
+    Parameters:
+        station (numpy array): integer station code for every row
+        date (numpy array): datetime64[D] date for every row
+        latitude, longitude (numpy arrays): station coordinates
+        prcp, tmax, tmin (numpy arrays): measured precipitation and temperatures
+        lags (tuple): lags in days for precip, temp max and temp min; the
+            first must be 1 to keep the column layout train() expects
+        rolling (dict): column name to a list of (window days, stat) pairs,
+            e.g. {"prcp": [(3, "sum"), (7, "sum")]}
+        dtype: dtype of the returned matrix
+    Returns:
+        numpy array: (rows, len(feature_columns(lags, rolling))) matrix; lag
+            and window columns are NaN where the source days are missing
+    '''
+    year, month, day = split_dates(date)
+    measures = {"prcp": prcp, "tmax": tmax, "tmin": tmin}
+    columns = feature_columns(lags, rolling)
+
+    features = np.empty((len(date), len(columns)), dtype=dtype)
+    features[:, 0] = station
+    features[:, 1] = latitude
+    features[:, 2] = longitude
+    features[:, 3] = year
+    features[:, 4] = month
+    features[:, 5] = day
+    features[:, 6] = prcp
+    features[:, 7] = tmax
+    features[:, 8] = tmin
+    features[:, 9] = season_of(month)
+
+    windowed = window_features(station, date, measures, lags, rolling)
+    for index, name in enumerate(columns[len(BASE_COLUMNS):], start=len(BASE_COLUMNS)):
+        features[:, index] = windowed[name]
+    return features
+
+def inference_features(station, date, history, lags=(1,), rolling=None, dtype=np.float32):
+    '''
+    Builds feature rows for days to predict from the observations before them.
+
+    The history and the days to predict go through build_features together,
+    so lags and windows are computed exactly as in training and the rows have
+    the training layout. The measurements of a predicted day are not known
+    yet, so the target columns are NaN; the model does not read them.
+
+    Parameters:
+        station (numpy array): integer station code of every day to predict
+        date (numpy array): datetime64[D] day to predict
+        history (dict): typed observation columns as returned by
+            columns_from_rows, covering the lag and window days
+        lags (tuple): lags the model was trained with; the first must be 1
+        rolling (dict): rolling windows the model was trained with
+        dtype: dtype of the returned matrix
+    Returns:
+        numpy array: one feature row per day to predict; input columns are
+            NaN where the station or the observations they depend on are
+            missing (see complete_inputs)
+    '''
+    station = np.asarray(station, dtype=np.int32)
+    date = np.asarray(date, dtype="datetime64[D]")
+
+    # Coordinates come from each station's latest observation in the history
+    latitude = np.full(len(date), np.nan, dtype=np.float32)
+    longitude = np.full(len(date), np.nan, dtype=np.float32)
+    if len(history["date"]):
+        order = np.lexsort((history["date"], history["station"]))
+        stations_sorted = history["station"][order]
+        index = np.searchsorted(stations_sorted, station, side="right") - 1
+        found = (index >= 0) & (stations_sorted[np.maximum(index, 0)] == station)
+        latest = order[np.maximum(index, 0)]
+        latitude = np.where(found, history["latitude"][latest], np.nan)
+        longitude = np.where(found, history["longitude"][latest], np.nan)
+
+    unknown = np.full(len(date), np.nan, dtype=np.float32)
+    query = {
+        "station": station, "date": date, "latitude": latitude, "longitude": longitude,
+        "prcp": unknown, "tmax": unknown, "tmin": unknown,
+    }
+    combined = {
+        column: np.concatenate((history[column], query[column]))
+        for column in query
+    }
+    features = build_features(**combined, lags=lags, rolling=rolling, dtype=dtype)[len(history["date"]):]
+    features[station < 0] = np.nan
+    return features
+
+def complete_inputs(features):
+    '''
+    Finds the rows whose model inputs are all known, ignoring the targets.
+
+    Parameters:
+        features (numpy array): feature matrix, e.g. from inference_features
+    Returns:
+        numpy array: boolean mask of the rows that can be predicted
+    '''
+    return ~np.isnan(features[:, input_columns(features.shape[1])]).any(axis=1)
@@ -1,31 +1,13 @@
 import numpy as np
-import requests
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
-import tensorflow as tf
-from tensorflow import keras
-from sqlalchemy import create_engine, text
-import os   
-import dotenv
-
-dotenv.load_dotenv()
-
-def get_data():
-    '''
-    Gets the data from the database for the model to be trained on.
-
-    Parameters:
-        None
-    Returns:
-        data (dict): Dictionary containing ML prediction data
-    '''
-    url = "http://localhost:8000/api/ml_data/"
-    response = requests.get(url)
-    data = response.json()
-    return data
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.linear_model import Ridge
+import os
+from data.features import SEASON_COLUMN, TARGET_COLUMNS, build_features, drop_incomplete, input_columns
 
 def split_date_data(data):
     '''
@@ -95,18 +77,30 @@ def add_season(data):
     #add the seasons to the data
     return np.hstack((data, seasons))
 
-def preprocess_data():
-    
+def preprocess_data(n_columns=13):
+    '''
+    Builds the preprocessor for the feature matrix.
+
+    Only the columns listed by features.input_columns are used; the station
+    code and the same-day measurements (the targets) are dropped.
+
+    Parameters:
+        n_columns (int): number of columns in the feature matrix; columns after
+            the first three lags (extra lags and rolling windows) are numeric
+    Returns:
+        ColumnTransformer: scales numeric features and one-hot encodes the season
+    '''
     #preprocessing for numeric features
-    numeric_features = [1, 2, 3, 4, 5, 6, 10, 11, 12] #indices for numeric features
+    numeric_features = [index for index in input_columns(n_columns) if index != SEASON_COLUMN]
     numeric_transformer = Pipeline(steps=[
         ('scaler', StandardScaler())
     ])
 
     #preprocessing for categorical features
-    categorical_features = [9]  #index for season
+    categorical_features = [SEASON_COLUMN]  #index for season
     categorical_transformer = Pipeline(steps=[
-        ('onehot', OneHotEncoder())
+        # A station's model may not see every season in training
+        ('onehot', OneHotEncoder(handle_unknown="ignore"))
     ])
 
     #combine preprocessors in a column transformer
@@ -119,27 +113,217 @@ def preprocess_data():
 
     return preprocessor
 
-def train(data):
+# Default training hyperparameters; the model registry keys saved models by these.
+# "estimator" picks a backend from ESTIMATORS; alpha is only used by ridge and
+# epochs/optimizer only by keras. per_station trains one model per station
+# with station_training.train_per_station instead of one over all stations
+HYPERPARAMETERS = {
+    "estimator": "lstsq",
+    "alpha": 1.0,
+    "per_station": False,
+    "epochs": 100,
+    "optimizer": "adam",
+    "test_size": 0.2,
+    "random_state": 111,
+}
+
+def check_hyperparameters(hyperparameters):
+    '''
+    Rejects hyperparameter names that are not in HYPERPARAMETERS and values
+    that training could not use.
+
+    Parameters:
+        hyperparameters (dict): overrides for HYPERPARAMETERS
+    Raises:
+        ValueError: naming the unknown keys or the first invalid value, so a
+            misspelled or mistyped setting fails before training starts
+    '''
+    hyperparameters = hyperparameters or {}
+    unknown = sorted(set(hyperparameters) - set(HYPERPARAMETERS))
+    if unknown:
+        raise ValueError(
+            f"Unknown hyperparameters {', '.join(unknown)}; expected any of {', '.join(HYPERPARAMETERS)}"
+        )
+
+    def number(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    #(check, description) of the values each hyperparameter accepts
+    checks = {
+        "estimator": (lambda value: value in ESTIMATORS, f"one of {', '.join(ESTIMATORS)}"),
+        "alpha": (lambda value: number(value) and value >= 0, "a number >= 0"),
+        "per_station": (lambda value: isinstance(value, bool), "true or false"),
+        "epochs": (lambda value: number(value) and int(value) == value and value > 0, "a positive integer"),
+        "optimizer": (lambda value: isinstance(value, str) and value != "", "an optimizer name"),
+        "test_size": (lambda value: number(value) and 0 < value < 1, "a number between 0 and 1"),
+        "random_state": (lambda value: number(value) and int(value) == value, "an integer"),
+    }
+    for name, value in hyperparameters.items():
+        check, expected = checks[name]
+        if not check(value):
+            raise ValueError(f"Hyperparameter {name} must be {expected}, got {value!r}")
+
+class LeastSquares(RegressorMixin, BaseEstimator):
+    '''
+    Ordinary least squares solved exactly with numpy's lstsq.
+
+    An intercept column is appended to the features. The one-hot season
+    columns always sum to one, so the system is rank deficient and lstsq
+    returns the minimum norm solution, which predicts the same as any other.
+    '''
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        design = np.column_stack([X, np.ones(len(X))])
+        solution, *_ = np.linalg.lstsq(design, np.asarray(y, dtype=np.float64), rcond=None)
+        self.coef_ = solution[:-1].T
+        self.intercept_ = solution[-1]
+        return self
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_.T + self.intercept_
+
+def fit_lstsq(X, y, params, progress=None):
+    '''
+    Fits the exact least squares solution.
+
+    Parameters:
+        X (numpy array): preprocessed training features
+        y (numpy array): scaled (precip, tmax, tmin) targets
+        params (dict): training hyperparameters
+        progress (callable): unused; the fit has no epochs
+    Returns:
+        LeastSquares: the fitted model
+    '''
+    return LeastSquares().fit(X, y)
+
+def fit_ridge(X, y, params, progress=None):
+    '''
+    Fits a ridge regression with regularization strength params["alpha"].
+
+    Parameters:
+        X (numpy array): preprocessed training features
+        y (numpy array): scaled (precip, tmax, tmin) targets
+        params (dict): training hyperparameters
+        progress (callable): unused; the fit has no epochs
+    Returns:
+        Ridge: the fitted model
+    '''
+    return Ridge(alpha=params["alpha"]).fit(X, y)
+
+def fit_keras(X, y, params, progress=None):
+    '''
+    Fits a single Dense layer with gradient descent for params["epochs"] epochs.
+
+    TensorFlow is only imported when this backend is used.
+
+    Parameters:
+        X (numpy array): preprocessed training features
+        y (numpy array): scaled (precip, tmax, tmin) targets
+        params (dict): training hyperparameters
+        progress (callable): called as progress(epoch, total_epochs, loss)
+            after every epoch
+    Returns:
+        keras.Sequential: the fitted model
+    '''
+    from tensorflow import keras
+
+    #build the linear regression model
+    model = keras.Sequential([
+        keras.Input(shape=(X.shape[1],)),
+        keras.layers.Dense(3, activation='linear')
+    ])
+
+    #compile the model
+    model.compile(optimizer=params["optimizer"], loss='mse')
+
+    #report progress after every epoch
+    callbacks = []
+    if progress is not None:
+        callbacks.append(keras.callbacks.LambdaCallback(
+            on_epoch_end=lambda epoch, logs: progress(epoch + 1, params["epochs"], float(logs["loss"]))
+        ))
+
+    #fit the model
+    model.fit(X, y, epochs=params["epochs"], verbose=0, callbacks=callbacks)
+    return model
+
+# Estimator backends by name; each is called as fit(X, y, params, progress)
+ESTIMATORS = {
+    "lstsq": fit_lstsq,
+    "ridge": fit_ridge,
+    "keras": fit_keras,
+}
+
+def predict_scaled(model, X):
+    '''
+    Runs a fitted model of any backend on preprocessed features.
+
+    Parameters:
+        model: model returned by one of the ESTIMATORS
+        X (numpy array): preprocessed features
+    Returns:
+        numpy array: (rows, 3) scaled predictions
+    '''
+    if isinstance(model, BaseEstimator):
+        return model.predict(X)
+    return np.asarray(model(X, training=False))
+
+def mean_squared_error(model, X, y):
+    '''
+    Mean squared error of a model over all three scaled targets.
+
+    Parameters:
+        model: model returned by one of the ESTIMATORS
+        X (numpy array): preprocessed features
+        y (numpy array): scaled targets
+    Returns:
+        float: the error, the same quantity the keras backend minimizes
+    '''
+    return float(np.mean((predict_scaled(model, X) - y) ** 2))
+
+def train(data, station_names=None, hyperparameters=None, fitted=None, progress=None):
     '''
     Trains a simple linear regression model
 
     Parameters:
         data (numpy array): the data for the model to be trained on
+        station_names (numpy array): names indexed by the station codes in the
+            first column, when the data comes from features.build_features
+        hyperparameters (dict): overrides for HYPERPARAMETERS
+        fitted (tuple): (model, preprocessor, output_scaler) from an earlier
+            run on the same data; fitting is skipped and only the test set
+            predictions are recomputed
+        progress (callable): called as progress(epoch, total_epochs, loss)
+            after every training epoch; closed-form estimators report a
+            single epoch
     Return:
-        None
+        dict: training metrics, the test set predictions and the fitted
+            model, preprocessor and output_scaler
     '''
+    check_hyperparameters(hyperparameters)
+    params = {**HYPERPARAMETERS, **(hyperparameters or {})}
+    if fitted is None and params["estimator"] not in ESTIMATORS:
+        raise ValueError(f"Unknown estimator '{params['estimator']}'; expected one of {tuple(ESTIMATORS)}")
     names = data[:, 0] #get station names
-    curr_weather = data[:, 6:9].astype(float)  #current weather data
-
-    #preprocess the data
-    preprocessor = preprocess_data()
-
-    #apply preprocessing
-    X = preprocessor.fit_transform(data)
-
-    #scale the current weather data
-    output_scaler = StandardScaler()
-    curr_weather_scaled = output_scaler.fit_transform(curr_weather)
+    if station_names is not None:
+        names = station_names[names.astype(int)]
+    curr_weather = data[:, TARGET_COLUMNS].astype(float)  #current weather data
+
+    if fitted is None:
+        #preprocess the data
+        preprocessor = preprocess_data(data.shape[1])
+
+        #apply preprocessing
+        X = preprocessor.fit_transform(data)
+
+        #scale the current weather data
+        output_scaler = StandardScaler()
+        curr_weather_scaled = output_scaler.fit_transform(curr_weather)
+    else:
+        model, preprocessor, output_scaler = fitted
+        X = preprocessor.transform(data)
+        curr_weather_scaled = output_scaler.transform(curr_weather)
     
     #define the dependent variable
     y = curr_weather_scaled
@@ -147,7 +331,7 @@ def train(data):
     #split training and testing sets
     indices = np.arange(len(data))
     X_train_idx, X_test_idx, y_train, y_test = train_test_split(
-        indices, y, test_size=0.2, random_state=111
+        indices, y, test_size=params["test_size"], random_state=params["random_state"]
     )
 
     # Use the indices to split the data
@@ -156,23 +340,18 @@ def train(data):
     names_train = names[X_train_idx]
     names_test = names[X_test_idx]
 
-    #build the linear regression model
-    model = keras.Sequential([
-        keras.Input(shape=(X_train.shape[1],)),
-        keras.layers.Dense(3, activation='linear')
-    ])
-
-    #compile the model
-    model.compile(optimizer='adam', loss='mse')
-
-    #fit the model
-    history = model.fit(X_train, y_train, epochs=100, verbose=0)
+    if fitted is None:
+        #fit the model with the chosen backend
+        model = ESTIMATORS[params["estimator"]](X_train, y_train, params, progress)
+    training_loss = mean_squared_error(model, X_train, y_train)
+    if fitted is None and params["estimator"] != "keras" and progress is not None:
+        progress(1, 1, training_loss)
 
     #evaluate the model
-    loss = model.evaluate(X_test, y_test, verbose=0)
+    loss = mean_squared_error(model, X_test, y_test)
 
     #predictions
-    y_pred_scaled = model.predict(X_test)
+    y_pred_scaled = predict_scaled(model, X_test)
     y_pred = output_scaler.inverse_transform(y_pred_scaled)
 
     #ensure non-negative precipitation
@@ -205,25 +384,52 @@ def train(data):
     #return metrics and all predictions
     return {
         "test_loss": float(loss),
-        "training_loss": float(history.history['loss'][-1]),
+        "training_loss": float(training_loss),
         "training_samples": len(X_train),
         "test_samples": len(X_test),
-        "predictions": predictions
+        "predictions": predictions,
+        "model": model,
+        "preprocessor": preprocessor,
+        "output_scaler": output_scaler
     }
 
-def predict_weather(model, output_scaler, name, latitude, longitude, year, month, day):
+def predict_batch(model, preprocessor, output_scaler, features):
+    '''
+    Makes weather predictions for many feature rows with a single model call.
+
+    Parameters:
+        model: Trained model from any of the ESTIMATORS, or a
+            station_training.StationModels
+        preprocessor: Fitted ColumnTransformer from training; None for
+            StationModels, which hold one per station
+        output_scaler: Fitted StandardScaler for output variables; None for
+            StationModels
+        features (numpy array): feature rows laid out as in training, e.g.
+            from features.inference_features
+
+    Returns:
+        numpy array: (rows, 3) predicted precipitation, temp max and temp min,
+            NaN for stations a StationModels has no model for
+    '''
+    if preprocessor is None:
+        return model.predict(features)
+    X = preprocessor.transform(features)
+    y_pred_scaled = predict_scaled(model, X)
+    y_pred = output_scaler.inverse_transform(y_pred_scaled)
+    y_pred[:, 0] = np.maximum(y_pred[:, 0], 0)
+    return y_pred
+
+def predict_weather(model, preprocessor, output_scaler, name, features):
     '''
     Makes weather predictions for a specific location and date.
 
     Parameters:
-        model: Trained Keras model for making predictions
+        model: Trained model from any of the ESTIMATORS
+        preprocessor: Fitted ColumnTransformer from training
         output_scaler: Fitted StandardScaler for output variables
         name (str): Station name
-        latitude (float): Station latitude
-        longitude (float): Station longitude
-        year (int): Year
-        month (int): Month
-        day (int): Day
+        features (numpy array): the station/date feature row, laid out as in
+            training (station code, latitude, longitude, year, month, day, ...)
 
     Returns:
         dict: Weather predictions containing:
@@ -235,17 +441,15 @@ def predict_weather(model, output_scaler, name, latitude, longitude, year, month
             - temp_max: Predicted maximum temperature
             - temp_min: Predicted minimum temperature
     '''
-    input_data = np.array([[name, latitude, longitude, year, month, day]])
-    y_pred_scaled = model.predict(input_data)
-    y_pred = output_scaler.inverse_transform(y_pred_scaled)
-    y_pred[:, 0] = np.maximum(y_pred[:, 0], 0)
+    features = np.asarray(features).reshape(1, -1)
+    y_pred = predict_batch(model, preprocessor, output_scaler, features)
     return {
         "name": name,
-        "latitude": latitude,
-        "longitude": longitude,
-        "year": year,
-        "month": month,
-        "day": day,
+        "latitude": float(features[0][1]),
+        "longitude": float(features[0][2]),
+        "year": int(features[0][3]),
+        "month": int(features[0][4]),
+        "day": int(features[0][5]),
         "precipitation": float(y_pred[0][0]),
         "temp_max": float(y_pred[0][1]),
         "temp_min": float(y_pred[0][2])
@@ -274,6 +478,10 @@ def load_into_db(data):
         Verifies the data was loaded correctly
         Prints summary statistics
     '''
+    import dotenv
+    from sqlalchemy import create_engine, text
+
+    dotenv.load_dotenv()
     try:
         columns = ["name", "latitude", "longitude", "year", "month", "day", 
                    "date", "predicted_precipitation", "predicted_temp_max", 
@@ -314,12 +522,22 @@ def load_into_db(data):
     except Exception as e:
         print(f"Error: {e}")
 
+# Run from the repository root, so the data package can be imported, as:
+#     python -m data.linear_regression
+# The observations are read in process through the Django ORM, as the
+# run_pipeline command reads them; use run_pipeline to also save the model
+# and write its predictions.
 if __name__ == "__main__":
-    data = get_data()
-    updated_data = split_date_data(data)
-    updated_data = np.array(updated_data)
-    updated_data = add_season(updated_data)
-    updated_data = add_lag(updated_data, 5)
-    updated_data = add_lag(updated_data, 6)
-    updated_data = add_lag(updated_data, 7)
-    model, output_scaler = train(updated_data)
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.config.settings")
+    django.setup()
+    from backend.apps.weather.training import FEATURE_SETTINGS, load_observation_columns
+
+    station_names, columns, raw_count = load_observation_columns()
+    features = drop_incomplete(build_features(
+        **columns, lags=tuple(FEATURE_SETTINGS["lags"]), rolling=FEATURE_SETTINGS["rolling"]
+    ))
+    metrics = train(features, station_names)
+    print(f"{len(features)} samples from {raw_count} observations")
+    print(f"Test loss: {metrics['test_loss']:.4f}")
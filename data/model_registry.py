@@ -0,0 +1,247 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Persisted model registry for the weather prediction model.
+
+    Trained models are saved on disk under a versioned key derived from a
+    fingerprint of the training data and the training hyperparameters. Each
+    entry is a directory holding:
+    - model.keras: the Keras model and its weights, for the keras estimator
+    - preprocessing.pkl: the fitted ColumnTransformer, output StandardScaler,
+      the station names indexed by station code and, for the closed-form
+      estimators, the fitted scikit-learn model
+    - metadata.json: the key inputs, the training metrics and the model kind
+      ("keras" or "pickle"), which says where the model was saved
+
+    Entries are loaded lazily and the most recently used ones are kept in
+    memory, so inference reuses a warm model without holding every model
+    ever trained. The newest entry is resolved from a directory scan that is
+    cached, and only repeated when the registry directory changes or after a
+    few seconds. TensorFlow is only imported when a Keras model is loaded.
+"""
+
+import os
+import json
+import pickle
+import shutil
+import hashlib
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# Default location of the registry, next to this module
+DEFAULT_REGISTRY_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+# How a model is stored: "keras" in model.keras, "pickle" in preprocessing.pkl
+MODEL_KINDS = ("keras", "pickle")
+
+# Loaded entries kept in memory per process
+MAX_LOADED = 4
+
+# Seconds the newest entry is reused before the registry directory is checked
+LATEST_TTL = 5.0
+
+class ModelEntry:
+    """
+    A trained model together with everything needed to run inference.
+
+    Attributes:
+        key (str): Registry key the entry was saved under
+        model: Trained model from one of linear_regression.ESTIMATORS
+        preprocessor: Fitted ColumnTransformer for the feature matrix
+        output_scaler: Fitted StandardScaler for (precip, tmax, tmin)
+        station_names (numpy array): Station names indexed by station code
+        metadata (dict): Fingerprint, hyperparameters and training metrics
+    """
+
+    def __init__(self, key, model, preprocessor, output_scaler, station_names, metadata):
+        self.key = key
+        self.model = model
+        self.preprocessor = preprocessor
+        self.output_scaler = output_scaler
+        self.station_names = station_names
+        self.metadata = metadata
+
+    @property
+    def fitted(self):
+        """(model, preprocessor, output_scaler) in the form train() accepts."""
+        return self.model, self.preprocessor, self.output_scaler
+
+def registry_key(fingerprint, hyperparameters):
+    '''
+    Builds the registry key for a data fingerprint and hyperparameters.
+
+    Parameters:
+        fingerprint (dict): JSON serializable summary of the training data
+        hyperparameters (dict): JSON serializable training settings
+    Returns:
+        str: a short hex digest that changes whenever either input changes
+    '''
+    payload = json.dumps(
+        {"fingerprint": fingerprint, "hyperparameters": hyperparameters},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+class ModelRegistry:
+    """
+    Saves trained models to disk and loads them back on demand.
+
+    Loaded entries are cached per process, least recently used first out;
+    the cache is shared by all threads of the process.
+    """
+
+    def __init__(self, root=DEFAULT_REGISTRY_DIR, max_loaded=MAX_LOADED, latest_ttl=LATEST_TTL):
+        self.root = str(root)
+        self.max_loaded = max_loaded
+        self.latest_ttl = latest_ttl
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        # (key, registry directory mtime, time checked) of the newest entry
+        self._latest = None
+
+    def path(self, key):
+        """Directory holding the entry for a key."""
+        return os.path.join(self.root, key)
+
+    def exists(self, key):
+        """Whether an entry has been saved under a key."""
+        return os.path.exists(os.path.join(self.path(key), "metadata.json"))
+
+    def _remember(self, entry):
+        """Caches a loaded entry, evicting the least recently used ones. Called with the lock held."""
+        self._loaded[entry.key] = entry
+        self._loaded.move_to_end(entry.key)
+        while len(self._loaded) > self.max_loaded:
+            self._loaded.popitem(last=False)
+
+    def _stamp(self):
+        """Modification time of the registry directory, which changes whenever an entry is saved or removed."""
+        try:
+            return os.stat(self.root).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def save(self, key, model, preprocessor, output_scaler, station_names, metadata, kind="pickle"):
+        '''
+        Saves a trained model under a key, replacing any existing entry.
+
+        The entry is written to a temporary directory first and then moved
+        into place, so readers never see a partially written entry.
+
+        Parameters:
+            key (str): registry key from registry_key()
+            model: trained Keras or scikit-learn model
+            preprocessor: fitted ColumnTransformer
+            output_scaler: fitted StandardScaler
+            station_names (numpy array): station names indexed by station code
+            metadata (dict): JSON serializable fingerprint, hyperparameters and metrics
+            kind (str): "keras" for a Keras model, saved in its own format, or
+                "pickle" for any other model, pickled with the preprocessing
+        Returns:
+            ModelEntry: the saved entry, also cached as loaded
+        '''
+        if kind not in MODEL_KINDS:
+            raise ValueError(f"Unknown model kind '{kind}'; expected one of {MODEL_KINDS}")
+        metadata = {**metadata, "kind": kind}
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+        try:
+            is_keras = kind == "keras"
+            if is_keras:
+                model.save(os.path.join(staging, "model.keras"))
+            with open(os.path.join(staging, "preprocessing.pkl"), "wb") as file:
+                pickle.dump({
+                    "preprocessor": preprocessor,
+                    "output_scaler": output_scaler,
+                    "station_names": station_names,
+                    "model": None if is_keras else model,
+                }, file)
+            with open(os.path.join(staging, "metadata.json"), "w") as file:
+                json.dump(metadata, file, indent=2, default=str)
+
+            with self._lock:
+                shutil.rmtree(self.path(key), ignore_errors=True)
+                os.replace(staging, self.path(key))
+                entry = ModelEntry(key, model, preprocessor, output_scaler, station_names, metadata)
+                self._remember(entry)
+                self._latest = (key, self._stamp(), time.monotonic())
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return entry
+
+    def load(self, key):
+        '''
+        Returns the entry for a key, reading it from disk on first use.
+
+        Parameters:
+            key (str): registry key from registry_key()
+        Returns:
+            ModelEntry: the entry, or None if nothing is saved under the key
+        '''
+        with self._lock:
+            entry = self._loaded.get(key)
+            if entry is not None:
+                self._loaded.move_to_end(key)
+                return entry
+            if not self.exists(key):
+                return None
+
+            path = self.path(key)
+            with open(os.path.join(path, "metadata.json")) as file:
+                metadata = json.load(file)
+            with open(os.path.join(path, "preprocessing.pkl"), "rb") as file:
+                preprocessing = pickle.load(file)
+            # Entries saved before the kind was recorded have no pickled model
+            # when they hold a Keras model
+            kind = metadata.get("kind") or ("keras" if preprocessing.get("model") is None else "pickle")
+            if kind == "keras":
+                from tensorflow import keras
+                model = keras.models.load_model(os.path.join(path, "model.keras"))
+            else:
+                model = preprocessing["model"]
+
+            entry = ModelEntry(
+                key, model, preprocessing["preprocessor"], preprocessing["output_scaler"],
+                preprocessing["station_names"], metadata
+            )
+            self._remember(entry)
+            return entry
+
+    def latest(self):
+        '''
+        Returns the most recently saved entry.
+
+        The newest key is reused for latest_ttl seconds; after that the
+        registry directory is rescanned only if its modification time changed,
+        so entries saved by other processes are picked up within the TTL.
+
+        Returns:
+            ModelEntry: the newest entry on disk, or None if the registry is empty
+        '''
+        cached = self._latest
+        now = time.monotonic()
+        stamp = None
+        if cached is not None:
+            fresh = now - cached[2] < self.latest_ttl
+            if not fresh:
+                stamp = self._stamp()
+            if fresh or stamp == cached[1]:
+                entry = self.load(cached[0])
+                if entry is not None:
+                    self._latest = (cached[0], cached[1], cached[2] if fresh else now)
+                    return entry
+        if stamp is None:
+            stamp = self._stamp()
+
+        if stamp is None:
+            return None
+        keys = [key for key in os.listdir(self.root) if not key.startswith(".") and self.exists(key)]
+        if not keys:
+            self._latest = None
+            return None
+        newest = max(keys, key=lambda key: os.path.getmtime(os.path.join(self.path(key), "metadata.json")))
+        self._latest = (newest, stamp, now)
+        return self.load(newest)
@@ -0,0 +1,228 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Per-station training for the weather prediction model.
+
+    Instead of one model over every station, a separate model (with its own
+    preprocessor and output scaler) is trained for each station with
+    linear_regression.train, in a pool of worker processes. The feature
+    matrix is sorted by station and copied once into a shared memory block
+    that every worker maps, so only a station code and a row range are sent
+    with each task rather than a pickled copy of the station's rows. The
+    per-station results are merged into the same metrics structure train()
+    returns, with the fitted models gathered in a StationModels.
+
+    Workers are forked from a "forkserver" process that has already imported
+    this module, so they start without re-importing scikit-learn and never
+    inherit a TensorFlow runtime or database connections from the parent.
+    Each worker is limited to one BLAS thread so the pool scales with the
+    number of workers.
+"""
+
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+from data.linear_regression import HYPERPARAMETERS, check_hyperparameters, train
+
+# Stations with fewer feature rows than this get no model of their own
+MIN_STATION_ROWS = 20
+
+class StationModels:
+    """
+    Fitted per-station models used in place of a single model.
+
+    Attributes:
+        fitted (dict): Station code to (model, preprocessor, output_scaler)
+    """
+
+    def __init__(self, fitted):
+        self.fitted = fitted
+
+    def predict(self, features):
+        '''
+        Predicts every row with the model of its station.
+
+        Parameters:
+            features (numpy array): feature rows laid out as in training,
+                with the station code in the first column
+        Returns:
+            numpy array: (rows, 3) precipitation, temp max and temp min,
+                NaN for rows of stations without a model
+        '''
+        from data.linear_regression import predict_batch
+
+        codes = np.asarray(features[:, 0]).astype(int)
+        predicted = np.full((len(features), 3), np.nan)
+        for code in np.unique(codes):
+            if code in self.fitted:
+                rows = codes == code
+                predicted[rows] = predict_batch(*self.fitted[code], features[rows])
+        return predicted
+
+def worker_context():
+    '''
+    Returns the multiprocessing context the worker pools are started from.
+
+    Returns:
+        BaseContext: a forkserver context preloading this module
+    '''
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+# Worker process state, set once per process by init_worker
+_worker = {}
+
+def init_worker(shm_name, shape, dtype, station_names, params):
+    '''
+    Maps the shared feature matrix in a worker process.
+
+    Parameters:
+        shm_name (str): name of the shared memory block
+        shape (tuple): shape of the feature matrix
+        dtype (str): dtype of the feature matrix
+        station_names (numpy array): station names indexed by station code
+        params (dict): training hyperparameters
+    '''
+    from threadpoolctl import threadpool_limits
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker.update(
+        shm=shm,
+        features=np.ndarray(shape, dtype=dtype, buffer=shm.buf),
+        station_names=station_names,
+        params=params,
+        limits=threadpool_limits(limits=1),
+    )
+
+def fit_station(code, start, end, fitted=None):
+    '''
+    Trains (or re-evaluates) one station's model in a worker process.
+
+    Parameters:
+        code (int): station code
+        start, end (int): the station's row range in the shared matrix
+        fitted (tuple): (model, preprocessor, output_scaler) from an
+            earlier run, to skip fitting
+    Returns:
+        tuple: (station code, metrics from train(), seconds taken)
+    '''
+    began = time.perf_counter()
+    shard = np.array(_worker["features"][start:end])
+    metrics = train(shard, _worker["station_names"], _worker["params"], fitted=fitted)
+    return code, metrics, time.perf_counter() - began
+
+def station_ranges(codes):
+    '''
+    Finds the row range of every station in station-sorted codes.
+
+    Parameters:
+        codes (numpy array): station code of every row, sorted
+    Returns:
+        list: (station code, start, end) tuples
+    '''
+    starts = np.flatnonzero(np.append(True, codes[1:] != codes[:-1]))
+    ends = np.append(starts[1:], len(codes))
+    return [(int(codes[start]), int(start), int(end)) for start, end in zip(starts, ends)]
+
+def weighted_mean(values, weights):
+    '''Mean of values weighted by weights, or NaN without weight.'''
+    total = sum(weights)
+    return float(np.dot(values, weights) / total) if total else float("nan")
+
+def train_per_station(data, station_names, hyperparameters=None, fitted=None, progress=None, workers=None):
+    '''
+    Trains one model per station across a pool of worker processes.
+
+    Parameters:
+        data (numpy array): feature matrix from features.build_features
+        station_names (numpy array): names indexed by the station codes in
+            the first column
+        hyperparameters (dict): overrides for HYPERPARAMETERS, applied to
+            every station's model
+        fitted (tuple): (StationModels, None, None) from an earlier run on
+            the same data, as ModelEntry.fitted returns it; fitting is skipped
+            and only the test set predictions are recomputed
+        progress (callable): called as progress(done, total, loss) each time
+            a station finishes, with the loss of that station
+        workers (int): number of worker processes, default os.cpu_count()
+    Return:
+        dict: the keys train() returns, merged over stations, where model is
+            a StationModels and preprocessor and output_scaler are None, plus:
+            - stations: per station name its training_samples, test_samples,
+              training_loss, test_loss and seconds
+            - skipped: names of stations with fewer than MIN_STATION_ROWS rows
+    '''
+    check_hyperparameters(hyperparameters)
+    params = {**HYPERPARAMETERS, **(hyperparameters or {})}
+    models = fitted[0].fitted if fitted is not None else None
+    order = np.argsort(np.asarray(data[:, 0]), kind="stable")
+    ranges = station_ranges(np.asarray(data[order, 0]).astype(int))
+    tasks = [task for task in ranges if task[2] - task[1] >= MIN_STATION_ROWS]
+    if models is not None:
+        tasks = [task for task in tasks if task[0] in models]
+    trained = {code for code, _, _ in tasks}
+    skipped = [str(station_names[code]) for code, _, _ in ranges if code not in trained]
+
+    shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    try:
+        shared = np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)
+        np.take(data, order, axis=0, out=shared)
+        del shared
+
+        results = {}
+        with ProcessPoolExecutor(
+            max_workers=min(workers or os.cpu_count() or 1, max(len(tasks), 1)),
+            mp_context=worker_context(),
+            initializer=init_worker,
+            initargs=(shm.name, data.shape, data.dtype.str, station_names, params),
+        ) as executor:
+            futures = [
+                executor.submit(fit_station, code, start, end, models[code] if models else None)
+                for code, start, end in tasks
+            ]
+            for future in as_completed(futures):
+                code, metrics, seconds = future.result()
+                results[code] = (metrics, seconds)
+                if progress is not None:
+                    progress(len(results), len(tasks), metrics["training_loss"])
+    finally:
+        shm.close()
+        shm.unlink()
+
+    stations = {}
+    predictions = []
+    for code in sorted(results):
+        metrics, seconds = results[code]
+        predictions.extend(metrics["predictions"])
+        stations[str(station_names[code])] = {
+            "training_samples": metrics["training_samples"],
+            "test_samples": metrics["test_samples"],
+            "training_loss": metrics["training_loss"],
+            "test_loss": metrics["test_loss"],
+            "seconds": seconds,
+        }
+    predictions.sort(key=lambda x: (x["name"], x["date"]))
+
+    station_metrics = list(stations.values())
+    training_samples = [station["training_samples"] for station in station_metrics]
+    test_samples = [station["test_samples"] for station in station_metrics]
+    return {
+        "test_loss": weighted_mean([station["test_loss"] for station in station_metrics], test_samples),
+        "training_loss": weighted_mean([station["training_loss"] for station in station_metrics], training_samples),
+        "training_samples": sum(training_samples),
+        "test_samples": sum(test_samples),
+        "predictions": predictions,
+        "model": StationModels({
+            code: (metrics["model"], metrics["preprocessor"], metrics["output_scaler"])
+            for code, (metrics, _) in results.items()
+        }),
+        "preprocessor": None,
+        "output_scaler": None,
+        "stations": stations,
+        "skipped": skipped,
+    }
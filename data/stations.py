@@ -0,0 +1,79 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Station dimension table shared by the loaders and the web application.
+
+    Every station gets an integer surrogate key in the stations table, and
+    observation and prediction rows reference it through a station_id
+    column, so per-station joins and group-bys compare integers instead of
+    255-character names. The name column is kept on both tables for the
+    code that still filters by name.
+
+    The statements are plain SQL so they can be run through psycopg2,
+    SQLAlchemy or Django connections alike, by loaders that run before the
+    web application's migrations.
+"""
+
+# Tables whose rows reference a station
+OBSERVATIONS = "climate_data2020_2024"
+PREDICTIONS = "ml_predictions"
+STATION_TABLES = (OBSERVATIONS, PREDICTIONS)
+
+# Matches the table created by the Station migration
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS stations (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL UNIQUE,
+        latitude DOUBLE PRECISION NOT NULL,
+        longitude DOUBLE PRECISION NOT NULL
+    )
+"""
+
+def link_sql(table):
+    '''
+    Builds the statements that give a table's rows their station_id.
+
+    Stations seen for the first time are added at their most recent
+    coordinates. Only rows without a station_id are touched, so running the
+    statements after every load costs little beyond the new rows, and they
+    restore the column, constraint and index on tables that were rebuilt.
+
+    Parameters:
+        table (str): one of STATION_TABLES
+    Returns:
+        list: SQL statements to run in order
+    '''
+    if table not in STATION_TABLES:
+        raise ValueError(f"Unknown table '{table}'; expected one of {STATION_TABLES}")
+    return [
+        CREATE_TABLE_SQL,
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS station_id INTEGER",
+        # Also restores the constraint on tables rebuilt from a copy
+        f"""
+            DO $$ BEGIN
+                IF NOT EXISTS (
+                    SELECT 1 FROM pg_constraint
+                    WHERE conrelid = '{table}'::regclass AND conname = '{table}_station_id_fkey'
+                ) THEN
+                    ALTER TABLE {table} ADD CONSTRAINT {table}_station_id_fkey
+                        FOREIGN KEY (station_id) REFERENCES stations (id);
+                END IF;
+            END $$
+        """,
+        f"CREATE INDEX IF NOT EXISTS {table}_station_date_idx ON {table} (station_id, date)",
+        f"""
+            INSERT INTO stations (name, latitude, longitude)
+            SELECT DISTINCT ON (name) name, latitude, longitude
+            FROM {table}
+            WHERE station_id IS NULL AND name IS NOT NULL
+              AND latitude IS NOT NULL AND longitude IS NOT NULL
+            ORDER BY name, date DESC
+            ON CONFLICT (name) DO NOTHING
+        """,
+        f"""
+            UPDATE {table} AS t SET station_id = s.id
+            FROM stations AS s
+            WHERE t.station_id IS NULL AND t.name = s.name
+        """,
+    ]
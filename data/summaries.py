@@ -0,0 +1,77 @@
+"""
+@authors: Cade Browning, Luke Howell
+@date: May 2025
+@description:
+    Per-station monthly summaries shared by the loaders and the web application.
+
+    station_monthly_summary holds one row per station and month with the
+    observation count and the sums and counts of tmax, tmin and prcp. Sums
+    and counts (rather than means) let any range of months, or the months of
+    a season, be combined into exact means and totals, so summary requests
+    read stations x months rows instead of every observation.
+
+    Loaders refresh only the months their new or changed rows fall in. The
+    statements are plain SQL so they can be run through psycopg2, SQLAlchemy
+    or Django connections alike, and they expect the observations to have
+    been linked to their stations first (see stations.py).
+"""
+
+from data.stations import CREATE_TABLE_SQL as CREATE_STATIONS_SQL, OBSERVATIONS
+
+SUMMARY_TABLE = "station_monthly_summary"
+
+# Matches the table created by the StationMonthlySummary migration
+CREATE_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+        id BIGSERIAL PRIMARY KEY,
+        station_id INTEGER NOT NULL REFERENCES stations (id),
+        month DATE NOT NULL,
+        observations INTEGER NOT NULL,
+        tmax_sum DOUBLE PRECISION,
+        tmax_count INTEGER NOT NULL,
+        tmin_sum DOUBLE PRECISION,
+        tmin_count INTEGER NOT NULL,
+        prcp_sum DOUBLE PRECISION,
+        prcp_count INTEGER NOT NULL,
+        UNIQUE (station_id, month)
+    )
+"""
+
+def refresh_sql(first=None, last=None):
+    '''
+    Builds the statements that recompute the summaries of a range of months.
+
+    Parameters:
+        first (date): any day of the first month to recompute
+        last (date): any day of the last month to recompute; when first and
+            last are both None every month is recomputed
+    Returns:
+        list: SQL statements to run in order, in one transaction
+    '''
+    aggregate = f"""
+        INSERT INTO {SUMMARY_TABLE} (
+            station_id, month, observations,
+            tmax_sum, tmax_count, tmin_sum, tmin_count, prcp_sum, prcp_count
+        )
+        SELECT station_id, date_trunc('month', date)::date, COUNT(*),
+               SUM(tmax), COUNT(tmax), SUM(tmin), COUNT(tmin), SUM(prcp), COUNT(prcp)
+        FROM {OBSERVATIONS}
+        WHERE station_id IS NOT NULL AND date IS NOT NULL {{range}}
+        GROUP BY 1, 2
+    """
+    if first is None and last is None:
+        return [
+            CREATE_STATIONS_SQL,
+            CREATE_TABLE_SQL,
+            f"TRUNCATE {SUMMARY_TABLE}",
+            aggregate.format(range=""),
+        ]
+
+    start = f"date_trunc('month', DATE '{first.isoformat()}')::date"
+    stop = f"(date_trunc('month', DATE '{last.isoformat()}') + INTERVAL '1 month')::date"
+    return [
+        CREATE_STATIONS_SQL,
+        CREATE_TABLE_SQL,
+        f"DELETE FROM {SUMMARY_TABLE} WHERE month >= {start} AND month < {stop}",
+        aggregate.format(range=f"AND date >= {start} AND date < {stop}"),
+    ]
@@ -16,6 +16,9 @@ import DateSearchBar from './DateSearch_Comp';
 import '../css/DateSearch.css';
 import '../css/global.css';
 
+//cities shown on the page, each matching every station whose name contains it
+const CITIES = ['ASHEVILLE', 'CHARLOTTE', 'RALEIGH', 'WILMINGTON'];
+
 function Visuals_Comp() {
 
     //state variables
@@ -36,7 +39,7 @@ function Visuals_Comp() {
         const fetchData = async () => {
             try {
                 //fetch the data from the API
-                const dataResponse = await fetch('http://localhost:8000/api/ml_data/pred/');
+                const dataResponse = await fetch(`http://localhost:8000/api/ml_data/pred/?stations=${CITIES.map(encodeURIComponent).join(',')}`);
                 
                 //check if the response is ok
                 if (!dataResponse.ok) {
@@ -67,16 +70,7 @@ function Visuals_Comp() {
                     }
 
                     // Match station name to city
-                    let city = null;
-                    if (stationName.includes('ASHEVILLE')) {
-                        city = 'ASHEVILLE';
-                    } else if (stationName.includes('CHARLOTTE')) {
-                        city = 'CHARLOTTE';
-                    } else if (stationName.includes('RALEIGH')) {
-                        city = 'RALEIGH';
-                    } else if (stationName.includes('WILMINGTON')) {
-                        city = 'WILMINGTON';
-                    }
+                    const city = CITIES.find(name => stationName.includes(name)) || null;
 
                     //if a city is found
                     if (city) {